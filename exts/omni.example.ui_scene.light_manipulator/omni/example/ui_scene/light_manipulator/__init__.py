@@ -7,5 +7,9 @@
 # license agreement from NVIDIA CORPORATION is strictly prohibited.
 #
 from .extension import *
+from .commands import ChangeLightShapeCommand
 from .light_manipulator import LightManipulator
+from .light_batch import LightBatch
+from .light_inventory import LightInventory, get_light_inventory
 from .light_model import LightModel
+from .light_shapes import LightShape, get_light_shape, register_light_shape, unregister_light_shape
@@ -0,0 +1,63 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+#
+__all__ = ["ChangeLightShapeCommand"]
+
+from array import array
+import math
+
+import omni.kit.commands
+import omni.usd
+from pxr import Sdf, Usd
+
+
+class ChangeLightShapeCommand(omni.kit.commands.Command):
+    """
+    Changes the shape attributes (width, height, intensity, radius...) of one or many lights. All the attributes are
+    written in one Sdf.ChangeBlock, so do, undo and redo are a single change for Hydra and the Tf.Notice listeners,
+    and a single entry in the undo stack.
+
+    Args:
+        prop_paths: The paths of the attributes.
+        values: The new values, one per attribute.
+        prev_values: The previous values, one per attribute.
+        timecodes: The time codes the values are authored at, one per attribute. Default time if not set.
+        usd_context_name: The name of the UsdContext of the lights.
+    """
+
+    def __init__(self, prop_paths, values, prev_values, timecodes=None, usd_context_name: str = ""):
+        self._prop_paths = [Sdf.Path(path) for path in prop_paths]
+        # The values are kept as plain doubles, large group edits don't keep a Python float per value
+        self._values = array("d", values)
+        self._prev_values = array("d", prev_values)
+        # NaN is the default time, None means the default time of all the attributes
+        self._timecodes = None
+        if timecodes:
+            self._timecodes = array("d", [float("nan") if t.IsDefault() else t.GetValue() for t in timecodes])
+        self._usd_context_name = usd_context_name
+
+    def _set(self, values):
+        stage = omni.usd.get_context(self._usd_context_name).get_stage()
+        if not stage:
+            return
+
+        with Sdf.ChangeBlock():
+            for i, path in enumerate(self._prop_paths):
+                attr = stage.GetAttributeAtPath(path)
+                if not attr:
+                    continue
+                time = Usd.TimeCode.Default()
+                if self._timecodes is not None and not math.isnan(self._timecodes[i]):
+                    time = Usd.TimeCode(self._timecodes[i])
+                attr.Set(values[i], time)
+
+    def do(self):
+        self._set(self._values)
+
+    def undo(self):
+        self._set(self._prev_values)
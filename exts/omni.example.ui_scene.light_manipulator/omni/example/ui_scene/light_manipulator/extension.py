@@ -9,17 +9,31 @@
 __all__ = ["LightManipulatorExtension"]
 
 import carb
+import carb.settings
 import omni.ext
+import omni.kit.commands
 from omni.kit.viewport.utility import get_active_viewport_window
 
+from . import commands
+from .light_inventory import LightInventory
 from .viewport_scene import ViewportScene
 
+# When enabled, the extension keeps the inventory of all the lights of the stage
+SETTING_LIGHT_INVENTORY = "/exts/omni.example.ui_scene.light_manipulator/lightInventory"
+
 
 class LightManipulatorExtension(omni.ext.IExt):
     def __init__(self):
         self._viewport_scene = None
+        self._light_inventory = None
 
     def on_startup(self, ext_id):
+        # The command that changes the shape of many lights at once
+        omni.kit.commands.register_all_commands_in_module(commands)
+
+        if carb.settings.get_settings().get(SETTING_LIGHT_INVENTORY):
+            self._light_inventory = LightInventory()
+
         # Get the active (which at startup is the default Viewport)
         viewport_window = get_active_viewport_window()
 
@@ -32,6 +46,12 @@ class LightManipulatorExtension(omni.ext.IExt):
         self._viewport_scene = ViewportScene(viewport_window, ext_id)
 
     def on_shutdown(self):
+        omni.kit.commands.unregister_module_commands(commands)
+
+        if self._light_inventory:
+            self._light_inventory.destroy()
+            self._light_inventory = None
+
         if self._viewport_scene:
             self._viewport_scene.destroy()
             self._viewport_scene = None
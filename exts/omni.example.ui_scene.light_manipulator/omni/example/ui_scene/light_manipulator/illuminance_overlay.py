@@ -0,0 +1,188 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+#
+__all__ = ["IlluminanceManipulator", "compute_illuminance"]
+
+from functools import lru_cache
+
+import carb.settings
+import numpy as np
+import omni.kit.app
+import omni.ui as ui
+import omni.usd
+from omni.ui import scene as sc
+from pxr import UsdGeom
+
+from .light_shapes import RectLightShape
+
+# The number of texels of the heatmap along each side
+SETTING_ILLUMINANCE_RESOLUTION = "/exts/omni.example.ui_scene.light_manipulator/illuminanceResolution"
+
+# The number of samples along each side of the light, the light is integrated as SAMPLES x SAMPLES small lights
+SAMPLES = 4
+
+
+@lru_cache(maxsize=4)
+def _get_unit_grid(resolution: int):
+    """
+    The texel centers of the heatmap in [-0.5, 0.5], row by row from the top. It's the same for all the lights, so
+    it's computed once per resolution.
+    """
+    coords = (np.arange(resolution, dtype=np.float64) + 0.5) / resolution - 0.5
+    x, y = np.meshgrid(coords, -coords)
+    return x.ravel(), y.ravel()
+
+
+@lru_cache(maxsize=1)
+def _get_light_samples():
+    """The centers of the samples on the unit-sized light"""
+    coords = (np.arange(SAMPLES, dtype=np.float64) + 0.5) / SAMPLES - 0.5
+    x, y = np.meshgrid(coords, coords)
+    return x.ravel(), y.ravel()
+
+
+def _get_plane_axes(up_axis):
+    """The axes of the ground plane: the x and the y of the heatmap and the normal"""
+    if up_axis == UsdGeom.Tokens.z:
+        return np.array([1.0, 0.0, 0.0]), np.array([0.0, 1.0, 0.0]), np.array([0.0, 0.0, 1.0])
+    return np.array([1.0, 0.0, 0.0]), np.array([0.0, 0.0, -1.0]), np.array([0.0, 1.0, 0.0])
+
+
+def compute_illuminance(world_transform, width, height, intensity, up_axis=UsdGeom.Tokens.y, resolution=128):
+    """
+    Computes the illuminance of the RectLight on the ground plane through the origin. The light is integrated as
+    SAMPLES x SAMPLES small Lambertian emitters facing the -z of the light.
+
+    Returns the resolution x resolution illuminance (the first row is the top of the heatmap), the center of the
+    heatmap and the size of its side, both in world units.
+    """
+    matrix = np.asarray(world_transform, dtype=np.float64).reshape(4, 4)
+    axis_x, axis_y, normal = _get_plane_axes(up_axis)
+
+    # The light in world space, the matrices are row-major with the translation in the last row
+    light_x, light_y, light_z, center = matrix[0, :3], matrix[1, :3], matrix[2, :3], matrix[3, :3]
+    light_normal = -light_z / (np.linalg.norm(light_z) or 1.0)
+    world_width = width * np.linalg.norm(light_x)
+    world_height = height * np.linalg.norm(light_y)
+
+    # The heatmap is under the light, large enough to show the falloff
+    elevation = float(center @ normal)
+    size = 2.0 * max(2.0 * abs(elevation), world_width, world_height, 1.0)
+    heatmap_center = center - elevation * normal
+
+    grid_x, grid_y = _get_unit_grid(resolution)
+    points = heatmap_center + size * (grid_x[:, None] * axis_x + grid_y[:, None] * axis_y)
+
+    sample_x, sample_y = _get_light_samples()
+    samples = center + width * sample_x[:, None] * light_x + height * sample_y[:, None] * light_y
+    sample_area = world_width * world_height / len(sample_x)
+
+    # samples x points
+    to_points = points[None, :, :] - samples[:, None, :]
+    distance2 = np.maximum(np.einsum("spk,spk->sp", to_points, to_points), 1e-6)
+    cos_light = np.maximum(to_points @ light_normal, 0.0)
+    cos_ground = np.maximum(-(to_points @ normal), 0.0)
+    # cos_light and cos_ground are not normalized, the distance is divided twice more
+    illuminance = intensity * sample_area * (cos_light * cos_ground / (distance2 * distance2)).sum(axis=0)
+
+    return illuminance.reshape(resolution, resolution), heatmap_center, size
+
+
+def _to_rgba(illuminance):
+    """The heatmap colors: transparent black for no light, red, yellow, then white for the brightest point"""
+    peak = illuminance.max()
+    t = illuminance / peak if peak > 0 else illuminance
+    rgba = np.empty(illuminance.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = np.clip(t * 3.0, 0.0, 1.0) * 255
+    rgba[..., 1] = np.clip(t * 3.0 - 1.0, 0.0, 1.0) * 255
+    rgba[..., 2] = np.clip(t * 3.0 - 2.0, 0.0, 1.0) * 255
+    rgba[..., 3] = np.sqrt(t) * 200
+    return rgba
+
+
+class IlluminanceManipulator(sc.Manipulator):
+    """
+    Draws the illuminance of the primary RectLight of LightModel on the ground plane. The heatmap is recomputed
+    only when the width, height, intensity or transform of the light changes, and at most once per app update.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._image_provider = ui.ByteImageProvider()
+        self._xform = None
+        self._image = None
+        # Set when the heatmap is out of date, it's recomputed on the next app update
+        self._update_sub = None
+
+    def __del__(self):
+        self._update_sub = None
+        self.model = None
+
+    def _mark_dirty(self):
+        """A drag changes many items in one notice, they are recomputed together on the next update"""
+        if not self._update_sub:
+            self._update_sub = (
+                omni.kit.app.get_app()
+                .get_update_event_stream()
+                .create_subscription_to_pop(self._on_update, name="Light Manipulator Illuminance")
+            )
+
+    def _on_update(self, event):
+        """Called by update_event_stream when the heatmap is out of date"""
+        self._update_sub = None
+        self._update_heatmap()
+
+    def _get_light_items(self):
+        """The primary light if it's a RectLight"""
+        model = self.model
+        all_light_items = model.get_light_items() if model else []
+        if not all_light_items or not isinstance(all_light_items[0].shape, RectLightShape):
+            return None
+        return all_light_items[0]
+
+    def _update_heatmap(self):
+        light_items = self._get_light_items()
+        if not light_items or not self._xform:
+            if self._xform:
+                self._xform.visible = False
+            return
+
+        model = self.model
+        stage = omni.usd.get_context().get_stage()
+        up_axis = UsdGeom.GetStageUpAxis(stage) if stage else UsdGeom.Tokens.y
+        resolution = carb.settings.get_settings().get(SETTING_ILLUMINANCE_RESOLUTION) or 128
+        illuminance, center, size = compute_illuminance(
+            model.get_as_floats(light_items.transform),
+            model.get_as_floats(light_items.width),
+            model.get_as_floats(light_items.height),
+            model.get_as_floats(light_items.intensity),
+            up_axis,
+            resolution,
+        )
+
+        self._image_provider.set_bytes_data(_to_rgba(illuminance).ravel().tolist(), [resolution, resolution])
+
+        # Place the image on the ground plane, the image is in the xy plane of its transform
+        axis_x, axis_y, normal = _get_plane_axes(up_axis)
+        self._xform.transform = [*(axis_x * size), 0, *(axis_y * size), 0, *normal, 0, *center, 1]
+        self._xform.visible = True
+
+    def on_build(self):
+        self._xform = sc.Transform(visible=False)
+        with self._xform:
+            self._image = sc.Image(self._image_provider, width=1.0, height=1.0)
+        self._update_sub = None
+        self._update_heatmap()
+
+    def on_model_updated(self, item):
+        light_items = self._get_light_items()
+        if item == self.model.prim_path or (
+            light_items
+            and item in (light_items.transform, light_items.width, light_items.height, light_items.intensity)
+        ):
+            self._mark_dirty()
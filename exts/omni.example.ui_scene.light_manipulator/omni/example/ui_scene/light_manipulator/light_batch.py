@@ -0,0 +1,166 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+#
+__all__ = ["LightBatch"]
+
+import carb.settings
+import numpy as np
+import omni.kit.commands
+import omni.timeline
+from pxr import Usd
+
+from .light_model import SETTING_AUTHOR_TIME_SAMPLES
+from .light_shapes import RectLightShape, get_light_shape, get_power_preserving_intensity
+
+
+class LightBatch:
+    """
+    The attributes of many lights of the same type as NumPy arrays, for the scripts that edit thousands of lights.
+    The arrays are changed in place or with the vectorized operations, and `apply` writes everything that is changed
+    back to USD in one Sdf.ChangeBlock as a single undoable command.
+
+    Example:
+        batch = LightBatch.from_stage(stage, "/World/Stage")
+        # smaller lights with the same power
+        batch.scale_size(0.8, preserve_power=True)
+        # dimmer lights
+        batch.scale("intensity", 0.8)
+        batch.apply()
+    """
+
+    def __init__(self, lights, shape=None, time: Usd.TimeCode = None):
+        """
+        Args:
+            lights: The UsdLux lights or their prims.
+            shape: The LightShape of the lights, it's the shape of the first light if not set. The lights of other
+                types are skipped.
+            time: The time the values are read at, the current time of the timeline if not set. The animated
+                attributes get a time sample at this time, the others are written at the default time.
+        """
+        if time is None:
+            timeline = omni.timeline.get_timeline_interface()
+            time = Usd.TimeCode(timeline.get_current_time() * timeline.get_time_codes_per_seconds())
+        self.time = time
+
+        prims = [light.GetPrim() if hasattr(light, "GetPrim") else light for light in lights]
+        self.shape = shape or (get_light_shape(prims[0]) if prims else None) or RectLightShape()
+        self.lights = [self.shape.light_type(prim) for prim in prims if prim and prim.IsA(self.shape.light_type)]
+
+        self._attributes = {
+            name: [binding.get_attribute(light) for light in self.lights]
+            for name, binding in self.shape.attributes.items()
+        }
+        self._original = {
+            name: np.array([attr.Get(time) or 0.0 for attr in attrs], dtype=np.float64)
+            for name, attrs in self._attributes.items()
+        }
+        # Like the drags, the edit of an animated attribute is a time sample, otherwise it's not visible at the time
+        author_time_samples = carb.settings.get_settings().get(SETTING_AUTHOR_TIME_SAMPLES)
+        self._timecodes = {
+            name: [
+                time if author_time_samples or attr.GetNumTimeSamples() > 0 else Usd.TimeCode.Default()
+                for attr in attrs
+            ]
+            for name, attrs in self._attributes.items()
+        }
+        # The arrays the user changes
+        self.values = {name: values.copy() for name, values in self._original.items()}
+
+    @classmethod
+    def from_stage(cls, stage: Usd.Stage, root_path="/", predicate=None, shape=None, time: Usd.TimeCode = None):
+        """
+        The lights under the root path. The predicate gets the Sdf.Path of every light and returns if the light is
+        in the batch.
+        """
+        shape = shape or RectLightShape()
+        root = stage.GetPrimAtPath(root_path)
+        if not root:
+            return cls([], shape, time)
+
+        prims = [
+            prim
+            for prim in Usd.PrimRange(root)
+            if prim.IsA(shape.light_type) and (predicate is None or predicate(prim.GetPath()))
+        ]
+        return cls(prims, shape, time)
+
+    def __len__(self):
+        return len(self.lights)
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def __setitem__(self, name, values):
+        self.values[name][:] = values
+
+    @property
+    def paths(self):
+        return [light.GetPath() for light in self.lights]
+
+    def get_area(self):
+        """The areas of all the lights, None if the lights have no area"""
+        return self.shape.get_area(self.values)
+
+    def scale(self, name, factor):
+        """Multiplies the attribute of all the lights"""
+        self.values[name] *= factor
+
+    def resize(self, preserve_power=True, **sizes):
+        """
+        Sets the size attributes, e.g. `resize(width=100.0)`. The values are floats or arrays. When preserve_power is
+        set, the intensity is changed the same way the corner handles of the manipulator change it.
+        """
+        area = self.get_area() if preserve_power else None
+        for name, values in sizes.items():
+            self.values[name][:] = values
+        if area is not None:
+            self._preserve_power(area)
+
+    def scale_size(self, factor, preserve_power=True):
+        """Multiplies all the size attributes, the intensity keeps the power of every light if preserve_power"""
+        area = self.get_area() if preserve_power else None
+        for name in self.shape.size_attributes:
+            self.values[name] *= factor
+        if area is not None:
+            self._preserve_power(area)
+
+    def _preserve_power(self, area):
+        new_area = self.get_area()
+        intensity = self.values["intensity"]
+        # The lights that had or got zero area keep their intensity
+        valid = (area != 0) & (new_area != 0)
+        intensity[valid] = get_power_preserving_intensity(intensity[valid], area[valid], new_area[valid])
+
+    def apply(self, usd_context_name: str = ""):
+        """Writes the changed values to USD with a single ChangeLightShape command. Returns the number of values."""
+        prop_paths = []
+        values = []
+        prev_values = []
+        timecodes = []
+        for name, attrs in self._attributes.items():
+            changed = np.nonzero(self.values[name] != self._original[name])[0]
+            prop_paths += [attrs[i].GetPath() for i in changed]
+            timecodes += [self._timecodes[name][i] for i in changed]
+            values += self.values[name][changed].tolist()
+            prev_values += self._original[name][changed].tolist()
+
+        if not prop_paths:
+            return 0
+
+        omni.kit.commands.execute(
+            "ChangeLightShape",
+            prop_paths=prop_paths,
+            values=values,
+            prev_values=prev_values,
+            timecodes=timecodes,
+            usd_context_name=usd_context_name,
+        )
+
+        # The applied values are the new base line
+        self._original = {name: values.copy() for name, values in self.values.items()}
+        return len(prop_paths)
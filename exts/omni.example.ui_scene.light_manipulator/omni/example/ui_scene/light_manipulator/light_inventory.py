@@ -0,0 +1,209 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+#
+__all__ = ["LightInventory", "get_light_inventory"]
+
+import math
+
+import omni.usd
+from pxr import Sdf, Tf, Usd
+
+from .light_shapes import get_light_shape
+
+# The inventory the extension created, None when the lightInventory setting is off
+_inventory = None
+
+
+def get_light_inventory():
+    """Returns the inventory of the lights of the stage of the default UsdContext"""
+    return _inventory
+
+
+class _LightRecord:
+    """What the inventory knows about a single light"""
+
+    def __init__(self, prim, shape):
+        light = shape.light_type(prim)
+        self.type_name = prim.GetTypeName()
+        attributes = {name: binding.get_attribute(light) for name, binding in shape.attributes.items()}
+        exposure_attr = light.GetExposureAttr()
+        # The changes of these attributes change the record
+        self.attribute_names = {attr.GetName() for attr in attributes.values()} | {exposure_attr.GetName()}
+
+        values = {name: attr.Get() or 0.0 for name, attr in attributes.items()}
+        self.intensity = values["intensity"] * 2.0 ** (exposure_attr.Get() or 0.0)
+        self.area = shape.get_area(values)
+        # The light is a Lambertian emitter, the power is pi * radiance * area. The lights without area don't have it
+        self.power = math.pi * self.intensity * self.area if self.area is not None else None
+
+
+class LightInventory:
+    """
+    The index of all the lights of the stage and their totals. The stage is traversed once when it's opened, then
+    the index is updated from Usd.Notice.ObjectsChanged: only the lights whose attributes changed are read again,
+    and the totals are updated by the difference, so they are queried in O(1).
+    """
+
+    def __init__(self, usd_context_name: str = ""):
+        global _inventory
+
+        self._usd_context_name = usd_context_name
+        self._records = {}
+        # The lights and all their parents mapped to the lights under them, the resynced subtrees are looked up here
+        self._ancestor_index = {}
+        self._totals = self._empty_totals()
+        self._stage_listener = None
+
+        self._stage_event_sub = (
+            omni.usd.get_context(usd_context_name)
+            .get_stage_event_stream()
+            .create_subscription_to_pop(self._on_stage_event, name="Light Inventory Stage Event")
+        )
+        self.rebuild()
+
+        if not usd_context_name:
+            _inventory = self
+
+    def destroy(self):
+        global _inventory
+
+        if _inventory is self:
+            _inventory = None
+        self._stage_event_sub = None
+        if self._stage_listener:
+            self._stage_listener.Revoke()
+            self._stage_listener = None
+        self._records = {}
+        self._ancestor_index = {}
+        self._totals = self._empty_totals()
+
+    @staticmethod
+    def _empty_totals():
+        return {"count": 0, "intensity": 0.0, "area": 0.0, "power": 0.0, "count_by_type": {}}
+
+    def get_totals(self):
+        """Returns the number of lights by type and the total intensity, area and power of all the lights"""
+        totals = dict(self._totals)
+        totals["count_by_type"] = dict(totals["count_by_type"])
+        return totals
+
+    def get_light(self, path):
+        """Returns the type, intensity, area and power of the light at the path, None if it's not a light"""
+        record = self._records.get(Sdf.Path(path))
+        if not record:
+            return None
+        return {"type": record.type_name, "intensity": record.intensity, "area": record.area, "power": record.power}
+
+    def get_paths(self):
+        return list(self._records.keys())
+
+    def rebuild(self):
+        """Traverses the whole stage"""
+        if self._stage_listener:
+            self._stage_listener.Revoke()
+            self._stage_listener = None
+        self._records = {}
+        self._ancestor_index = {}
+        self._totals = self._empty_totals()
+
+        stage = omni.usd.get_context(self._usd_context_name).get_stage()
+        if not stage:
+            return
+
+        self._add_subtree(stage.GetPseudoRoot())
+        self._stage_listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._notice_changed, stage)
+
+    def _add(self, path, record):
+        if path not in self._records:
+            for prefix in [Sdf.Path.absoluteRootPath] + path.GetPrefixes():
+                self._ancestor_index.setdefault(prefix, set()).add(path)
+        self._records[path] = record
+        self._count(record, 1)
+
+    def _remove(self, path):
+        record = self._records.pop(path, None)
+        if not record:
+            return
+        self._count(record, -1)
+        for prefix in [Sdf.Path.absoluteRootPath] + path.GetPrefixes():
+            light_paths = self._ancestor_index.get(prefix)
+            if light_paths is None:
+                continue
+            light_paths.discard(path)
+            if not light_paths:
+                del self._ancestor_index[prefix]
+
+    def _count(self, record, sign):
+        totals = self._totals
+        totals["count"] += sign
+        totals["intensity"] += sign * record.intensity
+        if record.area is not None:
+            totals["area"] += sign * record.area
+            totals["power"] += sign * record.power
+        count_by_type = totals["count_by_type"]
+        count_by_type[record.type_name] = count_by_type.get(record.type_name, 0) + sign
+        if not count_by_type[record.type_name]:
+            del count_by_type[record.type_name]
+
+    def _add_subtree(self, prim):
+        for child in Usd.PrimRange(prim):
+            shape = get_light_shape(child)
+            if shape:
+                self._add(child.GetPath(), _LightRecord(child, shape))
+
+    def _update_light(self, stage, path):
+        """Reads the light again"""
+        self._remove(path)
+        prim = stage.GetPrimAtPath(path)
+        shape = get_light_shape(prim)
+        if shape:
+            self._add(path, _LightRecord(prim, shape))
+
+    def _notice_changed(self, notice, stage):
+        """Called by Tf.Notice"""
+        changed_lights = set()
+        subtree = None
+        # The sorted paths have the children right after their parent, the subtree of the parent covers them
+        for path in sorted(notice.GetResyncedPaths()):
+            if path.IsPropertyPath():
+                if path.GetPrimPath() in self._records:
+                    changed_lights.add(path.GetPrimPath())
+                continue
+            if subtree is not None and path.HasPrefix(subtree):
+                continue
+
+            # The subtree is recomposed, the lights can be added or removed
+            if path == Sdf.Path.absoluteRootPath:
+                self.rebuild()
+                return
+            subtree = path
+            for light_path in list(self._ancestor_index.get(path, ())):
+                self._remove(light_path)
+            prim = stage.GetPrimAtPath(path)
+            if prim:
+                self._add_subtree(prim)
+
+        for path in notice.GetChangedInfoOnlyPaths():
+            record = self._records.get(path.GetPrimPath())
+            if record and path.IsPropertyPath() and path.name in record.attribute_names:
+                changed_lights.add(path.GetPrimPath())
+
+        for light_path in changed_lights:
+            self._update_light(stage, light_path)
+
+    def _on_stage_event(self, event):
+        """Called by stage_event_stream"""
+        if event.type == int(omni.usd.StageEventType.OPENED):
+            self.rebuild()
+        elif event.type == int(omni.usd.StageEventType.CLOSED):
+            if self._stage_listener:
+                self._stage_listener.Revoke()
+                self._stage_listener = None
+            self._records = {}
+            self._ancestor_index = {}
+            self._totals = self._empty_totals()
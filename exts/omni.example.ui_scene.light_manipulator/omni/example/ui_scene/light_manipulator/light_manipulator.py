@@ -8,40 +8,16 @@
 
 __all__ = ["LightManipulator"]
 
+from contextlib import contextmanager
+
 from omni.ui import scene as sc
 from omni.ui import color as cl
+import carb.settings
 import omni.kit
 import omni.kit.commands
 
-INTENSITY_SCALE = 500.0
-
-ARROW_WIDTH = 0.015
-ARROW_HEIGHT = 0.1
-ARROW_P = [
-    [ARROW_WIDTH, ARROW_WIDTH, 0],
-    [-ARROW_WIDTH, ARROW_WIDTH, 0],
-    [0, 0, ARROW_HEIGHT],
-    #
-    [ARROW_WIDTH, -ARROW_WIDTH, 0],
-    [-ARROW_WIDTH, -ARROW_WIDTH, 0],
-    [0, 0, ARROW_HEIGHT],
-    #
-    [ARROW_WIDTH, ARROW_WIDTH, 0],
-    [ARROW_WIDTH, -ARROW_WIDTH, 0],
-    [0, 0, ARROW_HEIGHT],
-    #
-    [-ARROW_WIDTH, ARROW_WIDTH, 0],
-    [-ARROW_WIDTH, -ARROW_WIDTH, 0],
-    [0, 0, ARROW_HEIGHT],
-    #
-    [ARROW_WIDTH, ARROW_WIDTH, 0],
-    [-ARROW_WIDTH, ARROW_WIDTH, 0],
-    [-ARROW_WIDTH, -ARROW_WIDTH, 0],
-    [ARROW_WIDTH, -ARROW_WIDTH, 0],
-]
-
-ARROW_VC = [3, 3, 3, 3, 4]
-ARROW_VI = [i for i in range(sum(ARROW_VC))]
+from .light_model import SETTING_BATCH_HANDLES, SETTING_COALESCE_DRAG_WRITES, SETTING_RETAIN_HANDLES
+from .light_shapes import ARROW_P, ARROW_VC, ARROW_VI
 
 
 class _ViewportLegacyDisableSelection:
@@ -71,22 +47,167 @@ class _ViewportLegacyDisableSelection:
             pass
 
 
+class _LightHandles:
+    """The transforms of the handles of a single light"""
+
+    def __init__(self, light_items):
+        self.light_items = light_items
+        self.root_xf = None
+        self.x_xform = None
+        # The transforms that scale the unit-sized geometry of the shape and the functions that compute their
+        # matrices from the lengths of the attributes
+        self.scaled_xforms = []
+        # The attribute values the handles show
+        self.values = {}
+        # The number of scene items and of the items with gestures, useful for profiling
+        self.item_count = 0
+        self.hit_target_count = 0
+
+    def set_values(self, values):
+        """Updates the transforms to show the given attribute values"""
+        self.values.update(values)
+        shape = self.light_items.shape
+        lengths = {name: shape.attributes[name].to_length(value or 0.0) for name, value in self.values.items()}
+        for xform, get_matrix in self.scaled_xforms:
+            xform.transform = get_matrix(lengths)
+
+
+class _HandleBuilder:
+    """
+    Builds the shapes and the gestures of a single light. LightShape.build calls it to build its handles.
+
+    In the batched mode, the lines without gestures of every scaled transform are merged into one mesh, and the
+    arrows are one mesh, so only the handles that can be hovered or dragged are separate items.
+    """
+
+    # Style settings
+    thickness = 1
+    hover_thickness = 3
+    color = cl.yellow
+
+    def __init__(self, manipulator, handles, batched=False):
+        self._manipulator = manipulator
+        self._handles = handles
+        self._batched = batched
+        self._arrow_colors = [self.color] * len(ARROW_VI)
+        # The lines that are merged at the end of the current scaled transform
+        self._static_lines = []
+        # All the items, to count them and the hit targets
+        self.items = []
+
+    def _add(self, item):
+        self.items.append(item)
+        return item
+
+    @contextmanager
+    def scaled_transform(self, get_matrix):
+        """The transform that scales the unit-sized geometry, get_matrix computes it from the lengths"""
+        xform = self._add(sc.Transform())
+        self._handles.scaled_xforms.append((xform, get_matrix))
+        with xform:
+            yield xform
+            self._merge_static_lines()
+
+    def _merge_static_lines(self):
+        if not self._static_lines:
+            return
+        # Every line is a polygon with 2 vertices, the wireframe draws it as a line
+        points = [point for line in self._static_lines for point in line]
+        self._add(
+            sc.PolygonMesh(
+                points,
+                [self.color] * len(points),
+                [2] * len(self._static_lines),
+                list(range(len(points))),
+                thicknesses=[self.thickness] * len(points),
+                wireframe=True,
+            )
+        )
+        self._static_lines = []
+
+    def line(self, start, end):
+        return self._add(sc.Line(start, end, thickness=self.thickness, color=self.color))
+
+    def static_line(self, start, end):
+        """The line without gestures. In the batched mode, it's merged with the other lines and None is returned."""
+        if not self._batched:
+            return self.line(start, end)
+        self._static_lines.append((start, end))
+        return None
+
+    def curve(self, points):
+        return self._add(
+            sc.Curve(points, curve_type=sc.Curve.CurveType.LINEAR, thicknesses=[self.thickness], colors=[self.color])
+        )
+
+    def arrows(self, transforms, mesh):
+        """The arrows, they are hidden until the hover. In the batched mode, all the arrows are the mesh."""
+        if self._batched:
+            points, vertex_counts, vertex_indices = mesh
+            colors = [self.color] * len(points)
+            return [self._add(sc.PolygonMesh(points, colors, vertex_counts, vertex_indices, visible=False))]
+
+        arrows = []
+        for arrow_transform in transforms:
+            with self._add(sc.Transform(transform=arrow_transform)):
+                arrows.append(
+                    self._add(sc.PolygonMesh(ARROW_P, self._arrow_colors, ARROW_VC, ARROW_VI, visible=False))
+                )
+        return arrows
+
+    def rectangles(self, transforms, size):
+        """The transparent rectangles, they get the color on the hover"""
+        rectangles = []
+        for rectangle_transform in transforms:
+            with self._add(sc.Transform(transform=rectangle_transform)):
+                rectangles.append(self._add(sc.Rectangle(size, size, color=0x0)))
+        return rectangles
+
+    def hover(self, highlight, reveal=(), colorize=()):
+        """The hover gesture that makes the shapes thick, the hidden shapes visible and the rectangles colored"""
+
+        def set_hovered(hovered):
+            for shape in highlight:
+                if shape is None:
+                    # merged into the batched lines
+                    continue
+                thickness = self.hover_thickness if hovered else self.thickness
+                if isinstance(shape, sc.Curve):
+                    shape.thicknesses = [thickness]
+                else:
+                    shape.thickness = thickness
+            for shape in reveal:
+                shape.visible = hovered
+            for shape in colorize:
+                shape.color = self.color if hovered else 0x0
+
+        return sc.HoverGesture(
+            on_began_fn=lambda sender: set_hovered(True), on_ended_fn=lambda sender: set_hovered(False)
+        )
+
+    def drag(self, bindings, preserve_power=False):
+        """The drag gesture that changes the attributes of the DragBindings"""
+        return _DragGesture(self._manipulator, self._handles, bindings, preserve_power)
+
+
 class _DragGesture(sc.DragGesture):
     """"Gesture to disable rectangle selection in the viewport legacy"""
-    def __init__(self, manipulator, orientation, flag):
+    def __init__(self, manipulator, handles, bindings, preserve_power=False):
         super().__init__()
         self._manipulator = manipulator
+        # the handles of the light the gesture is attached to
+        self._handles = handles
         # record this _previous_ray_point to get the mouse moved vector
         self._previous_ray_point = None
-        # this defines the orientation of the move, 0 means x, 1 means y, 2 means z. It's a list so that we can move a selection
-        self.orientations = orientation
-        # global flag to indicate if the manipulator changes all the width, height and intensity, rectangle manipulator
-        # in the example
-        self.is_global = len(self.orientations) > 1
-        # this defines the negative or positive of the move. E.g. when we move the positive x line to the right, it
-        # enlarges the width, and when we move the negative line to the left, it also enlarges the width
-        # 1 means positive and -1 means negative. It's a list so that we can reflect list orientation
-        self.flag = flag
+        # True between on_began and on_ended, or until the drag is canceled
+        self._active = False
+        # the DragBindings that say how the move changes the attributes. E.g. when we move the positive x line to
+        # the right, it enlarges the width, and when we move the negative line to the left, it also enlarges the
+        # width
+        self.bindings = bindings
+        # when the size of the light changes, the intensity is changed so that the light keeps the same power,
+        # rectangle manipulator in the example
+        self.preserve_power = preserve_power
 
     def on_began(self):
         # When the user drags the slider, we don't want to see the selection
@@ -100,235 +221,231 @@ class _DragGesture(sc.DragGesture):
         # initialize the self._previous_ray_point
         self._previous_ray_point = self.gesture_payload.ray_closest_point
 
-        # record the previous value for the model
+        # record the previous value for the model. The drag is applied to all the lights the model tracks that have
+        # the dragged attributes, the previous values are used to compute the values of every light and later for
+        # running omni.kit.commands
         self.model = self._manipulator.model
-        if 0 in self.orientations:
-            self.width_item = self.model.width
-            self._manipulator.model.set_item_value(self.width_item, self.model.get_as_floats(self.width_item))
-        if 1 in self.orientations:
-            self.height_item = self.model.height
-            self._manipulator.model.set_item_value(self.height_item, self.model.get_as_floats(self.height_item))
-        if 2 in self.orientations or self.is_global:
-            self.intensity_item = self.model.intensity
-            self._manipulator.model.set_item_value(self.intensity_item, self.model.get_as_floats(self.intensity_item))
+        self.light_items = self._handles.light_items
+        self.targets = self.model.get_light_items()
+        for light_items in self.targets:
+            for name in light_items.shape.attributes:
+                item = light_items.get_item(name)
+                self.model.set_item_value(item, self.model.get_as_floats(item))
+
+        # the lengths of the dragged attributes, the move changes them
+        shape = self.light_items.shape
+        self.lengths = {
+            binding.name: shape.attributes[binding.name].to_length(self.light_items.get_item(binding.name).value)
+            for binding in self.bindings
+        }
+
+        # the values written by the last on_changed
+        self.item_values = []
+        self._active = True
+
+        # the writes of the drag can go to a scratch layer
+        self.model.begin_live_edit()
+
+    def process(self):
+        if self.state == sc.GestureState.CANCELED and self._active:
+            self._on_canceled()
+        super().process()
+
+    def _on_canceled(self):
+        self._active = False
+        # This re-enables the selection in the Viewport Legacy
+        self.__disable_selection = None
+
+        self.model.discard_pending_floats()
+        if not self.model.end_live_edit():
+            # The writes are in the edit target, put back the values from on_began
+            self.model.set_floats_batch([(item, item.value) for item, _ in self.item_values])
+        # the ui of the dragged light shows the values before the drag
+        self._manipulator._build_shape(self._handles)
 
     def on_changed(self):
         object_ray_point = self.gesture_payload.ray_closest_point
         # calculate the ray moved vector
         moved = [a - b for a, b in zip(object_ray_point, self._previous_ray_point)]
         # transfer moved from world to object space, [0] to make it a normal, not point
-        moved = self._manipulator._x_xform.transform_space(sc.Space.WORLD, sc.Space.OBJECT, moved + [0])
-        # 2.0 because `_shape_xform.transform` is a scale matrix and it means
-        # the width of the rectangle is twice the scale matrix.
-        moved_x = moved[0] * 2.0 * self.flag[0]
-        moved_y = moved[1] * 2.0 * (self.flag[1] if self.is_global else self.flag[0])
-        moved_z = moved[2] * self.flag[0]
+        moved = self._handles.x_xform.transform_space(sc.Space.WORLD, sc.Space.OBJECT, moved + [0])
+        # some directions depend on where the handle is grabbed, e.g. the radius of the circle
+        point = self._handles.x_xform.transform_space(sc.Space.WORLD, sc.Space.OBJECT, list(object_ray_point) + [1])
 
         # update the self._previous_ray_point
         self._previous_ray_point = object_ray_point
 
-        # since self._shape_xform.transform = [x, 0, 0, 0, 0, y, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]
-        # when we want to update the manipulator, we are actually updating self._manipulator._shape_xform.transform[0]
-        # for width and self._manipulator._shape_xform.transform[5] for height and
-        # self._manipulator._shape_xform.transform[10] for intensity
-        width = self._manipulator._shape_xform.transform[0]
-        height = self._manipulator._shape_xform.transform[5]
-        intensity = self._manipulator._shape_xform.transform[10]
-
-        self.width_new = width + moved_x
-        self.height_new = height + moved_y
-
-        # update the USD as well as update the ui
-        if 0 in self.orientations:
-            # update the data in the model
-            self.model.set_floats(self.width_item, self.width_new)
-            self._manipulator._shape_xform.transform[0] = self.width_new
-        if 1 in self.orientations:
-            # update the data in the model
-            self.model.set_floats(self.height_item, self.height_new)
-            self._manipulator._shape_xform.transform[5] = self.height_new
-        if 2 in self.orientations:
-            self._manipulator._shape_xform.transform[10] += moved_z
-            self.intensity_new = self._manipulator._shape_xform.transform[10] * INTENSITY_SCALE
-            self.model.set_floats(self.intensity_item, self.intensity_new)
-        if self.is_global:
-            # need to update the intensity in a different way
-            intensity_new = intensity * width * height / (self.width_new * self.height_new)
-            self._manipulator._shape_xform.transform[10] = intensity_new
-            self.intensity_new = intensity_new * INTENSITY_SCALE
-            self.model.set_floats(self.intensity_item, self.intensity_new)
+        for binding in self.bindings:
+            self.lengths[binding.name] += binding.get_delta(moved[:3], point[:3])
+
+        # The change of the dragged light relative to the beginning of the drag. It's applied to every light.
+        shape = self.light_items.shape
+        deltas = {
+            name: shape.attributes[name].from_length(length) - self.light_items.get_item(name).value
+            for name, length in self.lengths.items()
+        }
+
+        self.item_values = []
+        for light_items in self.targets:
+            start_values = {name: light_items.get_item(name).value for name in light_items.shape.attributes}
+            # the intensity is changed in a different way, so that the light keeps the same power
+            values = light_items.shape.get_dragged_values(start_values, deltas, self.preserve_power)
+            if not values:
+                continue
+
+            self.item_values += [(light_items.get_item(name), value) for name, value in values.items()]
+            if light_items is self.light_items:
+                # update the ui of the dragged light
+                self._handles.set_values(values)
+
+        # update the USD of all the lights at once. Mouse moves can come faster than the app updates, so the
+        # values can be accumulated and written once per update
+        if carb.settings.get_settings().get(SETTING_COALESCE_DRAG_WRITES):
+            self.model.set_floats_deferred(self.item_values)
+        else:
+            self.model.set_floats_batch(self.item_values)
 
     def on_ended(self):
+        if not self._active:
+            return
+        self._active = False
+
         # This re-enables the selection in the Viewport Legacy
         self.__disable_selection = None
 
-        if self.is_global:
-            # start group command
-            omni.kit.undo.begin_group()
-        if 0 in self.orientations:
-            self.model.set_floats_commands(self.width_item, self.width_new)
-        if 1 in self.orientations:
-            self.model.set_floats_commands(self.height_item, self.height_new)
-        if 2 in self.orientations or self.is_global:
-            self.model.set_floats_commands(self.intensity_item, self.intensity_new)
-        if self.is_global:
-            # end group command
-            omni.kit.undo.end_group()
+        # The commands write the final values, the deferred ones and the scratch layer are not needed anymore
+        self.model.discard_pending_floats()
+        self.model.end_live_edit()
+
+        # one undo group for all the lights and attributes
+        self.model.set_floats_commands_batch(self.item_values)
 
 
 class LightManipulator(sc.Manipulator):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self._shape_xform = None
+        # The handles of every light, the key is the prim path
+        self._handles = {}
+        # All the handles built since the last on_build, by LightShape. When the selection changes, they are
+        # retargeted to the new lights and the handles that are not needed are hidden.
+        self._handle_pool = {}
+        # The container of all the handles
+        self._root = None
 
     def __del__(self):
         self.model = None
 
-    def _build_shape(self):
+    def _build_shape(self, handles):
         if not self.model:
             return
-        if self.model.width and self.model.height and self.model.intensity:
-            x = self.model.get_as_floats(self.model.width)
-            y = self.model.get_as_floats(self.model.height)
-            # this INTENSITY_SCALE is too make the transform a reasonable length with large intensity number
-            z = self.model.get_as_floats(self.model.intensity) / INTENSITY_SCALE
-            self._shape_xform.transform = [x, 0, 0, 0, 0, y, 0, 0, 0, 0, z, 0, 0, 0, 0, 1]
+        light_items = handles.light_items
+        if light_items.shape:
+            handles.set_values(
+                {name: self.model.get_as_floats(light_items.get_item(name)) for name in light_items.shape.attributes}
+            )
 
     def on_build(self):
         """Called when the model is changed and rebuilds the whole slider"""
+        self._handles = {}
+        self._handle_pool = {}
+        self._root = None
+
         model = self.model
         if not model:
             return
 
-        # if we don't have selection then just return
+        self._root = sc.Transform()
+        self._retarget()
+
+    def _retarget(self):
+        """Shows one set of handles per light. The handles of the previous selection are reused, new ones are built"""
+        self._handles = {}
+
+        # if we don't have selection then just hide everything
+        model = self.model
         prim_path_item = model.prim_path
         prim_path = prim_path_item.value if prim_path_item else None
-        if not prim_path:
+        all_light_items = model.get_light_items() if prim_path else []
+        # All the transforms at once
+        transforms = model.get_transforms(all_light_items)
+
+        used = {}
+        for light_items, transform in zip(all_light_items, transforms):
+            pool = self._handle_pool.setdefault(light_items.shape, [])
+            index = used.get(light_items.shape, 0)
+            used[light_items.shape] = index + 1
+
+            if index < len(pool):
+                # Only the transforms are changed, the shapes and the gestures are kept
+                handles = pool[index]
+                handles.light_items = light_items
+                handles.root_xf.transform = transform
+                self._build_shape(handles)
+                handles.root_xf.visible = True
+            else:
+                handles = _LightHandles(light_items)
+                with self._root:
+                    self._build_handles(handles)
+                pool.append(handles)
+
+            self._handles[light_items.prim_path.value] = handles
+
+        for shape, pool in self._handle_pool.items():
+            for handles in pool[used.get(shape, 0) :]:
+                handles.root_xf.visible = False
+
+    def _build_handles(self, handles):
+        """Builds the transforms, the shapes and the gestures of a single light"""
+        model = self.model
+        shape = handles.light_items.shape
+        if not shape:
             return
 
-        # Style settings, as kwargs
-        thickness = 1
-        hover_thickness = 3
-        color = cl.yellow
-        shape_style = {"thickness": thickness, "color": color}
-
-        def set_thickness(sender, shapes, thickness):
-            for shape in shapes:
-                shape.thickness = thickness
-
-        self.__root_xf = sc.Transform(model.get_as_floats(model.transform))
-        with self.__root_xf:
-            self._x_xform = sc.Transform()
-            with self._x_xform:
-                self._shape_xform = sc.Transform()
-                # Build the shape's transform
-                self._build_shape()
-                with self._shape_xform:
-                    # Build the shape geomtery as unit-sized
-                    h = 0.5
-                    z = -1.0
-                    # the rectangle
-                    shape1 = sc.Line((-h, h, 0), (h, h, 0), **shape_style)
-                    shape2 = sc.Line((-h, -h, 0), (h, -h, 0), **shape_style)
-                    shape3 = sc.Line((h, h, 0), (h, -h, 0), **shape_style)
-                    shape4 = sc.Line((-h, h, 0), (-h, -h, 0), **shape_style)
-                    # add gesture to the lines of the rectangle to update width or height of the light
-                    vertical_hover_gesture = sc.HoverGesture(
-                        on_began_fn=lambda sender: set_thickness(sender, [shape1, shape2], hover_thickness),
-                        on_ended_fn=lambda sender: set_thickness(sender, [shape1, shape2], thickness),
-                    )
-                    shape1.gestures = [_DragGesture(self, [1], [1]), vertical_hover_gesture]
-                    shape2.gestures = [_DragGesture(self, [1], [-1]), vertical_hover_gesture]
-
-                    horizontal_hover_gesture = sc.HoverGesture(
-                        on_began_fn=lambda sender: set_thickness(sender, [shape3, shape4], hover_thickness),
-                        on_ended_fn=lambda sender: set_thickness(sender, [shape3, shape4], thickness),
-                    )
-                    shape3.gestures = [_DragGesture(self, [0], [1]), horizontal_hover_gesture]
-                    shape4.gestures = [_DragGesture(self, [0], [-1]), horizontal_hover_gesture]
-
-                    # create z-axis to indicate the intensity
-                    z1 = sc.Line((h, h, 0), (h, h, z), **shape_style)
-                    z2 = sc.Line((-h, -h, 0), (-h, -h, z), **shape_style)
-                    z3 = sc.Line((h, -h, 0), (h, -h, z), **shape_style)
-                    z4 = sc.Line((-h, h, 0), (-h, h, z), **shape_style)
-
-                    def make_arrow(translate):
-                        vert_count = len(ARROW_VI)
-                        with sc.Transform(
-                            transform=sc.Matrix44.get_translation_matrix(translate[0], translate[1], translate[2])
-                            * sc.Matrix44.get_rotation_matrix(0, -180, 0, True)
-                        ):
-                            return sc.PolygonMesh(ARROW_P, [color] * vert_count, ARROW_VC, ARROW_VI, visible=False)
-
-                    # arrows on the z-axis
-                    arrow_1 = make_arrow((h, h, z))
-                    arrow_2 = make_arrow((-h, -h, z))
-                    arrow_3 = make_arrow((h, -h, z))
-                    arrow_4 = make_arrow((-h, h, z))
-
-                    # the line underneath the arrow which is where the gesture applies
-                    z1_arrow = sc.Line((h, h, z), (h, h, z - ARROW_HEIGHT), **shape_style)
-                    z2_arrow = sc.Line((-h, -h, z), (-h, -h, z - ARROW_HEIGHT), **shape_style)
-                    z3_arrow = sc.Line((h, -h, z), (h, -h, z - ARROW_HEIGHT), **shape_style)
-                    z4_arrow = sc.Line((-h, h, z), (-h, h, z - ARROW_HEIGHT), **shape_style)
-
-                    def set_visible(sender, shapes, thickness, arrows, visible):
-                        set_thickness(sender, shapes, thickness)
-                        for arrow in arrows:
-                            arrow.visible = visible
-
-                    thickness_group = [z1, z1_arrow, z2, z2_arrow, z3, z3_arrow, z4, z4_arrow]
-                    visible_group = [arrow_1, arrow_2, arrow_3, arrow_4]
-                    visible_arrow_gesture = sc.HoverGesture(
-                        on_began_fn=lambda sender: set_visible(sender, thickness_group, hover_thickness, visible_group, True),
-                        on_ended_fn=lambda sender: set_visible(sender, thickness_group, thickness, visible_group, False),
-                    )
-                    gestures = [_DragGesture(self, [2], [-1]), visible_arrow_gesture]
-                    z1_arrow.gestures = gestures
-                    z2_arrow.gestures = gestures
-                    z3_arrow.gestures = gestures
-                    z4_arrow.gestures = gestures
-
-                    # create 4 rectangles at the corner, and add gesture to update width, height and intensity at the same time
-                    s = 0.03
-
-                    def make_corner_rect(translate):
-                        with sc.Transform(transform=sc.Matrix44.get_translation_matrix(translate[0], translate[1], translate[2])):
-                            return sc.Rectangle(s, s, color=0x0)
-
-                    r1 = make_corner_rect((h - 0.5 * s, -h + 0.5 * s, 0))
-                    r2 = make_corner_rect((h - 0.5 * s, h - 0.5 * s, 0))
-                    r3 = make_corner_rect((-h + 0.5 * s, h - 0.5 * s, 0))
-                    r4 = make_corner_rect((-h + 0.5 * s, -h + 0.5 * s, 0))
-
-                    def set_color_and_visible(sender, shapes, thickness, arrows, visible, rects, color):
-                        set_visible(sender, shapes, thickness, arrows, visible)
-                        for rect in rects:
-                            rect.color = color
-
-                    highlight_group = [shape1, shape2, shape3, shape4] + thickness_group
-                    color_group = [r1, r2, r3, r4]
-                    hight_all_gesture = sc.HoverGesture(
-                        on_began_fn=lambda sender: set_color_and_visible(sender, highlight_group, hover_thickness, visible_group, True, color_group, color),
-                        on_ended_fn=lambda sender: set_color_and_visible(sender, highlight_group, thickness, visible_group, False, color_group, 0x0),
-                    )
-                    r1.gestures = [_DragGesture(self, [0, 1], [1, -1]), hight_all_gesture]
-                    r2.gestures = [_DragGesture(self, [0, 1], [1, 1]), hight_all_gesture]
-                    r3.gestures = [_DragGesture(self, [0, 1], [-1, 1]), hight_all_gesture]
-                    r4.gestures = [_DragGesture(self, [0, 1], [-1, -1]), hight_all_gesture]
+        handles.root_xf = sc.Transform(model.get_as_floats(handles.light_items.transform))
+        with handles.root_xf:
+            handles.x_xform = sc.Transform()
+            with handles.x_xform:
+                # The shape builds its handles from the unit-sized geometry
+                builder = _HandleBuilder(self, handles, carb.settings.get_settings().get(SETTING_BATCH_HANDLES))
+                shape.build(builder)
+        handles.item_count = len(builder.items) + 2
+        # Only the shapes have gestures, the transforms are containers
+        handles.hit_target_count = sum(
+            1 for item in builder.items if isinstance(item, sc.AbstractShape) and item.gestures
+        )
+        # Scale the shape's transforms
+        self._build_shape(handles)
+
+    def get_stats(self):
+        """Returns the number of scene items and hit targets of all the handles, useful for profiling"""
+        all_handles = [handles for pool in self._handle_pool.values() for handles in pool]
+        return {
+            "items": sum(handles.item_count for handles in all_handles),
+            "hit_targets": sum(handles.hit_target_count for handles in all_handles),
+        }
 
     def on_model_updated(self, item):
         # Regenerate the mesh
         if not self.model:
             return
 
-        if item == self.model.transform:
+        if item == self.model.prim_path:
+            if self._root and carb.settings.get_settings().get(SETTING_RETAIN_HANDLES):
+                # If the selected lights changed, move the handles to the new lights
+                self._retarget()
+            else:
+                # If the selected lights changed, redraw everything
+                self.invalidate()
+            return
+
+        light_items = getattr(item, "light_items", None)
+        handles = self._handles.get(light_items.prim_path.value) if light_items else None
+        if not handles:
+            return
+
+        if item == light_items.transform:
             # If transform changed, update the root transform
-            self.__root_xf.transform = self.model.get_as_floats(item)
-        elif item == self.model.prim_path:
-            # If prim_path or width or height or intensity changed, redraw everything
-            self.invalidate()
-        elif item == self.model.width or item == self.model.height or item == self.model.intensity:
+            handles.root_xf.transform = self.model.get_as_floats(item)
+        elif item in light_items.attributes:
             # Interpret None as changing multiple light shape settings
-            self._build_shape()
+            self._build_shape(handles)
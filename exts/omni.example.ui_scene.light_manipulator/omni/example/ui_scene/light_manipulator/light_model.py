@@ -10,12 +10,32 @@ __all__ = ["LightModel"]
 
 import carb
 from omni.ui import scene as sc
+import omni.kit.app
+import omni.kit.commands
+import omni.timeline
 import omni.usd
 
-from pxr import Usd, UsdGeom, UsdLux, Tf, Gf
+from pxr import Usd, UsdGeom, Tf, Gf, Sdf
 
+from .light_shapes import get_light_shape
 
-def _flatten_matrix(matrix: Gf.Matrix4d):
+# When enabled, the model tracks every selected light, not only the first one
+SETTING_MULTI_SELECTION = "/exts/omni.example.ui_scene.light_manipulator/multiSelection"
+# When enabled, the values of a drag are written to USD at most once per app update
+SETTING_COALESCE_DRAG_WRITES = "/exts/omni.example.ui_scene.light_manipulator/coalesceDragWrites"
+# When enabled, the model shows and edits the values at the current time of the timeline
+SETTING_FOLLOW_TIMELINE = "/exts/omni.example.ui_scene.light_manipulator/followTimeline"
+# When enabled, the edits author a time sample at the current time even if the attribute is not animated
+SETTING_AUTHOR_TIME_SAMPLES = "/exts/omni.example.ui_scene.light_manipulator/authorTimeSamples"
+# When enabled, the manipulator keeps its handles when the selection changes and retargets them to the new lights
+SETTING_RETAIN_HANDLES = "/exts/omni.example.ui_scene.light_manipulator/retainHandles"
+# When enabled, the manipulator merges the lines without gestures and the arrows into a few meshes
+SETTING_BATCH_HANDLES = "/exts/omni.example.ui_scene.light_manipulator/batchHandles"
+# When enabled, the writes of a drag go to an anonymous sublayer of the session layer until the drag ends
+SETTING_SCRATCH_LAYER_DRAGS = "/exts/omni.example.ui_scene.light_manipulator/scratchLayerDrags"
+
+
+def _flatten_matrix_items(matrix: Gf.Matrix4d):
     m0, m1, m2, m3 = matrix[0], matrix[1], matrix[2], matrix[3]
     return [
         m0[0],
@@ -37,6 +57,34 @@ def _flatten_matrix(matrix: Gf.Matrix4d):
     ]
 
 
+def _flatten_matrix_buffer(matrix: Gf.Matrix4d):
+    # Gf.Matrix4d exposes its 16 doubles with the buffer protocol, tolist converts them all in C
+    return memoryview(matrix).cast("B").cast("d").tolist()
+
+
+def _flatten_matrices_buffer(matrices):
+    """Flattens many matrices with a single conversion, useful when many lights are tracked"""
+    buffer = bytearray()
+    for matrix in matrices:
+        buffer += memoryview(matrix).cast("B")
+    values = memoryview(buffer).cast("d").tolist()
+    return [values[i : i + 16] for i in range(0, len(values), 16)]
+
+
+def _flatten_matrices_items(matrices):
+    return [_flatten_matrix_items(matrix) for matrix in matrices]
+
+
+# Old builds of USD don't have the buffer protocol on Gf.Matrix4d
+try:
+    _flatten_matrix_buffer(Gf.Matrix4d())
+    _flatten_matrix = _flatten_matrix_buffer
+    _flatten_matrices = _flatten_matrices_buffer
+except (TypeError, ValueError):
+    _flatten_matrix = _flatten_matrix_items
+    _flatten_matrices = _flatten_matrices_items
+
+
 class LightModel(sc.AbstractManipulatorModel):
     """
     User part. The model tracks the attributes of the selected light.
@@ -68,28 +116,138 @@ class LightModel(sc.AbstractManipulatorModel):
             super().__init__()
             self.value = value
 
+    class LightItems:
+        """
+        The items of a single selected light. Every item keeps a reference back to
+        its LightItems, so the model knows which light to read or write.
+        """
+
+        def __init__(self):
+            self.light = None
+            # The LightShape of the light, it tells which of the float items the light has
+            self.shape = None
+            self.prim_path = LightModel.StringItem()
+            self.transform = LightModel.MatrixItem()
+            self.intensity = LightModel.FloatItem()
+            self.width = LightModel.FloatItem()
+            self.height = LightModel.FloatItem()
+            self.radius = LightModel.FloatItem()
+            self.length = LightModel.FloatItem()
+            self.angle = LightModel.FloatItem()
+
+            for item in (
+                self.prim_path,
+                self.transform,
+                self.intensity,
+                self.width,
+                self.height,
+                self.radius,
+                self.length,
+                self.angle,
+            ):
+                item.light_items = self
+
+            # The attribute name to item, the item to attribute and the item to attribute query, they are filled
+            # when the light is set
+            self.attribute_items = {}
+            self.attributes = {}
+            self.queries = {}
+            # The items that can change when the time changes, None when it's not known yet
+            self.time_varying_items = None
+
+        def set_light(self, light):
+            """Sets the light the items represent"""
+            self.light = light
+            self.time_varying_items = None
+            self.shape = get_light_shape(light.GetPrim()) if light else None
+            if self.shape:
+                self.prim_path.value = light.GetPath().pathString
+                self.attributes = {
+                    getattr(self, name): binding.get_attribute(light) for name, binding in self.shape.attributes.items()
+                }
+                self.attribute_items = {attr.GetName(): item for item, attr in self.attributes.items()}
+                self.queries = {item: Usd.AttributeQuery(attr) for item, attr in self.attributes.items()}
+            else:
+                self.prim_path.value = ""
+                self.attribute_items = {}
+                self.attributes = {}
+                self.queries = {}
+
+        def get_item(self, name):
+            """Returns the item of the attribute with the given name of the LightShape"""
+            return getattr(self, name)
+
+        def update_query(self, item):
+            """
+            Recreates the query of the item. AttributeQuery keeps where the value is authored, it's stale when the
+            attribute gets new opinions or time samples.
+            """
+            query = self.queries.get(item)
+            if query:
+                self.queries[item] = Usd.AttributeQuery(query.GetAttribute())
+            self.time_varying_items = None
+
     def __init__(self):
         super().__init__()
 
-        self.prim_path = LightModel.StringItem()
-        self.transform = LightModel.MatrixItem()
-        self.intensity = LightModel.FloatItem()
-        self.width = LightModel.FloatItem()
-        self.height = LightModel.FloatItem()
+        # The items of the model are the items of the primary (first selected) light
+        self._primary = LightModel.LightItems()
+        self.prim_path = self._primary.prim_path
+        self.transform = self._primary.transform
+        self.intensity = self._primary.intensity
+        self.width = self._primary.width
+        self.height = self._primary.height
+        self.radius = self._primary.radius
+        self.length = self._primary.length
+        self.angle = self._primary.angle
 
         # Save the UsdContext name (we currently only work with single Context)
         self._usd_context_name = ""
 
-        # Current selection
-        self._light = None
+        # The time code of the timeline, it's updated by the timeline events
+        self._timeline = omni.timeline.get_timeline_interface()
+        self._timecode = self._get_timeline_timecode()
+
+        # Current selection. The pool keeps the items of the lights that were selected before, so
+        # that we don't create new items on every selection change. The primary light is always first.
+        self._light_pool = [self._primary]
+        self._light_items = []
+        self._items_by_path = {}
         self._stage_listener = None
 
+        # The paths of the tracked lights and all their parents, mapped to the lights under them. Tf.Notice
+        # paths are looked up here, so the changes anywhere else in the stage cost a single set lookup.
+        self._ancestor_index = {}
+
+        # The world transforms of the tracked lights. The flattened matrices are kept until a Tf.Notice says the
+        # transform of the light or one of its parents is changed, and the XformCache keeps the matrices of the
+        # parents, so the transforms of the lights under the same parent are computed only once.
+        self._xform_cache = UsdGeom.XformCache(self._time)
+        self._world_transforms = {}
+        self._stats = {"xform_cache_hits": 0, "xform_cache_misses": 0, "usd_writes": 0, "notices": 0}
+
+        # The values that are not written to USD yet, they are flushed on the next app update
+        self._pending_values = {}
+        self._update_sub = None
+
+        # The anonymous sublayer of the session layer the writes of the drags go to. It's added on the first drag
+        # and kept, adding and removing a sublayer recomposes the whole stage.
+        self._scratch_layer = None
+        # The attributes written to the scratch layer during the current drag, None when the writes go to the edit
+        # target
+        self._scratch_paths = None
+
         # Track selection change
         self._events = self._usd_context.get_stage_event_stream()
         self._stage_event_sub = self._events.create_subscription_to_pop(
             self._on_stage_event, name="Light Manipulator Selection Change"
         )
 
+        # Track time change
+        self._timeline_event_sub = self._timeline.get_timeline_event_stream().create_subscription_to_pop(
+            self._on_timeline_event, name="Light Manipulator Time Change"
+        )
+
     def __del__(self):
         self._invalidate_object()
 
@@ -104,46 +262,133 @@ class LightModel(sc.AbstractManipulatorModel):
 
     @property
     def _time(self):
+        if not carb.settings.get_settings().get(SETTING_FOLLOW_TIMELINE):
+            return Usd.TimeCode.Default()
+        return self._timecode
+
+    def _get_timeline_timecode(self):
+        """Returns the current time of the timeline in time codes"""
+        return Usd.TimeCode(self._timeline.get_current_time() * self._timeline.get_time_codes_per_seconds())
+
+    def _get_edit_time(self, item):
+        """Returns the time the value of the item should be authored at"""
+        time = self._time
+        if time.IsDefault():
+            return time
+
+        # Animated attributes get a new time sample, otherwise the edit is not visible at the current time
+        query = item.light_items.queries.get(item)
+        if carb.settings.get_settings().get(SETTING_AUTHOR_TIME_SAMPLES) or (query and query.GetNumTimeSamples() > 0):
+            return time
         return Usd.TimeCode.Default()
 
+    def get_light_items(self):
+        """Returns the items of all the tracked lights, the primary light first"""
+        return self._light_items
+
+    def get_stats(self):
+        """Returns the counters of the model, useful for profiling"""
+        return dict(self._stats)
+
+    def _invalidate_transforms(self, path: Sdf.Path):
+        """Forgets the world transforms of the lights under the given path, the path is in the ancestor index"""
+        for light_path in [light_path for light_path in self._world_transforms if light_path.HasPrefix(path)]:
+            del self._world_transforms[light_path]
+        # XformCache can't forget a subtree, it caches the parents of the lights and all of them can be stale. It's
+        # cleared even if no light has a cached transform, the next get_transforms must not read the old parents.
+        self._xform_cache.Clear()
+
+    def _add_to_index(self, light_path: Sdf.Path):
+        """Adds the light and all its parents to the ancestor index"""
+        for path in [Sdf.Path.absoluteRootPath] + light_path.GetPrefixes():
+            self._ancestor_index.setdefault(path, set()).add(light_path)
+
+    def _remove_from_index(self, light_path: Sdf.Path):
+        """Removes the light and all its parents from the ancestor index"""
+        for path in [Sdf.Path.absoluteRootPath] + light_path.GetPrefixes():
+            light_paths = self._ancestor_index.get(path)
+            if light_paths is None:
+                continue
+            light_paths.discard(light_path)
+            if not light_paths:
+                del self._ancestor_index[path]
+
+    def _property_changed(self, path: Sdf.Path, light_paths, changed_items):
+        """Collects the items affected by the change of the property of a light or of one of its parents"""
+        prim_path = path.GetPrimPath()
+        if UsdGeom.Xformable.IsTransformationAffectedByAttrNamed(path.name):
+            # Update on any parent transformation changes too
+            self._invalidate_transforms(prim_path)
+            for light_path in light_paths:
+                light_items = self._items_by_path[light_path]
+                light_items.time_varying_items = None
+                changed_items.add(light_items.transform)
+            return
+
+        light_items = self._items_by_path.get(prim_path)
+        if not light_items:
+            return
+
+        item = light_items.attribute_items.get(path.name)
+        if item:
+            light_items.update_query(item)
+            changed_items.add(item)
+
     def _notice_changed(self, notice, stage):
         """Called by Tf.Notice. When USD data changes, we update the ui"""
-        light_path = self.prim_path.value
-        if not light_path:
+        self._stats["notices"] += 1
+        if not self._light_items:
             return
 
         changed_items = set()
-        for p in notice.GetChangedInfoOnlyPaths():
-            prim_path = p.GetPrimPath().pathString
-            if prim_path != light_path:
-                # Update on any parent transformation changes too
-                if light_path.startswith(prim_path):
-                    if UsdGeom.Xformable.IsTransformationAffectedByAttrNamed(p.name):
-                        changed_items.add(self.transform)
+        lost_light = False
+        for p in notice.GetResyncedPaths():
+            # The index has the lights and all their parents, anything else doesn't affect the lights
+            light_paths = self._ancestor_index.get(p.GetPrimPath())
+            if not light_paths:
                 continue
 
-            if UsdGeom.Xformable.IsTransformationAffectedByAttrNamed(p.name):
-                changed_items.add(self.transform)
-            elif self.width and p.name == "width":
-                changed_items.add(self.width)
-            elif self.height and p.name == "height":
-                changed_items.add(self.height)
-            elif self.intensity and p.name == "intensity":
-                changed_items.add(self.intensity)
+            if p.IsPropertyPath():
+                # A property is added or removed
+                self._property_changed(p, light_paths, changed_items)
+                continue
+
+            # The light or one of its parents is recomposed, everything of the light can be changed
+            self._invalidate_transforms(p)
+            for light_path in list(light_paths):
+                light_items = self._items_by_path[light_path]
+                prim = stage.GetPrimAtPath(light_path)
+                shape = get_light_shape(prim)
+                if not shape:
+                    lost_light = True
+                    continue
+                if shape is not light_items.shape:
+                    # The type of the light is changed, the manipulator needs different handles
+                    changed_items.add(self.prim_path)
+                light_items.set_light(shape.light_type(prim))
+                changed_items.add(light_items.transform)
+                changed_items.update(light_items.attribute_items.values())
+
+        for p in notice.GetChangedInfoOnlyPaths():
+            light_paths = self._ancestor_index.get(p.GetPrimPath())
+            if light_paths and p.IsPropertyPath():
+                self._property_changed(p, light_paths, changed_items)
+
+        if lost_light:
+            # The light is removed or it's not a light anymore
+            self._on_kit_selection_changed()
 
         for item in changed_items:
             self._item_changed(item)
 
     def get_as_floats(self, item):
         """get the item value directly from USD"""
-        if item == self.transform:
-            return self._get_transform(self._time)
-        if item == self.intensity:
-            return self._get_intensity(self._time)
-        if item == self.width:
-            return self._get_width(self._time)
-        if item == self.height:
-            return self._get_height(self._time)
+        light_items = getattr(item, "light_items", None)
+        if light_items:
+            if item == light_items.transform:
+                return self._get_transform(light_items.light, self._time)
+            if item != light_items.prim_path:
+                return self._get_float(item, self._time)
 
         if item:
             # Get the value directly from the item
@@ -159,28 +404,48 @@ class LightModel(sc.AbstractManipulatorModel):
             return
 
         # we get the previous value from the model instead of USD
-        if item == self.height:
-            prev_value = self.height.value
-            if prev_value == value:
-                return
-            height_attr = self._light.GetHeightAttr()
-            omni.kit.commands.execute('ChangeProperty', prop_path=height_attr.GetPath(), value=value, prev=prev_value)
-        elif item == self.width:
-            prev_value = self.width.value
-            if prev_value == value:
-                return
-            width_attr = self._light.GetWidthAttr()
-            omni.kit.commands.execute('ChangeProperty', prop_path=width_attr.GetPath(), value=value, prev=prev_value)
-        elif item == self.intensity:
-            prev_value = self.intensity.value
-            if prev_value == value:
-                return
-            intensity_attr = self._light.GetIntensityAttr()
-            omni.kit.commands.execute('ChangeProperty', prop_path=intensity_attr.GetPath(), value=value, prev=prev_value)
+        prev_value = item.value
+        if prev_value == value:
+            return
+        attr = self._get_attribute(item)
+        if not attr:
+            return
+        omni.kit.commands.execute(
+            'ChangeProperty', prop_path=attr.GetPath(), value=value, prev=prev_value, timecode=self._get_edit_time(item)
+        )
 
         # This makes the manipulator updated
         self._item_changed(item)
 
+    def set_floats_commands_batch(self, item_values):
+        """
+        set the values of many items to USD using a single ChangeLightShape command. The items can
+        belong to different lights. All the changes are sent to Hydra at once.
+        """
+        changes = []
+        for item, value in item_values:
+            if not item or not value or item.value == value:
+                continue
+            attr = self._get_attribute(item)
+            if attr:
+                changes.append((item, value, attr))
+        if not changes:
+            return
+
+        # One command for all the lights, it's a single change and a single undo entry
+        omni.kit.commands.execute(
+            "ChangeLightShape",
+            prop_paths=[attr.GetPath() for _, _, attr in changes],
+            values=[value for _, value, _ in changes],
+            prev_values=[item.value for item, _, _ in changes],
+            timecodes=[self._get_edit_time(item) for item, _, _ in changes],
+            usd_context_name=self._usd_context_name,
+        )
+
+        # This makes the manipulator updated
+        for item, _, _ in changes:
+            self._item_changed(item)
+
     def set_item_value(self, item, value):
         """ This is used to set the model value instead of the usd. This is used to record previous value for
             omni.kit.commands """
@@ -199,37 +464,173 @@ class LightModel(sc.AbstractManipulatorModel):
         if pre_value == value:
             return
 
-        if item == self.height:
-            self._set_height(self._time, value)
-        elif item == self.width:
-            self._set_width(self._time, value)
-        elif item == self.intensity:
-            self._set_intensity(self._time, value)
+        self._set_float(item, self._get_edit_time(item), value)
+
+    def set_floats_batch(self, item_values):
+        """
+        set the values of many items directly to USD. The items can belong to different lights.
+        All the attributes are written in one Sdf.ChangeBlock, so Hydra and the Tf.Notice
+        listeners see a single change.
+        """
+        if not self._current_path:
+            return
+
+        with Sdf.ChangeBlock():
+            for item, value in item_values:
+                if not value or not item:
+                    continue
+                if self.get_as_floats(item) == value:
+                    continue
+                self._set_float(item, self._get_edit_time(item), value)
+
+    def begin_live_edit(self):
+        """
+        Called when a drag starts. When the scratchLayerDrags setting is on, the writes until end_live_edit go to an
+        anonymous sublayer of the session layer, so the layers of the edit target are not changed on every move.
+        """
+        if self._scratch_paths is not None or not carb.settings.get_settings().get(SETTING_SCRATCH_LAYER_DRAGS):
+            return
+
+        stage = self._usd_context.get_stage()
+        if not stage:
+            return
+
+        sublayers = stage.GetSessionLayer().subLayerPaths
+        if not self._scratch_layer or self._scratch_layer.identifier not in sublayers:
+            # The first drag on the stage. The strongest sublayer of the session layer, the drag is visible over the
+            # opinions of the edit target.
+            self._scratch_layer = Sdf.Layer.CreateAnonymous("light_manipulator_scratch")
+            sublayers.insert(0, self._scratch_layer.identifier)
+        self._scratch_paths = set()
+
+    def end_live_edit(self):
+        """
+        Called when a drag ends or is canceled. The attributes the drag wrote are removed from the scratch layer, the
+        layer stays in the session layer for the next drag. Returns True if the writes of the drag were in the
+        scratch layer, False if they are in the edit target.
+        """
+        paths = self._scratch_paths
+        if paths is None:
+            return False
+        self._scratch_paths = None
+
+        # Only the written attributes are removed, the stage recomposes just these properties
+        with Sdf.ChangeBlock():
+            for path in paths:
+                prim_spec = self._scratch_layer.GetPrimAtPath(path.GetPrimPath())
+                if prim_spec and path.name in prim_spec.properties:
+                    prim_spec.RemoveProperty(prim_spec.properties[path.name])
+        return True
+
+    def set_floats_deferred(self, item_values):
+        """
+        set the values of many items to USD on the next app update. When it's called many times during one
+        update, only the last value of every item is written, and everything is written in one Sdf.ChangeBlock.
+        """
+        for item, value in item_values:
+            self._pending_values[item] = value
+
+        if self._pending_values and not self._update_sub:
+            self._update_sub = (
+                omni.kit.app.get_app()
+                .get_update_event_stream()
+                .create_subscription_to_pop(self._on_update, name="Light Manipulator Deferred Write")
+            )
+
+    def flush_pending_floats(self):
+        """Writes the deferred values to USD now"""
+        item_values = list(self._pending_values.items())
+        self._pending_values = {}
+        if item_values:
+            self.set_floats_batch(item_values)
+
+    def discard_pending_floats(self):
+        """Forgets the deferred values, they are never written"""
+        self._pending_values = {}
+        self._update_sub = None
+
+    def _on_update(self, event):
+        """Called by update_event_stream when there are deferred values"""
+        if not self._pending_values:
+            # Nothing is changed during the last update, no need to be called every update
+            self._update_sub = None
+            return
+        self.flush_pending_floats()
 
     def _on_stage_event(self, event):
         """Called by stage_event_stream"""
         if event.type == int(omni.usd.StageEventType.SELECTION_CHANGED):
             self._on_kit_selection_changed()
 
+    def _on_timeline_event(self, event):
+        """Called by timeline_event_stream"""
+        if event.type not in (
+            int(omni.timeline.TimelineEventType.CURRENT_TIME_TICKED),
+            int(omni.timeline.TimelineEventType.CURRENT_TIME_CHANGED),
+        ):
+            return
+
+        timecode = self._get_timeline_timecode()
+        if timecode == self._timecode:
+            return
+        self._timecode = timecode
+
+        if not carb.settings.get_settings().get(SETTING_FOLLOW_TIMELINE):
+            return
+
+        # Only the animated values are changed, static lights cost nothing during the playback
+        changed_items = []
+        for light_items in self._light_items:
+            if light_items.time_varying_items is None:
+                light_items.time_varying_items = self._get_time_varying_items(light_items)
+            changed_items += light_items.time_varying_items
+
+        for item in changed_items:
+            self._item_changed(item)
+
+    def _get_time_varying_items(self, light_items):
+        """Returns the items of the light that can have a different value at a different time"""
+        items = [item for item, query in light_items.queries.items() if query.ValueMightBeTimeVarying()]
+
+        # The world transform is animated if the light or any of its parents is animated
+        prim = light_items.light.GetPrim()
+        while prim and not prim.IsPseudoRoot():
+            if self._xform_cache.TransformMightBeTimeVarying(prim):
+                items.append(light_items.transform)
+                break
+            prim = prim.GetParent()
+
+        return items
+
     def _invalidate_object(self, settings):
         # Revoke the Tf.Notice listener, we don't need to update anything
         if self._stage_listener:
             self._stage_listener.Revoke()
             self._stage_listener = None
 
+        # The deferred values belong to the lights that are not tracked anymore
+        self.discard_pending_floats()
+        self.end_live_edit()
+
         # Reset original Viewport gizmo line width
         settings.set("/persistent/app/viewport/gizmo/lineWidth", 0)
 
         # Clear any cached UsdLux.Light object
-        self._light = None
+        for light_items in self._light_pool:
+            light_items.set_light(None)
+        self._light_items = []
+        self._items_by_path = {}
+        self._ancestor_index = {}
+        self._world_transforms = {}
+        self._xform_cache.Clear()
 
         # Set the prim_path to empty
-        self.prim_path.value = ""
         self._item_changed(self.prim_path)
 
     def _on_kit_selection_changed(self):
         # selection change, reset it for now
-        self._light = None
+        for light_items in self._light_items:
+            light_items.light = None
 
         # Turn off any native selected light drawing
         settings = carb.settings.get_settings()
@@ -247,77 +648,139 @@ class LightModel(sc.AbstractManipulatorModel):
         if not prim_paths:
             return self._invalidate_object(settings)
 
-        prim = stage.GetPrimAtPath(prim_paths[0])
-        if prim and prim.IsA(UsdLux.RectLight):
-            self._light = UsdLux.RectLight(prim)
+        if not settings.get(SETTING_MULTI_SELECTION):
+            prim_paths = prim_paths[:1]
 
-        if not self._light:
+        lights = []
+        for prim_path in prim_paths:
+            prim = stage.GetPrimAtPath(prim_path)
+            shape = get_light_shape(prim)
+            if shape:
+                lights.append(shape.light_type(prim))
+
+        if not lights:
             return self._invalidate_object(settings)
 
-        selected_path = self._light.GetPrim().GetPath().pathString
-        if selected_path != self.prim_path.value:
-            self.prim_path.value = selected_path
+        previous_paths = [light_items.prim_path.value for light_items in self._light_items]
+
+        # Reuse the items of the previous selection
+        while len(self._light_pool) < len(lights):
+            self._light_pool.append(LightModel.LightItems())
+        self._light_items = self._light_pool[: len(lights)]
+        self._items_by_path = {}
+        for light_items, light in zip(self._light_items, lights):
+            light_items.set_light(light)
+            self._items_by_path[light.GetPath()] = light_items
+        for light_items in self._light_pool[len(lights) :]:
+            light_items.set_light(None)
+
+        # Update the ancestor index only with the lights that are added or removed
+        indexed_paths = self._ancestor_index.get(Sdf.Path.absoluteRootPath, set())
+        removed_paths = indexed_paths - self._items_by_path.keys()
+        added_paths = self._items_by_path.keys() - indexed_paths
+        for light_path in removed_paths:
+            self._remove_from_index(light_path)
+        for light_path in added_paths:
+            self._add_to_index(light_path)
+
+        # The notices of the lights that are not tracked are ignored, so their transforms can't be kept
+        for light_path in list(self._world_transforms):
+            if light_path not in self._items_by_path:
+                del self._world_transforms[light_path]
+        if removed_paths or added_paths:
+            # XformCache still has the parents of the removed lights, their changes are not seen anymore, and the
+            # added lights could read them
+            self._xform_cache.Clear()
+
+        selected_paths = [light_items.prim_path.value for light_items in self._light_items]
+        if selected_paths != previous_paths:
             self._item_changed(self.prim_path)
 
         # Add a Tf.Notice listener to update the light attributes
         if not self._stage_listener:
             self._stage_listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._notice_changed, stage)
 
-    def _get_transform(self, time: Usd.TimeCode):
-        """Returns world transform of currently selected object"""
-        if not self._light:
+    def get_transforms(self, all_light_items):
+        """
+        Returns the world transforms of many lights. The transforms that are not cached are flattened at once, and
+        they are cached for get_as_floats.
+        """
+        time = self._time
+        self._set_transform_time(time)
+
+        lights = [light_items.light for light_items in all_light_items if light_items.light]
+        missing = {
+            light.GetPath(): light.GetPrim() for light in lights if light.GetPath() not in self._world_transforms
+        }
+        self._stats["xform_cache_hits"] += len(lights) - len(missing)
+        self._stats["xform_cache_misses"] += len(missing)
+        if missing:
+            matrices = [self._xform_cache.GetLocalToWorldTransform(prim) for prim in missing.values()]
+            self._world_transforms.update(zip(missing.keys(), _flatten_matrices(matrices)))
+
+        return [
+            self._world_transforms[light_items.light.GetPath()]
+            if light_items.light
+            else LightModel.MatrixItem.identity.copy()
+            for light_items in all_light_items
+        ]
+
+    def _set_transform_time(self, time: Usd.TimeCode):
+        if self._xform_cache.GetTime() != time:
+            # SetTime clears the cache if the time is different
+            self._xform_cache.SetTime(time)
+            self._world_transforms = {}
+
+    def _get_transform(self, light, time: Usd.TimeCode):
+        """Returns world transform of the given light"""
+        if not light:
             return LightModel.MatrixItem.identity.copy()
 
-        # Compute matrix from world-transform in USD
-        world_xform = self._light.ComputeLocalToWorldTransform(time)
+        self._set_transform_time(time)
 
-        # Flatten Gf.Matrix4d to list
-        return _flatten_matrix(world_xform)
+        light_path = light.GetPath()
+        world_transform = self._world_transforms.get(light_path)
+        if world_transform is not None:
+            self._stats["xform_cache_hits"] += 1
+            return world_transform
+        self._stats["xform_cache_misses"] += 1
 
-    def _get_intensity(self, time: Usd.TimeCode):
-        """Returns intensity of currently selected light"""
-        if not self._light:
-            return 0.0
-
-        # Get intensity directly from USD
-        return self._light.GetIntensityAttr().Get(time)
-
-    def _set_intensity(self, time: Usd.TimeCode, value):
-        """set intensity of currently selected light"""
-        if not self._light:
-            return
-
-        # set height dirctly to USD
-        self._light.GetIntensityAttr().Set(value, time=time)
-
-    def _get_width(self, time: Usd.TimeCode):
-        """Returns width of currently selected light"""
-        if not self._light:
-            return 0.0
-
-        # Get radius directly from USD
-        return self._light.GetWidthAttr().Get(time)
-
-    def _set_width(self, time: Usd.TimeCode, value):
-        """set width of currently selected light"""
-        if not self._light:
-            return
-
-        # set height dirctly to USD
-        self._light.GetWidthAttr().Set(value, time=time)
+        # Compute matrix from world-transform in USD
+        world_xform = self._xform_cache.GetLocalToWorldTransform(light.GetPrim())
 
-    def _get_height(self, time: Usd.TimeCode):
-        """Returns height of currently selected light"""
-        if not self._light:
+        # Flatten Gf.Matrix4d to list
+        world_transform = _flatten_matrix(world_xform)
+        self._world_transforms[light_path] = world_transform
+        return world_transform
+
+    def _get_attribute(self, item):
+        """Returns the USD attribute of the light the item belongs to"""
+        light_items = getattr(item, "light_items", None)
+        if not light_items or not light_items.light:
+            return None
+
+        return light_items.attributes.get(item)
+
+    def _get_float(self, item, time: Usd.TimeCode):
+        """Returns the attribute value of the light the item belongs to"""
+        query = item.light_items.queries.get(item)
+        if not query:
             return 0.0
 
-        # Get height directly from USD
-        return self._light.GetHeightAttr().Get(time)
+        # Get the value directly from USD, the query knows where the value is authored
+        return query.Get(time)
 
-    def _set_height(self, time: Usd.TimeCode, value):
-        """set height of currently selected light"""
-        if not self._light:
+    def _set_float(self, item, time: Usd.TimeCode, value):
+        """set the attribute value of the light the item belongs to"""
+        attr = self._get_attribute(item)
+        if not attr:
             return
 
-        # set height dirctly to USD
-        self._light.GetHeightAttr().Set(value, time=time)
+        # set the value directly to USD, or to the scratch layer during the drag
+        if self._scratch_paths is not None:
+            self._scratch_paths.add(attr.GetPath())
+            with Usd.EditContext(attr.GetStage(), self._scratch_layer):
+                attr.Set(value, time=time)
+        else:
+            attr.Set(value, time=time)
+        self._stats["usd_writes"] += 1
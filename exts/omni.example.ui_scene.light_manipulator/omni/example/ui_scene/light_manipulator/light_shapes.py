@@ -0,0 +1,487 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+#
+__all__ = [
+    "AttributeBinding",
+    "DragBinding",
+    "LightShape",
+    "RectLightShape",
+    "DiskLightShape",
+    "SphereLightShape",
+    "CylinderLightShape",
+    "DistantLightShape",
+    "register_light_shape",
+    "unregister_light_shape",
+    "get_light_shape",
+    "get_power_preserving_intensity",
+]
+
+import math
+
+from omni.ui import scene as sc
+from pxr import UsdLux
+
+# this INTENSITY_SCALE is too make the transform a reasonable length with large intensity number
+INTENSITY_SCALE = 500.0
+
+ARROW_WIDTH = 0.015
+ARROW_HEIGHT = 0.1
+ARROW_P = [
+    [ARROW_WIDTH, ARROW_WIDTH, 0],
+    [-ARROW_WIDTH, ARROW_WIDTH, 0],
+    [0, 0, ARROW_HEIGHT],
+    #
+    [ARROW_WIDTH, -ARROW_WIDTH, 0],
+    [-ARROW_WIDTH, -ARROW_WIDTH, 0],
+    [0, 0, ARROW_HEIGHT],
+    #
+    [ARROW_WIDTH, ARROW_WIDTH, 0],
+    [ARROW_WIDTH, -ARROW_WIDTH, 0],
+    [0, 0, ARROW_HEIGHT],
+    #
+    [-ARROW_WIDTH, ARROW_WIDTH, 0],
+    [-ARROW_WIDTH, -ARROW_WIDTH, 0],
+    [0, 0, ARROW_HEIGHT],
+    #
+    [ARROW_WIDTH, ARROW_WIDTH, 0],
+    [-ARROW_WIDTH, ARROW_WIDTH, 0],
+    [-ARROW_WIDTH, -ARROW_WIDTH, 0],
+    [ARROW_WIDTH, -ARROW_WIDTH, 0],
+]
+
+ARROW_VC = [3, 3, 3, 3, 4]
+ARROW_VI = [i for i in range(sum(ARROW_VC))]
+
+# the size of the rectangles at the corners
+CORNER_SIZE = 0.03
+
+# the number of segments of the circles
+CIRCLE_SEGMENTS = 32
+
+# DistantLight has no position, its cone is drawn with this length
+DISTANT_LENGTH = 100.0
+
+X_AXIS = (1, 0, 0)
+Y_AXIS = (0, 1, 0)
+Z_AXIS = (0, 0, 1)
+
+
+def _scale_matrix(x, y, z, tz=0.0):
+    """Returns the flattened matrix that scales and then moves along z"""
+    return [x, 0, 0, 0, 0, y, 0, 0, 0, 0, z, 0, 0, 0, tz, 1]
+
+
+def _circle(axes):
+    """Returns the closed polyline of the circle of radius 0.5 in the plane of the given two axes"""
+    points = []
+    for i in range(CIRCLE_SEGMENTS + 1):
+        angle = 2.0 * math.pi * i / CIRCLE_SEGMENTS
+        point = [0.0, 0.0, 0.0]
+        point[axes[0]] = 0.5 * math.cos(angle)
+        point[axes[1]] = 0.5 * math.sin(angle)
+        points.append(point)
+    return points
+
+
+def _radial(mask):
+    """Returns the direction function from the center to the point, only the axes in the mask are used"""
+
+    def direction(point):
+        vector = [p * m for p, m in zip(point, mask)]
+        length = math.sqrt(sum(c * c for c in vector))
+        return [c / length for c in vector] if length else [0.0, 0.0, 0.0]
+
+    return direction
+
+
+def _intensity_geometry(corners, z=-1.0):
+    """
+    The unit-sized geometry of the intensity handles: the lines along -z from the given corners, the arrows at the
+    end of the lines and the lines underneath the arrows
+    """
+    rotation = sc.Matrix44.get_rotation_matrix(0, -180, 0, True)
+
+    # All the arrows in one mesh for the batched handles, the rotation is 180 degrees around y
+    arrow_points = [[x - px, y + py, z - pz] for x, y in corners for px, py, pz in ARROW_P]
+    arrow_counts = ARROW_VC * len(corners)
+    arrow_indices = list(range(len(arrow_points)))
+
+    return {
+        # z-axis to indicate the intensity
+        "z_lines": [((x, y, 0), (x, y, z)) for x, y in corners],
+        # the line underneath the arrow which is where the gesture applies
+        "z_arrow_lines": [((x, y, z), (x, y, z - ARROW_HEIGHT)) for x, y in corners],
+        # arrows on the z-axis
+        "arrow_transforms": [sc.Matrix44.get_translation_matrix(x, y, z) * rotation for x, y in corners],
+        "arrow_mesh": (arrow_points, arrow_counts, arrow_indices),
+    }
+
+
+def get_power_preserving_intensity(intensity, area, new_area):
+    """
+    Returns the intensity that keeps the power of the light when its area changes from area to new_area. It works
+    with floats and with NumPy arrays, new_area must not be zero.
+    """
+    return intensity * area / new_area
+
+
+class AttributeBinding:
+    """
+    Binds an item of LightModel to an attribute of the light. The handles show the attribute as a length, to_length
+    and from_length convert the attribute value to the length and back.
+    """
+
+    def __init__(self, getter: str, to_length=None, from_length=None):
+        # the name of the method of the UsdLux schema that returns the attribute
+        self.getter = getter
+        self.to_length = to_length or (lambda value: value)
+        self.from_length = from_length or (lambda length: length)
+
+    def get_attribute(self, light):
+        """Returns the attribute of the given UsdLux light"""
+        return getattr(light, self.getter)()
+
+
+class DragBinding:
+    """
+    Tells how the mouse move changes an attribute: the length of the attribute changes by the move along the
+    direction multiplied by the factor. The direction is 3 floats or a function of the point under the mouse.
+    """
+
+    def __init__(self, name: str, direction, factor=1.0):
+        self.name = name
+        self.direction = direction
+        self.factor = factor
+
+    def get_delta(self, moved, point):
+        """Returns the change of the length when the mouse moved by `moved` over `point`, both in object space"""
+        direction = self.direction(point) if callable(self.direction) else self.direction
+        return sum(m * d for m, d in zip(moved, direction)) * self.factor
+
+
+_INTENSITY = AttributeBinding(
+    "GetIntensityAttr",
+    to_length=lambda value: value / INTENSITY_SCALE,
+    from_length=lambda length: length * INTENSITY_SCALE,
+)
+
+
+class LightShape:
+    """
+    Describes how the manipulator works with a type of UsdLux lights: the attributes the model tracks and the handles
+    the manipulator builds. The unit-sized geometry of the handles is computed once per process and shared by all
+    the manipulators. The handles are scaled to the size of the light by the transforms from `build`.
+    """
+
+    # the UsdLux schema of the lights
+    light_type = None
+    # the name of the item of LightModel.LightItems to AttributeBinding
+    attributes = {}
+    # the names of the attributes that change the area of the light
+    size_attributes = ()
+
+    # the unit-sized geometry, it's computed on the first use
+    _geometry = None
+
+    @classmethod
+    def get_geometry(cls):
+        """Returns the unit-sized geometry of the handles"""
+        # Only the class itself keeps the geometry, not its base classes
+        if cls.__dict__.get("_geometry") is None:
+            cls._geometry = cls._build_geometry()
+        return cls._geometry
+
+    @classmethod
+    def _build_geometry(cls):
+        return {}
+
+    def get_area(self, values):
+        """Returns the area of the light with the given attribute values, None if the light has no area"""
+        return None
+
+    def get_dragged_values(self, start_values, deltas, preserve_power=False):
+        """
+        Returns the values of the dragged attributes of this shape, the deltas are added to the values at the start
+        of the drag. With preserve_power, the intensity keeps the power of the light. The lights that had or got
+        zero area keep their intensity, like in LightBatch.
+        """
+        values = {name: start_values[name] + delta for name, delta in deltas.items() if name in self.attributes}
+        if not values or not preserve_power or "intensity" not in self.attributes:
+            return values
+
+        start_area = self.get_area(start_values)
+        area = self.get_area(dict(start_values, **values))
+        if start_area and area:
+            values["intensity"] = get_power_preserving_intensity(start_values["intensity"], start_area, area)
+        return values
+
+    def build(self, builder):
+        """Builds the handles with the builder of the manipulator"""
+        pass
+
+    def _build_intensity(self, builder, geometry):
+        """Builds the lines and the arrows that change the intensity, returns the lines and the arrows"""
+        # the lines along z don't have gestures, they are only highlighted
+        z_lines = [builder.static_line(*line) for line in geometry["z_lines"]]
+        arrows = builder.arrows(geometry["arrow_transforms"], geometry["arrow_mesh"])
+        z_arrow_lines = [builder.line(*line) for line in geometry["z_arrow_lines"]]
+
+        thickness_group = z_lines + z_arrow_lines
+        gestures = [
+            builder.drag([DragBinding("intensity", Z_AXIS, -1.0)]),
+            builder.hover(thickness_group, reveal=arrows),
+        ]
+        for z_arrow_line in z_arrow_lines:
+            z_arrow_line.gestures = gestures
+
+        return thickness_group, arrows
+
+
+class RectLightShape(LightShape):
+    """The rectangle with the intensity lines at the corners"""
+
+    light_type = UsdLux.RectLight
+    attributes = {
+        "width": AttributeBinding("GetWidthAttr"),
+        "height": AttributeBinding("GetHeightAttr"),
+        "intensity": _INTENSITY,
+    }
+    size_attributes = ("width", "height")
+
+    @classmethod
+    def _build_geometry(cls):
+        # Build the shape geomtery as unit-sized
+        h = 0.5
+        s = CORNER_SIZE
+        geometry = _intensity_geometry([(h, h), (-h, -h), (h, -h), (-h, h)])
+        geometry.update(
+            {
+                # the rectangle, the first two lines are horizontal and the last two are vertical
+                "edges": [
+                    ((-h, h, 0), (h, h, 0)),
+                    ((-h, -h, 0), (h, -h, 0)),
+                    ((h, h, 0), (h, -h, 0)),
+                    ((-h, h, 0), (-h, -h, 0)),
+                ],
+                # 4 rectangles at the corner, the directions of the drag follow the order
+                "corner_transforms": [
+                    sc.Matrix44.get_translation_matrix(h - 0.5 * s, -h + 0.5 * s, 0),
+                    sc.Matrix44.get_translation_matrix(h - 0.5 * s, h - 0.5 * s, 0),
+                    sc.Matrix44.get_translation_matrix(-h + 0.5 * s, h - 0.5 * s, 0),
+                    sc.Matrix44.get_translation_matrix(-h + 0.5 * s, -h + 0.5 * s, 0),
+                ],
+                "corner_flags": [(1, -1), (1, 1), (-1, 1), (-1, -1)],
+            }
+        )
+        return geometry
+
+    def get_area(self, values):
+        return values["width"] * values["height"]
+
+    def build(self, builder):
+        geometry = self.get_geometry()
+        with builder.scaled_transform(lambda l: _scale_matrix(l["width"], l["height"], l["intensity"])):
+            # the rectangle
+            shape1, shape2, shape3, shape4 = edges = [builder.line(*edge) for edge in geometry["edges"]]
+            # add gesture to the lines of the rectangle to update width or height of the light. 2.0 because the
+            # geometry is unit-sized and centered, the width of the rectangle is twice the distance to the edge.
+            vertical_hover_gesture = builder.hover([shape1, shape2])
+            shape1.gestures = [builder.drag([DragBinding("height", Y_AXIS, 2.0)]), vertical_hover_gesture]
+            shape2.gestures = [builder.drag([DragBinding("height", Y_AXIS, -2.0)]), vertical_hover_gesture]
+
+            horizontal_hover_gesture = builder.hover([shape3, shape4])
+            shape3.gestures = [builder.drag([DragBinding("width", X_AXIS, 2.0)]), horizontal_hover_gesture]
+            shape4.gestures = [builder.drag([DragBinding("width", X_AXIS, -2.0)]), horizontal_hover_gesture]
+
+            thickness_group, arrows = self._build_intensity(builder, geometry)
+
+            # create 4 rectangles at the corner, and add gesture to update width, height and intensity at the same
+            # time. The intensity is changed so that the light keeps the same power.
+            corners = builder.rectangles(geometry["corner_transforms"], CORNER_SIZE)
+            hight_all_gesture = builder.hover(edges + thickness_group, reveal=arrows, colorize=corners)
+            for rect, (flag_x, flag_y) in zip(corners, geometry["corner_flags"]):
+                bindings = [DragBinding("width", X_AXIS, 2.0 * flag_x), DragBinding("height", Y_AXIS, 2.0 * flag_y)]
+                rect.gestures = [builder.drag(bindings, preserve_power=True), hight_all_gesture]
+
+
+class DiskLightShape(LightShape):
+    """The circle with the intensity lines on it"""
+
+    light_type = UsdLux.DiskLight
+    attributes = {
+        "radius": AttributeBinding("GetRadiusAttr"),
+        "intensity": _INTENSITY,
+    }
+    size_attributes = ("radius",)
+
+    @classmethod
+    def _build_geometry(cls):
+        h = 0.5
+        geometry = _intensity_geometry([(h, 0), (-h, 0), (0, h), (0, -h)])
+        geometry["circle"] = _circle((0, 1))
+        return geometry
+
+    def get_area(self, values):
+        return math.pi * values["radius"] ** 2
+
+    def build(self, builder):
+        geometry = self.get_geometry()
+        with builder.scaled_transform(lambda l: _scale_matrix(2.0 * l["radius"], 2.0 * l["radius"], l["intensity"])):
+            circle = builder.curve(geometry["circle"])
+            circle.gestures = [
+                builder.drag([DragBinding("radius", _radial((1, 1, 0)))]),
+                builder.hover([circle]),
+            ]
+            self._build_intensity(builder, geometry)
+
+
+class SphereLightShape(LightShape):
+    """Three circles of the sphere and the intensity line under it"""
+
+    light_type = UsdLux.SphereLight
+    attributes = {
+        "radius": AttributeBinding("GetRadiusAttr"),
+        "intensity": _INTENSITY,
+    }
+    size_attributes = ("radius",)
+
+    @classmethod
+    def _build_geometry(cls):
+        geometry = _intensity_geometry([(0, 0)])
+        geometry["circles"] = [_circle((0, 1)), _circle((1, 2)), _circle((0, 2))]
+        return geometry
+
+    def get_area(self, values):
+        return 4.0 * math.pi * values["radius"] ** 2
+
+    def build(self, builder):
+        geometry = self.get_geometry()
+        with builder.scaled_transform(lambda l: _scale_matrix(*[2.0 * l["radius"]] * 3)):
+            circles = [builder.curve(points) for points in geometry["circles"]]
+            gestures = [builder.drag([DragBinding("radius", _radial((1, 1, 1)))]), builder.hover(circles)]
+            for circle in circles:
+                circle.gestures = gestures
+
+        # the intensity line starts at the bottom of the sphere
+        with builder.scaled_transform(
+            lambda l: _scale_matrix(2.0 * l["radius"], 2.0 * l["radius"], l["intensity"], -l["radius"])
+        ):
+            self._build_intensity(builder, geometry)
+
+
+class CylinderLightShape(LightShape):
+    """The two caps and four side lines of the cylinder along the x-axis, and the intensity line under it"""
+
+    light_type = UsdLux.CylinderLight
+    attributes = {
+        "length": AttributeBinding("GetLengthAttr"),
+        "radius": AttributeBinding("GetRadiusAttr"),
+        "intensity": _INTENSITY,
+    }
+    size_attributes = ("length", "radius")
+
+    @classmethod
+    def _build_geometry(cls):
+        h = 0.5
+        geometry = _intensity_geometry([(0, 0)])
+        geometry["caps"] = [[[x, y, z] for _, y, z in _circle((1, 2))] for x in (h, -h)]
+        geometry["sides"] = [((-h, y, z), (h, y, z)) for y, z in [(h, 0), (-h, 0), (0, h), (0, -h)]]
+        return geometry
+
+    def get_area(self, values):
+        return 2.0 * math.pi * values["radius"] * values["length"]
+
+    def build(self, builder):
+        geometry = self.get_geometry()
+        with builder.scaled_transform(lambda l: _scale_matrix(l["length"], 2.0 * l["radius"], 2.0 * l["radius"])):
+            # the caps change the length
+            caps = [builder.curve(points) for points in geometry["caps"]]
+            caps_hover_gesture = builder.hover(caps)
+            for cap, flag in zip(caps, (1, -1)):
+                cap.gestures = [builder.drag([DragBinding("length", X_AXIS, 2.0 * flag)]), caps_hover_gesture]
+
+            # the sides change the radius
+            sides = [builder.line(*side) for side in geometry["sides"]]
+            gestures = [builder.drag([DragBinding("radius", _radial((0, 1, 1)))]), builder.hover(sides)]
+            for side in sides:
+                side.gestures = gestures
+
+        # the intensity line starts at the bottom of the cylinder
+        with builder.scaled_transform(
+            lambda l: _scale_matrix(2.0 * l["radius"], 2.0 * l["radius"], l["intensity"], -l["radius"])
+        ):
+            self._build_intensity(builder, geometry)
+
+
+class DistantLightShape(LightShape):
+    """The cone of the angular size of the light along -z, and the intensity line after it"""
+
+    light_type = UsdLux.DistantLight
+    attributes = {
+        # the handles show the radius of the cone at DISTANT_LENGTH
+        "angle": AttributeBinding(
+            "GetAngleAttr",
+            to_length=lambda value: math.tan(math.radians(value) * 0.5) * DISTANT_LENGTH,
+            from_length=lambda length: math.degrees(2.0 * math.atan(length / DISTANT_LENGTH)),
+        ),
+        "intensity": _INTENSITY,
+    }
+
+    @classmethod
+    def _build_geometry(cls):
+        h = 0.5
+        geometry = _intensity_geometry([(0, 0)])
+        geometry["circle"] = [[x, y, -1.0] for x, y, _ in _circle((0, 1))]
+        geometry["cone"] = [((0, 0, 0), (x, y, -1.0)) for x, y in [(h, 0), (-h, 0), (0, h), (0, -h)]]
+        return geometry
+
+    def build(self, builder):
+        geometry = self.get_geometry()
+        with builder.scaled_transform(lambda l: _scale_matrix(2.0 * l["angle"], 2.0 * l["angle"], DISTANT_LENGTH)):
+            for line in geometry["cone"]:
+                builder.static_line(*line)
+            circle = builder.curve(geometry["circle"])
+            circle.gestures = [
+                builder.drag([DragBinding("angle", _radial((1, 1, 0)))]),
+                builder.hover([circle]),
+            ]
+
+        # the intensity line starts at the end of the cone
+        with builder.scaled_transform(
+            lambda l: _scale_matrix(DISTANT_LENGTH, DISTANT_LENGTH, l["intensity"], -DISTANT_LENGTH)
+        ):
+            self._build_intensity(builder, geometry)
+
+
+# The registered shapes, the first shape the light IsA is used
+_light_shapes = []
+
+
+def register_light_shape(shape: LightShape):
+    """Adds the shape to the registry. It replaces the shape registered for the same light type."""
+    unregister_light_shape(shape.light_type)
+    _light_shapes.insert(0, shape)
+
+
+def unregister_light_shape(light_type):
+    """Removes the shape of the light type from the registry"""
+    _light_shapes[:] = [shape for shape in _light_shapes if shape.light_type != light_type]
+
+
+def get_light_shape(prim):
+    """Returns the shape of the given prim, None if it's not a registered light"""
+    if not prim:
+        return None
+    for shape in _light_shapes:
+        if prim.IsA(shape.light_type):
+            return shape
+    return None
+
+
+for _shape in (RectLightShape(), DiskLightShape(), SphereLightShape(), CylinderLightShape(), DistantLightShape()):
+    register_light_shape(_shape)
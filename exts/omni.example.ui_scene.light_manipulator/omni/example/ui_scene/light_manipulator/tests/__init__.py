@@ -1 +1,3 @@
-from .test_manipulator import TestLightManipulator
\ No newline at end of file
+from .test_manipulator import TestLightManipulator
+from .test_model import TestLightModel
+from .test_benchmark import TestLightBenchmark
@@ -0,0 +1,292 @@
+## Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+##
+## NVIDIA CORPORATION and its licensors retain all intellectual property
+## and proprietary rights in and to this software, related documentation
+## and any modifications thereto.  Any use, reproduction, disclosure or
+## distribution of this software and related documentation without an express
+## license agreement from NVIDIA CORPORATION is strictly prohibited.
+##
+__all__ = ["TestLightBenchmark"]
+
+from omni.ui.tests.test_base import OmniUiTest
+from pathlib import Path
+import json
+import time
+import carb
+import omni.kit.app
+import omni.kit.test
+import omni.kit.ui_test as ui_test
+import omni.usd
+from omni.example.ui_scene.light_manipulator import LightManipulator, LightModel
+from omni.example.ui_scene.light_manipulator.light_manipulator import _DragGesture
+from omni.example.ui_scene.light_manipulator.light_model import SETTING_BATCH_HANDLES, SETTING_MULTI_SELECTION
+from omni.example.ui_scene.light_manipulator.light_model import SETTING_RETAIN_HANDLES
+from omni.example.ui_scene.light_manipulator.light_model import (
+    _flatten_matrix, _flatten_matrix_items, _flatten_matrices
+)
+from omni.example.ui_scene.light_manipulator.light_shapes import DragBinding, X_AXIS, Y_AXIS, Z_AXIS
+from omni.ui import scene as sc
+from pxr import Gf, Sdf, UsdLux
+from omni.kit.viewport.utility import next_viewport_frame_async
+from omni.kit.viewport.utility.tests import setup_vieport_test_window
+
+OUTPUTS_DIR = Path(omni.kit.test.get_test_output_path())
+
+SELECTION_FLIPS = 1000
+MATRIX_COUNT = 1000
+MATRIX_ROUNDS = 100
+DRAG_LIGHT_COUNTS = [1, 100, 10000]
+DRAG_EVENTS = 100
+BATCH_LIGHT_COUNT = 100
+HOVER_MOVES = 100
+
+# The bindings of the handles of RectLightShape
+DRAG_HANDLES = {
+    "edge": ([DragBinding("width", X_AXIS, 2.0)], False),
+    "z_arrow": ([DragBinding("intensity", Z_AXIS, -1.0)], False),
+    "corner": ([DragBinding("width", X_AXIS, 2.0), DragBinding("height", Y_AXIS, 2.0)], True),
+}
+
+
+def _write_results(name, results):
+    """Adds the results to the benchmark report in the test output directory"""
+    path = OUTPUTS_DIR.joinpath("light_manipulator_benchmark.json")
+    report = json.loads(path.read_text()) if path.exists() else {}
+    report[name] = results
+    path.write_text(json.dumps(report, indent=4))
+    carb.log_warn(f"[light_manipulator benchmark] {name}: {results}")
+
+
+def _percentiles(samples):
+    """The percentiles of the samples in milliseconds"""
+    samples = sorted(samples)
+
+    def percentile(p):
+        return samples[min(len(samples) - 1, int(p / 100.0 * len(samples)))] * 1000.0
+
+    return {
+        "p50_ms": percentile(50), "p90_ms": percentile(90), "p99_ms": percentile(99), "max_ms": samples[-1] * 1000.0
+    }
+
+
+class _SyntheticPayload:
+    """The part of the gesture payload _DragGesture uses"""
+
+    def __init__(self):
+        self.ray_closest_point = [0.0, 0.0, 0.0]
+
+
+class _SyntheticDragGesture(_DragGesture):
+    """_DragGesture that is driven by the benchmark instead of the mouse"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.payload = _SyntheticPayload()
+
+    @property
+    def gesture_payload(self):
+        return self.payload
+
+
+class TestLightBenchmark(OmniUiTest):
+    # Before running each test
+    async def setUp(self):
+        await super().setUp()
+        self._settings = carb.settings.get_settings()
+
+    # After running each test
+    async def tearDown(self):
+        self._settings.set(SETTING_RETAIN_HANDLES, True)
+        self._settings.set(SETTING_MULTI_SELECTION, False)
+        self._settings.set(SETTING_BATCH_HANDLES, False)
+        await super().tearDown()
+
+    async def setup_viewport(self, resolution_x: int = 800, resolution_y: int = 600):
+        await self.create_test_area(resolution_x, resolution_y)
+        return await setup_vieport_test_window(resolution_x, resolution_y)
+
+    async def _time_selection_flips(self, paths):
+        selection = omni.usd.get_context().get_selection()
+        app = omni.kit.app.get_app()
+        start = time.perf_counter()
+        for i in range(SELECTION_FLIPS):
+            selection.set_selected_prim_paths([paths[i % len(paths)]], True)
+            await app.next_update_async()
+        return time.perf_counter() - start
+
+    async def test_selection_flips(self):
+        viewport_window = await self.setup_viewport()
+        await omni.usd.get_context().new_stage_async()
+        stage = omni.usd.get_context().get_stage()
+        await next_viewport_frame_async(viewport_window.viewport_api, 2)
+
+        paths = ["/World/RectLight0", "/World/RectLight1"]
+        for path in paths:
+            UsdLux.RectLight.Define(stage, path)
+
+        with viewport_window.get_frame(0):
+            scene_view = sc.SceneView()
+            with scene_view.scene:
+                manipulator = LightManipulator(model=LightModel())
+
+        results = {}
+        for retain in (False, True):
+            self._settings.set(SETTING_RETAIN_HANDLES, retain)
+            # warm up, the retained mode builds its handles here
+            await self._time_selection_flips(paths[:1] + paths)
+            results["retained" if retain else "rebuilt"] = await self._time_selection_flips(paths)
+
+        # the retained handles are built only once
+        self.assertEqual(len(manipulator._handle_pool[manipulator.model.get_light_items()[0].shape]), 1)
+        results["flips"] = SELECTION_FLIPS
+        _write_results("selection_flips", results)
+
+    async def test_flatten_matrix(self):
+        matrices = [
+            Gf.Matrix4d().SetTranslate(Gf.Vec3d(i, 2 * i, 3 * i))
+            * Gf.Matrix4d().SetRotate(Gf.Rotation(Gf.Vec3d(0, 1, 0), i))
+            for i in range(MATRIX_COUNT)
+        ]
+        expected = [_flatten_matrix_items(matrix) for matrix in matrices]
+        self.assertEqual([_flatten_matrix(matrix) for matrix in matrices], expected)
+        self.assertEqual(_flatten_matrices(matrices), expected)
+
+        def measure(fn):
+            start = time.perf_counter()
+            for _ in range(MATRIX_ROUNDS):
+                fn()
+            # microseconds per matrix
+            return (time.perf_counter() - start) / (MATRIX_ROUNDS * MATRIX_COUNT) * 1e6
+
+        results = {
+            "items_us": measure(lambda: [_flatten_matrix_items(matrix) for matrix in matrices]),
+            "single_us": measure(lambda: [_flatten_matrix(matrix) for matrix in matrices]),
+            "batched_us": measure(lambda: _flatten_matrices(matrices)),
+            "matrices": MATRIX_COUNT,
+        }
+        _write_results("flatten_matrix", results)
+
+    async def test_drag_throughput(self):
+        viewport_window = await self.setup_viewport()
+        self._settings.set(SETTING_MULTI_SELECTION, True)
+        app = omni.kit.app.get_app()
+
+        for count in DRAG_LIGHT_COUNTS:
+            await omni.usd.get_context().new_stage_async()
+            stage = omni.usd.get_context().get_stage()
+            await next_viewport_frame_async(viewport_window.viewport_api, 2)
+
+            paths = [f"/World/RectLight{i}" for i in range(count)]
+            with Sdf.ChangeBlock():
+                for path in paths:
+                    light = UsdLux.RectLight.Define(stage, path)
+                    light.CreateWidthAttr(100.0)
+                    light.CreateHeightAttr(100.0)
+                    light.CreateIntensityAttr(1000.0)
+
+            model = LightModel()
+            with viewport_window.get_frame(0):
+                scene_view = sc.SceneView()
+                with scene_view.scene:
+                    manipulator = LightManipulator(model=model)
+
+            omni.usd.get_context().get_selection().set_selected_prim_paths(paths, True)
+            for _ in range(3):
+                await app.next_update_async()
+            handles = manipulator._handles[paths[0]]
+
+            for name, (bindings, preserve_power) in DRAG_HANDLES.items():
+                gesture = _SyntheticDragGesture(manipulator, handles, bindings, preserve_power)
+                stats = model.get_stats()
+
+                gesture.on_began()
+                samples = []
+                for i in range(DRAG_EVENTS):
+                    gesture.payload.ray_closest_point = [0.1 * i, 0.1 * i, -0.1 * i]
+                    start = time.perf_counter()
+                    gesture.on_changed()
+                    # the coalesced values are written on the app update, it's a part of the cost of the event
+                    model.flush_pending_floats()
+                    samples.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                gesture.on_ended()
+                ended = time.perf_counter() - start
+                await app.next_update_async()
+
+                results = _percentiles(samples)
+                results["on_ended_ms"] = ended * 1000.0
+                results["usd_writes"] = model.get_stats()["usd_writes"] - stats["usd_writes"]
+                results["notices"] = model.get_stats()["notices"] - stats["notices"]
+                results["events"] = DRAG_EVENTS
+                _write_results(f"drag_{name}_{count}", results)
+
+            scene_view.scene.clear()
+            model = None
+            manipulator = None
+
+    async def test_illuminance_grid(self):
+        from omni.example.ui_scene.light_manipulator.illuminance_overlay import compute_illuminance
+
+        # the light is 100 units above the ground, facing down
+        transform = [1, 0, 0, 0, 0, 0, -1, 0, 0, 1, 0, 0, 0, 100, 0, 1]
+        illuminance, center, size = compute_illuminance(transform, 50.0, 50.0, 1000.0, resolution=128)
+        self.assertEqual(illuminance.shape, (128, 128))
+        self.assertEqual(list(center), [0.0, 0.0, 0.0])
+        # the brightest point is right under the light
+        row, column = divmod(int(illuminance.argmax()), 128)
+        self.assertIn(row, (63, 64))
+        self.assertIn(column, (63, 64))
+
+        start = time.perf_counter()
+        for i in range(MATRIX_ROUNDS):
+            compute_illuminance(transform, 50.0 + i, 50.0, 1000.0, resolution=128)
+        _write_results("illuminance_grid", {"update_ms": (time.perf_counter() - start) / MATRIX_ROUNDS * 1000.0})
+
+    async def test_batched_handles(self):
+        viewport_window = await self.setup_viewport()
+        self._settings.set(SETTING_MULTI_SELECTION, True)
+        app = omni.kit.app.get_app()
+
+        await omni.usd.get_context().new_stage_async()
+        stage = omni.usd.get_context().get_stage()
+        await next_viewport_frame_async(viewport_window.viewport_api, 2)
+
+        # the lights are in front of the default camera, so the mouse moves over the handles
+        paths = [f"/World/RectLight{i}" for i in range(BATCH_LIGHT_COUNT)]
+        with Sdf.ChangeBlock():
+            for i, path in enumerate(paths):
+                light = UsdLux.RectLight.Define(stage, path)
+                light.AddTranslateOp().Set(Gf.Vec3d((i % 10) * 20.0 - 100.0, (i // 10) * 20.0 - 100.0, 0.0))
+                light.CreateWidthAttr(15.0)
+                light.CreateHeightAttr(15.0)
+
+        results = {"lights": BATCH_LIGHT_COUNT}
+        for batched in (False, True):
+            self._settings.set(SETTING_BATCH_HANDLES, batched)
+            with viewport_window.get_frame(0):
+                scene_view = sc.SceneView()
+                with scene_view.scene:
+                    manipulator = LightManipulator(model=LightModel())
+            viewport_window.viewport_api.add_scene_view(scene_view)
+
+            omni.usd.get_context().get_selection().set_selected_prim_paths(paths, True)
+            for _ in range(3):
+                await app.next_update_async()
+
+            # every move runs the hit test of the hover gestures of all the handles
+            start = time.perf_counter()
+            for i in range(HOVER_MOVES):
+                await ui_test.emulate_mouse_move(ui_test.Vec2(200 + 4 * i, 150 + 3 * i))
+            hover_ms = (time.perf_counter() - start) / HOVER_MOVES * 1000.0
+
+            mode = "batched" if batched else "separate"
+            results[mode] = dict(manipulator.get_stats(), hover_ms=hover_ms)
+
+            viewport_window.viewport_api.remove_scene_view(scene_view)
+            scene_view.scene.clear()
+            omni.usd.get_context().get_selection().clear_selected_prim_paths()
+            await app.next_update_async()
+
+        self.assertLess(results["batched"]["items"], results["separate"]["items"])
+        self.assertEqual(results["batched"]["hit_targets"], results["separate"]["hit_targets"])
+        _write_results("batched_handles", results)
@@ -0,0 +1,354 @@
+## Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+##
+## NVIDIA CORPORATION and its licensors retain all intellectual property
+## and proprietary rights in and to this software, related documentation
+## and any modifications thereto.  Any use, reproduction, disclosure or
+## distribution of this software and related documentation without an express
+## license agreement from NVIDIA CORPORATION is strictly prohibited.
+##
+__all__ = ["TestLightModel"]
+
+import carb
+import omni.kit.app
+import omni.kit.commands
+import omni.kit.test
+import omni.kit.undo
+import omni.timeline
+import omni.usd
+from omni.example.ui_scene.light_manipulator import LightModel
+from omni.example.ui_scene.light_manipulator.light_model import SETTING_MULTI_SELECTION, SETTING_SCRATCH_LAYER_DRAGS
+from pxr import Gf, Sdf, Tf, Usd, UsdGeom, UsdLux
+
+
+class TestLightModel(omni.kit.test.AsyncTestCase):
+    # Before running each test
+    async def setUp(self):
+        await omni.usd.get_context().new_stage_async()
+        self._stage = omni.usd.get_context().get_stage()
+        self._settings = carb.settings.get_settings()
+        self._settings.set(SETTING_MULTI_SELECTION, True)
+
+    # After running each test
+    async def tearDown(self):
+        self._settings.set(SETTING_MULTI_SELECTION, False)
+        self._settings.set(SETTING_SCRATCH_LAYER_DRAGS, False)
+        self._stage = None
+
+    def _create_lights(self, count):
+        paths = []
+        for i in range(count):
+            light = UsdLux.RectLight.Define(self._stage, f"/World/RectLight{i}")
+            light.CreateWidthAttr(100.0 + i)
+            light.CreateHeightAttr(50.0 + i)
+            light.CreateIntensityAttr(1000.0)
+            paths.append(f"/World/RectLight{i}")
+        return paths
+
+    async def _select(self, paths):
+        omni.usd.get_context().get_selection().set_selected_prim_paths(paths, True)
+        await omni.kit.app.get_app().next_update_async()
+
+    async def test_multi_selection(self):
+        paths = self._create_lights(3)
+        model = LightModel()
+        await self._select(paths)
+
+        light_items = model.get_light_items()
+        self.assertEqual([items.prim_path.value for items in light_items], paths)
+        # the primary light shares its items with the model
+        self.assertEqual(model.prim_path, light_items[0].prim_path)
+        self.assertEqual(model.get_as_floats(light_items[2].width), 102.0)
+
+        # only the first selected light in the single selection mode
+        self._settings.set(SETTING_MULTI_SELECTION, False)
+        await self._select(paths)
+        self.assertEqual(len(model.get_light_items()), 1)
+
+    async def test_batch_edit_undo(self):
+        paths = self._create_lights(3)
+        model = LightModel()
+        await self._select(paths)
+
+        light_items = model.get_light_items()
+        for items in light_items:
+            model.set_item_value(items.width, model.get_as_floats(items.width))
+
+        item_values = [(items.width, items.width.value + 10.0) for items in light_items]
+        model.set_floats_batch(item_values)
+        model.set_floats_commands_batch(item_values)
+        for i, path in enumerate(paths):
+            self.assertEqual(UsdLux.RectLight(self._stage.GetPrimAtPath(path)).GetWidthAttr().Get(), 110.0 + i)
+
+        # a single undo reverts all the lights
+        omni.kit.undo.undo()
+        for i, path in enumerate(paths):
+            self.assertEqual(UsdLux.RectLight(self._stage.GetPrimAtPath(path)).GetWidthAttr().Get(), 100.0 + i)
+
+    async def test_notice_filtering(self):
+        light = UsdLux.RectLight.Define(self._stage, "/World/Light")
+        UsdLux.RectLight.Define(self._stage, "/World/Light2")
+        model = LightModel()
+        await self._select(["/World/Light2"])
+
+        changed = []
+        sub = model.subscribe_item_changed_fn(lambda m, item: changed.append(item))
+
+        # the sibling has a similar name, but it's not a parent
+        UsdGeom.Xformable(light).AddTranslateOp().Set(Gf.Vec3d(1, 2, 3))
+        self.assertFalse(changed)
+
+        # the parent transform is tracked
+        UsdGeom.Xformable(self._stage.GetPrimAtPath("/World")).AddTranslateOp().Set(Gf.Vec3d(1, 2, 3))
+        self.assertIn(model.transform, changed)
+        self.assertEqual(model.get_as_floats(model.transform)[12:15], [1, 2, 3])
+        # releasing the subscription unsubscribes the callback
+        del sub
+
+    async def test_transform_after_reselection(self):
+        UsdLux.RectLight.Define(self._stage, "/World/Group/LightA")
+        UsdLux.RectLight.Define(self._stage, "/World/LightB")
+        model = LightModel()
+        await self._select(["/World/Group/LightA"])
+        self.assertEqual(model.get_as_floats(model.transform)[12:15], [0, 0, 0])
+
+        # the parent of the light that is not selected anymore moves
+        await self._select(["/World/LightB"])
+        UsdGeom.Xformable(self._stage.GetPrimAtPath("/World/Group")).AddTranslateOp().Set(Gf.Vec3d(1, 2, 3))
+
+        await self._select(["/World/Group/LightA"])
+        self.assertEqual(model.get_as_floats(model.transform)[12:15], [1, 2, 3])
+
+    async def test_deferred_writes(self):
+        paths = self._create_lights(1)
+        model = LightModel()
+        await self._select(paths)
+
+        writes = model.get_stats()["usd_writes"]
+        for width in range(110, 120):
+            model.set_floats_deferred([(model.width, float(width))])
+        # nothing is written until the next update
+        self.assertEqual(model.get_as_floats(model.width), 100.0)
+
+        await omni.kit.app.get_app().next_update_async()
+        await omni.kit.app.get_app().next_update_async()
+        # only the last value is written
+        self.assertEqual(model.get_as_floats(model.width), 119.0)
+        self.assertEqual(model.get_stats()["usd_writes"], writes + 1)
+
+    async def test_time_samples(self):
+        paths = self._create_lights(1)
+        intensity_attr = UsdLux.RectLight(self._stage.GetPrimAtPath(paths[0])).GetIntensityAttr()
+        intensity_attr.Set(1000.0, 0)
+        intensity_attr.Set(2000.0, 10)
+
+        timeline = omni.timeline.get_timeline_interface()
+        timeline.set_current_time(5 / timeline.get_time_codes_per_seconds())
+        await omni.kit.app.get_app().next_update_async()
+
+        model = LightModel()
+        await self._select(paths)
+        self.assertAlmostEqual(model.get_as_floats(model.intensity), 1500.0)
+        # the width is not animated
+        self.assertEqual(model.get_as_floats(model.width), 100.0)
+
+        # the animated attribute gets a new time sample
+        model.set_floats(model.intensity, 3000.0)
+        self.assertEqual(intensity_attr.GetNumTimeSamples(), 3)
+        self.assertEqual(intensity_attr.Get(5), 3000.0)
+
+        timeline.set_current_time(0)
+        await omni.kit.app.get_app().next_update_async()
+
+    async def test_light_shapes(self):
+        paths = self._create_lights(1)
+        disk = UsdLux.DiskLight.Define(self._stage, "/World/DiskLight")
+        disk.CreateRadiusAttr(20.0)
+        cylinder = UsdLux.CylinderLight.Define(self._stage, "/World/CylinderLight")
+        cylinder.CreateLengthAttr(40.0)
+        model = LightModel()
+        await self._select(paths + ["/World/DiskLight", "/World/CylinderLight"])
+
+        rect_items, disk_items, cylinder_items = model.get_light_items()
+        self.assertEqual(set(rect_items.shape.attributes), {"width", "height", "intensity"})
+        self.assertEqual(set(disk_items.shape.attributes), {"radius", "intensity"})
+        self.assertEqual(model.get_as_floats(disk_items.radius), 20.0)
+        self.assertEqual(model.get_as_floats(cylinder_items.length), 40.0)
+
+        # the lights share the attributes with the same name
+        model.set_floats_batch([(items.radius, 30.0) for items in (disk_items, cylinder_items)])
+        self.assertEqual(disk.GetRadiusAttr().Get(), 30.0)
+        self.assertEqual(cylinder.GetRadiusAttr().Get(), 30.0)
+
+    async def test_dragged_values(self):
+        from omni.example.ui_scene.light_manipulator.light_shapes import RectLightShape
+
+        shape = RectLightShape()
+        start_values = {"width": 10.0, "height": 10.0, "intensity": 1000.0}
+        # the other shapes' attributes are not dragged
+        self.assertEqual(shape.get_dragged_values(start_values, {"radius": 5.0}), {})
+        self.assertEqual(shape.get_dragged_values(start_values, {"width": 10.0}), {"width": 20.0})
+        # the power is the same
+        self.assertEqual(
+            shape.get_dragged_values(start_values, {"width": 10.0}, preserve_power=True),
+            {"width": 20.0, "intensity": 500.0},
+        )
+
+        # the lights that had or got zero area keep their intensity
+        zero_width = dict(start_values, width=0.0)
+        self.assertEqual(shape.get_dragged_values(zero_width, {"width": 10.0}, preserve_power=True), {"width": 10.0})
+        self.assertEqual(shape.get_dragged_values(start_values, {"width": -10.0}, preserve_power=True), {"width": 0.0})
+
+    async def test_shape_command(self):
+        paths = self._create_lights(2)
+        model = LightModel()
+        await self._select(paths)
+
+        light_items = model.get_light_items()
+        for items in light_items:
+            for item in (items.width, items.intensity):
+                model.set_item_value(item, model.get_as_floats(item))
+
+        item_values = []
+        for items in light_items:
+            item_values += [(items.width, 200.0), (items.intensity, 500.0)]
+        model.set_floats_commands_batch(item_values)
+
+        # all the attributes are changed by a single command
+        self.assertEqual(omni.kit.undo.get_undo_stack()[-1].name, "ChangeLightShape")
+        lights = [UsdLux.RectLight(self._stage.GetPrimAtPath(path)) for path in paths]
+        self.assertEqual([light.GetWidthAttr().Get() for light in lights], [200.0, 200.0])
+
+        omni.kit.undo.undo()
+        self.assertEqual([light.GetWidthAttr().Get() for light in lights], [100.0, 101.0])
+        self.assertEqual([light.GetIntensityAttr().Get() for light in lights], [1000.0, 1000.0])
+
+        omni.kit.undo.redo()
+        self.assertEqual([light.GetIntensityAttr().Get() for light in lights], [500.0, 500.0])
+
+    async def test_scratch_layer(self):
+        paths = self._create_lights(1)
+        model = LightModel()
+        await self._select(paths)
+        self._settings.set(SETTING_SCRATCH_LAYER_DRAGS, True)
+        width_attr = UsdLux.RectLight(self._stage.GetPrimAtPath(paths[0])).GetWidthAttr()
+        root_spec = self._stage.GetRootLayer().GetAttributeAtPath(width_attr.GetPath())
+
+        model.set_item_value(model.width, model.get_as_floats(model.width))
+        model.begin_live_edit()
+        model.set_floats_batch([(model.width, 150.0)])
+        # the drag is visible, but the edit target is not changed
+        self.assertEqual(width_attr.Get(), 150.0)
+        self.assertEqual(root_spec.default, 100.0)
+
+        # canceling is dropping the writes, the layer is kept for the next drag
+        self.assertTrue(model.end_live_edit())
+        self.assertEqual(width_attr.Get(), 100.0)
+        self.assertEqual(len(self._stage.GetSessionLayer().subLayerPaths), 1)
+
+        # the end of the drag is committed to the edit target
+        model.begin_live_edit()
+        model.set_floats_batch([(model.width, 150.0)])
+        model.end_live_edit()
+        model.set_floats_commands_batch([(model.width, 160.0)])
+        self.assertEqual(root_spec.default, 160.0)
+        omni.kit.undo.undo()
+        self.assertEqual(width_attr.Get(), 100.0)
+
+    async def test_scratch_layer_resyncs(self):
+        paths = self._create_lights(2)
+        model = LightModel()
+        await self._select(paths)
+        self._settings.set(SETTING_SCRATCH_LAYER_DRAGS, True)
+        width_items = [items.width for items in model.get_light_items()]
+
+        # the first drag adds the layer
+        model.begin_live_edit()
+        model.end_live_edit()
+
+        resynced = []
+        listener = Tf.Notice.Register(
+            Usd.Notice.ObjectsChanged, lambda notice, stage: resynced.extend(notice.GetResyncedPaths()), self._stage
+        )
+        for _ in range(3):
+            model.begin_live_edit()
+            for width in range(150, 160):
+                model.set_floats_batch([(item, float(width)) for item in width_items])
+            model.end_live_edit()
+        listener.Revoke()
+
+        # only the dragged attributes are recomposed, once per drag
+        self.assertNotIn(Sdf.Path.absoluteRootPath, resynced)
+        self.assertLessEqual(len(resynced), 3 * len(width_items))
+        self.assertTrue(all(path.IsPropertyPath() for path in resynced))
+
+    async def test_light_batch(self):
+        from omni.example.ui_scene.light_manipulator import LightBatch
+
+        self._create_lights(3)
+        batch = LightBatch.from_stage(self._stage, "/World", predicate=lambda path: path.name != "RectLight1")
+        self.assertEqual([path.pathString for path in batch.paths], ["/World/RectLight0", "/World/RectLight2"])
+
+        area = batch.get_area()
+        batch.scale_size(0.5)
+        # the power is the same
+        self.assertEqual((batch["intensity"] * batch.get_area()).tolist(), (1000.0 * area).tolist())
+        self.assertEqual(batch.apply(), 6)
+
+        light = UsdLux.RectLight(self._stage.GetPrimAtPath("/World/RectLight2"))
+        self.assertEqual(light.GetWidthAttr().Get(), 51.0)
+        self.assertEqual(light.GetIntensityAttr().Get(), 4000.0)
+
+        # one undo for all the lights
+        omni.kit.undo.undo()
+        self.assertEqual(light.GetWidthAttr().Get(), 102.0)
+        self.assertEqual(light.GetIntensityAttr().Get(), 1000.0)
+
+    async def test_light_batch_time_samples(self):
+        from omni.example.ui_scene.light_manipulator import LightBatch
+
+        paths = self._create_lights(2)
+        light = UsdLux.RectLight(self._stage.GetPrimAtPath(paths[0]))
+        light.GetIntensityAttr().Set(1000.0, 0)
+        light.GetIntensityAttr().Set(1000.0, 20)
+        UsdLux.RectLight(self._stage.GetPrimAtPath(paths[1])).GetWidthAttr().Set(0.0)
+
+        batch = LightBatch.from_stage(self._stage, "/World", time=Usd.TimeCode(10))
+        batch.scale("intensity", 0.5)
+        batch.apply()
+        # the animated intensity gets a time sample, it's visible at the time
+        self.assertEqual(light.GetIntensityAttr().Get(10), 500.0)
+
+        # the light without area keeps its intensity when it gets one
+        batch.resize(width=10.0)
+        self.assertEqual(batch["intensity"].tolist(), [5000.0, 500.0])
+
+    async def test_light_inventory(self):
+        from omni.example.ui_scene.light_manipulator import LightInventory
+
+        self._create_lights(2)
+        inventory = LightInventory()
+        totals = inventory.get_totals()
+        self.assertEqual(totals["count_by_type"], {"RectLight": 2})
+        self.assertEqual(totals["area"], 100.0 * 50.0 + 101.0 * 51.0)
+
+        # only the changed light is read again
+        UsdLux.RectLight(self._stage.GetPrimAtPath("/World/RectLight0")).GetIntensityAttr().Set(2000.0)
+        self.assertEqual(inventory.get_light("/World/RectLight0")["intensity"], 2000.0)
+        self.assertEqual(inventory.get_totals()["intensity"], 3000.0)
+
+        # added and removed lights
+        UsdLux.DiskLight.Define(self._stage, "/World/Group/DiskLight")
+        self.assertEqual(inventory.get_totals()["count_by_type"], {"RectLight": 2, "DiskLight": 1})
+        self._stage.RemovePrim("/World/Group")
+        self._stage.RemovePrim("/World/RectLight1")
+        totals = inventory.get_totals()
+        self.assertEqual(totals["count"], 1)
+        self.assertEqual(totals["area"], 100.0 * 50.0)
+
+        # only the lights under the resynced prim are removed, not the ones of the sibling with a similar name
+        UsdLux.DiskLight.Define(self._stage, "/World/Group/DiskLight")
+        UsdLux.DiskLight.Define(self._stage, "/World/Group2/DiskLight")
+        self._stage.RemovePrim("/World/Group")
+        self.assertEqual(inventory.get_totals()["count_by_type"], {"RectLight": 1, "DiskLight": 1})
+        self.assertIsNotNone(inventory.get_light("/World/Group2/DiskLight"))
+        inventory.destroy()
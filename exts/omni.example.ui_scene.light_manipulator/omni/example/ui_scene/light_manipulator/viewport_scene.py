@@ -8,11 +8,15 @@
 #
 __all__ = ["ViewportScene"]
 
+import carb.settings
 from omni.ui import scene as sc
 
 from .light_model import LightModel
 from .light_manipulator import LightManipulator
 
+# When enabled, the illuminance of the selected RectLight is drawn on the ground plane
+SETTING_ILLUMINANCE_OVERLAY = "/exts/omni.example.ui_scene.light_manipulator/illuminanceOverlay"
+
 
 class ViewportScene:
     """The light Manipulator, placed into a Viewport"""
@@ -27,7 +31,13 @@ class ViewportScene:
             self._scene_view = sc.SceneView()
             # Add the manipulator into the SceneView's scene
             with self._scene_view.scene:
-                LightManipulator(model=LightModel())
+                model = LightModel()
+                LightManipulator(model=model)
+                if carb.settings.get_settings().get(SETTING_ILLUMINANCE_OVERLAY):
+                    # The overlay is loaded only when it's enabled
+                    from .illuminance_overlay import IlluminanceManipulator
+
+                    IlluminanceManipulator(model=model)
 
             # Register the SceneView with the Viewport to get projection and view updates
             self._viewport_window.viewport_api.add_scene_view(self._scene_view)
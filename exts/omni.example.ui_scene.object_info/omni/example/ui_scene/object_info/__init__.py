@@ -6,4 +6,6 @@
 # distribution of this software and related documentation without an express
 # license agreement from NVIDIA CORPORATION is strictly prohibited.
 #
+from .bounds_index import *
 from .extension import *
+from .info_providers import *
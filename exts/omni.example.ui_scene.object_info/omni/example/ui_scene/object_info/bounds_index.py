@@ -0,0 +1,317 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+#
+__all__ = ["BoundsIndex", "get_bounds_index"]
+
+import sys
+import time
+from itertools import chain
+
+import carb.settings
+import numpy as np
+import omni.kit.app
+import omni.usd
+from pxr import Sdf
+from pxr import Tf
+from pxr import Usd
+from pxr import UsdGeom
+
+# The milliseconds the index can spend on a single app update
+SETTING_BOUNDS_INDEX_BUDGET = "/exts/omni.example.ui_scene.object_info/boundsIndexBudget"
+
+# The properties of a prim that change its bounding box and the bounding boxes of its parents, besides the transforms
+GEOMETRY_PROPERTIES = (UsdGeom.Tokens.extent, UsdGeom.Tokens.points)
+
+# The index the extension created, None when the boundsIndex setting is off
+_index = None
+
+
+def get_bounds_index():
+    """Returns the bounds index of the stage of the default UsdContext"""
+    return _index
+
+
+def _post_order(root: Usd.Prim, skip=()):
+    """
+    The prims under the root, the children come before their parent, so the parent bound is cached already. The
+    prims removed from the stage while the generator is paused are skipped, and so are the subtrees in skip.
+    """
+    stack = [(root, False)]
+    while stack:
+        prim, visited = stack.pop()
+        if not prim.IsValid():
+            continue
+        if visited:
+            yield prim
+            continue
+        stack.append((prim, True))
+        stack.extend((child, False) for child in reversed(prim.GetChildren()) if child.GetPath() not in skip)
+
+
+def _release(counts: dict, path: Sdf.Path):
+    """Decrements the counter of the path and removes it when it's zero"""
+    count = counts.get(path, 0) - 1
+    if count > 0:
+        counts[path] = count
+    else:
+        counts.pop(path, None)
+
+
+class BoundsIndex:
+    """
+    The world bounding boxes of all the Imageable prims of the stage. The index is built after the stage is opened,
+    a few milliseconds per app update, so it doesn't stall the app. Then the bounding box of a prim is a dictionary
+    lookup. The notices mark the changed subtrees and their parents dirty and queue them. The dirty prims are not
+    answered and the caller computes their bounding boxes until the queued subtrees and their parents are indexed
+    again, within the same time budget.
+    """
+
+    def __init__(self, usd_context_name: str = ""):
+        global _index
+
+        self._usd_context_name = usd_context_name
+        # Sdf.Path -> the row of the ranges, the row is min x, y, z and max x, y, z
+        self._rows = {}
+        self._ranges = np.empty((0, 6), dtype=np.float64)
+        # The rows of the removed prims, reused by the next prims
+        self._free_rows = []
+        # The changed subtrees and all their parents, the path -> the number of the queued re-indexings
+        self._dirty_paths = {}
+        self._dirty_parents = {}
+        # The changed subtrees that wait to be indexed again, it's a dict to keep the order
+        self._queue = {}
+        # The paths indexed since the last change, their bounds are in the cache already
+        self._fresh = set()
+        self._stats = {"hits": 0, "misses": 0, "dirty": 0, "builds": 0}
+
+        self._building = False
+        # The steps of the indexing, one prim per step
+        self._steps = None
+        self._bbox_cache = None
+        self._update_sub = None
+        self._stage_listener = None
+
+        self._stage_event_sub = (
+            omni.usd.get_context(usd_context_name)
+            .get_stage_event_stream()
+            .create_subscription_to_pop(self._on_stage_event, name="Object Info Bounds Index Stage Event")
+        )
+        self.rebuild()
+
+        if not usd_context_name:
+            _index = self
+
+    def destroy(self):
+        global _index
+
+        if _index is self:
+            _index = None
+        self._stage_event_sub = None
+        self._clear()
+
+    def _clear(self):
+        self._update_sub = None
+        if self._stage_listener:
+            self._stage_listener.Revoke()
+            self._stage_listener = None
+        self._building = False
+        self._steps = None
+        self._bbox_cache = None
+        self._rows = {}
+        self._ranges = np.empty((0, 6), dtype=np.float64)
+        self._free_rows = []
+        self._dirty_paths = {}
+        self._dirty_parents = {}
+        self._queue = {}
+        self._fresh.clear()
+
+    @property
+    def is_complete(self):
+        """True when the whole stage is indexed"""
+        return not self._building and self._stage_listener is not None
+
+    def get_stats(self):
+        """Returns the number of indexed prims, the memory of the index in bytes and the counters of the lookups"""
+        memory = self._ranges.nbytes + sys.getsizeof(self._rows) + sum(sys.getsizeof(p) for p in self._rows)
+        return dict(
+            self._stats,
+            indexed=len(self._rows),
+            dirty_paths=len(self._dirty_paths),
+            complete=self.is_complete,
+            memory=memory,
+        )
+
+    def get_range(self, path: Sdf.Path):
+        """
+        Returns the world bounding box of the prim as the min and the max, None if the prim is not indexed yet or it
+        is dirty.
+        """
+        row = self._rows.get(path)
+        if row is None:
+            self._stats["misses"] += 1
+            return None
+        if path in self._dirty_parents or any(p in self._dirty_paths for p in path.GetAncestorsRange()):
+            self._stats["dirty"] += 1
+            return None
+
+        self._stats["hits"] += 1
+        bound = self._ranges[row]
+        return bound[:3], bound[3:]
+
+    def rebuild(self):
+        """Starts indexing the whole stage again"""
+        self._clear()
+
+        stage = omni.usd.get_context(self._usd_context_name).get_stage()
+        if not stage:
+            return
+
+        self._stats["builds"] += 1
+        self._building = True
+        self._bbox_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), includedPurposes=[UsdGeom.Tokens.default_])
+        self._stage_listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._notice_changed, stage)
+        # The subtrees changed during the build are indexed again after it
+        self._start(chain(self._build(stage), self._reindex(stage)))
+
+    def _start(self, steps):
+        self._steps = steps
+        self._update_sub = (
+            omni.kit.app.get_app()
+            .get_update_event_stream()
+            .create_subscription_to_pop(self._on_update, name="Object Info Bounds Index")
+        )
+
+    def _set(self, path: Sdf.Path, bound):
+        row = self._rows.get(path)
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                row = len(self._rows)
+                if row == len(self._ranges):
+                    # Double the capacity
+                    self._ranges = np.resize(self._ranges, (max(1024, 2 * row), 6))
+            self._rows[path] = row
+        self._ranges[row] = bound
+
+    def _remove(self, path: Sdf.Path):
+        row = self._rows.pop(path, None)
+        if row is not None:
+            self._free_rows.append(row)
+
+    def _index(self, prim: Usd.Prim):
+        path = prim.GetPath()
+        if prim.IsA(UsdGeom.Imageable):
+            aligned = self._bbox_cache.ComputeWorldBound(prim).ComputeAlignedBox()
+            self._set(path, [*aligned.GetMin(), *aligned.GetMax()])
+        else:
+            # The prim at the path can have a different type now
+            self._remove(path)
+
+    def _build(self, stage: Usd.Stage):
+        """The steps that index the whole stage"""
+        for prim in _post_order(stage.GetPseudoRoot()):
+            self._index(prim)
+            yield
+        self._building = False
+
+    def _walk(self, root: Usd.Prim):
+        """The steps that index the prims under the root that are not indexed since the last change"""
+        if root.GetPath() in self._fresh:
+            return
+        for prim in _post_order(root, self._fresh):
+            self._index(prim)
+            self._fresh.add(prim.GetPath())
+            yield
+
+    def _reindex(self, stage: Usd.Stage):
+        """The steps that index the queued subtrees and their parents again"""
+        while self._queue:
+            roots = list(self._queue)
+            self._queue.clear()
+
+            removed = {root for root in roots if not stage.GetPrimAtPath(root)}
+            if removed:
+                # One pass over the rows for all the removed subtrees
+                for path in list(self._rows):
+                    if any(p in removed for p in path.GetAncestorsRange()) and not stage.GetPrimAtPath(path):
+                        self._remove(path)
+                    yield
+
+            for root in roots:
+                if root not in removed:
+                    yield from self._walk(stage.GetPrimAtPath(root))
+                # The parents from the closest one. Their other children are walked first, so a parent is one step
+                for parent in root.GetParentPath().GetAncestorsRange():
+                    prim = stage.GetPrimAtPath(parent)
+                    if parent != Sdf.Path.absoluteRootPath and prim:
+                        yield from self._walk(prim)
+                self._unmark_dirty(root)
+
+        # The bounds of the next change are computed from the leaves again
+        self._fresh.clear()
+
+    def _mark_dirty(self, path: Sdf.Path):
+        self._dirty_paths[path] = self._dirty_paths.get(path, 0) + 1
+        for parent in path.GetParentPath().GetAncestorsRange():
+            self._dirty_parents[parent] = self._dirty_parents.get(parent, 0) + 1
+
+    def _unmark_dirty(self, path: Sdf.Path):
+        _release(self._dirty_paths, path)
+        for parent in path.GetParentPath().GetAncestorsRange():
+            _release(self._dirty_parents, parent)
+
+    def _on_update(self, event):
+        """Called by update_event_stream. Indexes the prims until the time budget of the update is spent."""
+        budget = (carb.settings.get_settings().get(SETTING_BOUNDS_INDEX_BUDGET) or 2.0) / 1000.0
+        deadline = time.perf_counter() + budget
+        for _ in self._steps:
+            if time.perf_counter() > deadline:
+                return
+
+        # The stage and the queued subtrees are indexed
+        self._steps = None
+        self._update_sub = None
+
+    def _notice_changed(self, notice: Usd.Notice, stage: Usd.Stage) -> None:
+        """Called by Tf.Notice. Marks the prims whose bounding boxes can be changed dirty and queues them."""
+        changed = False
+        for path in chain(notice.GetResyncedPaths(), notice.GetChangedInfoOnlyPaths()):
+            if path.IsPropertyPath():
+                name = path.name
+                if not (
+                    UsdGeom.Xformable.IsTransformationAffectedByAttrNamed(name)
+                    or name == UsdGeom.Tokens.visibility
+                    or name in GEOMETRY_PROPERTIES
+                ):
+                    continue
+            elif path == Sdf.Path.absoluteRootPath:
+                self.rebuild()
+                return
+
+            changed = True
+            prim_path = path.GetPrimPath()
+            if prim_path not in self._queue:
+                self._queue[prim_path] = None
+                self._mark_dirty(prim_path)
+
+        if not changed:
+            return
+
+        # The cached bounds can be stale
+        self._bbox_cache.Clear()
+        self._fresh.clear()
+        if self._steps is None:
+            self._start(self._reindex(stage))
+
+    def _on_stage_event(self, event):
+        """Called by stage_event_stream"""
+        if event.type == int(omni.usd.StageEventType.OPENED):
+            self.rebuild()
+        elif event.type == int(omni.usd.StageEventType.CLOSED):
+            self._clear()
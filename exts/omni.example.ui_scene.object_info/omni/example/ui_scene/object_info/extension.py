@@ -9,11 +9,16 @@
 __all__ = ["ObjectInfoExtension"]
 
 import carb
+import carb.settings
 import omni.ext
 from omni.kit.viewport.utility import get_active_viewport_window
 
+from .bounds_index import BoundsIndex
 from .viewport_scene import ViewportScene
 
+# When enabled, the extension indexes the bounding boxes of the stage in the background
+SETTING_BOUNDS_INDEX = "/exts/omni.example.ui_scene.object_info/boundsIndex"
+
 
 class ObjectInfoExtension(omni.ext.IExt):
     """Creates an extension which will display object info in 3D
@@ -21,6 +26,7 @@ class ObjectInfoExtension(omni.ext.IExt):
     """
     def __init__(self):
         self._viewport_scene = None
+        self._bounds_index = None
 
     def on_startup(self, ext_id: str) -> None:
         """Called when the extension is starting up.
@@ -28,6 +34,9 @@ class ObjectInfoExtension(omni.ext.IExt):
         Args:
             ext_id: Extension ID provided by Kit.
         """
+        if carb.settings.get_settings().get(SETTING_BOUNDS_INDEX):
+            self._bounds_index = BoundsIndex()
+
         # Get the active Viewport (which at startup is the default Viewport)
         viewport_window = get_active_viewport_window()
 
@@ -41,6 +50,9 @@ class ObjectInfoExtension(omni.ext.IExt):
 
     def on_shutdown(self) -> None:
         """Called when the extension is shutting down."""
+        if self._bounds_index:
+            self._bounds_index.destroy()
+            self._bounds_index = None
 
         if self._viewport_scene:
             self._viewport_scene.destroy()
@@ -0,0 +1,168 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+#
+__all__ = ["HoverPicker", "HoverGesture"]
+
+import time
+from collections import OrderedDict
+
+import carb.settings
+import numpy as np
+import omni.kit.app
+from omni.ui import scene as sc
+
+# The maximum number of pick requests per second, 0 is one request per app update
+SETTING_HOVER_PICK_RATE = "/exts/omni.example.ui_scene.object_info/hoverPickRate"
+
+# The number of the picked pixels that are remembered
+CACHE_SIZE = 64
+
+
+class HoverPicker:
+    """
+    Picks the prim under the cursor with the viewport pick query. There is at most one query in flight and at most
+    one query per app update (or per `hoverPickRate`), the mouse moves between the queries only change the pixel of
+    the next query. The results are cached by the pixel, so the cursor that stays still doesn't make queries. The
+    cache is dropped when the camera moves.
+    """
+
+    def __init__(self, viewport_api, on_picked, scene_view: sc.SceneView = None, subscribe_updates: bool = True):
+        """
+        Args:
+            viewport_api: The object with `map_ndc_to_texture_pixel` and `request_query` of the viewport.
+            on_picked: Called with the path of the prim under the cursor, "" when there is nothing.
+            scene_view: The SceneView whose camera invalidates the cache.
+            subscribe_updates: Make the queries on app updates. The tests call `update` instead.
+        """
+        self._viewport_api = viewport_api
+        self._on_picked = on_picked
+        self._scene_view = scene_view
+        self._camera = None
+
+        # The pixel under the cursor, the pixel of the query in flight and the last reported pixel
+        self._pixel = None
+        self._in_flight = None
+        self._reported = None
+        self._last_request_time = None
+        # pixel -> path
+        self._cache = OrderedDict()
+        self._stats = {"requests": 0, "results": 0, "cache_hits": 0, "throttled": 0, "dropped": 0}
+
+        self._update_sub = None
+        if subscribe_updates:
+            self._update_sub = (
+                omni.kit.app.get_app()
+                .get_update_event_stream()
+                .create_subscription_to_pop(lambda _: self.update(time.perf_counter()), name="Object Info Hover")
+            )
+
+    def destroy(self):
+        self._update_sub = None
+        self._viewport_api = None
+        self._on_picked = None
+        self._scene_view = None
+
+    def get_stats(self):
+        """Returns the counters of the picker, useful for profiling"""
+        return dict(self._stats)
+
+    def invalidate(self):
+        """Forgets the cached results, e.g. when the camera or the stage changes"""
+        self._cache.clear()
+        self._reported = None
+
+    def on_mouse_moved(self, ndc):
+        """Called when the cursor moves, the query is made on the next update"""
+        if not self._viewport_api:
+            return
+        pixel, viewport_api = self._viewport_api.map_ndc_to_texture_pixel(ndc)
+        self._pixel = tuple(int(c) for c in pixel) if viewport_api else None
+
+    def update(self, now: float):
+        """Reports the cached result or makes the query for the pixel under the cursor"""
+        if self._scene_view:
+            camera_model = self._scene_view.model
+            camera = (
+                camera_model.get_as_floats(camera_model.get_item("view")),
+                camera_model.get_as_floats(camera_model.get_item("projection")),
+            )
+            if camera != self._camera:
+                # Other objects are under the cursor
+                self._camera = camera
+                self.invalidate()
+
+        pixel = self._pixel
+        if pixel is None or pixel == self._reported:
+            return
+
+        path = self._cache.get(pixel)
+        if path is not None:
+            self._stats["cache_hits"] += 1
+            self._cache.move_to_end(pixel)
+            self._report(pixel, path)
+            return
+
+        if self._in_flight is not None:
+            # The result of the previous query comes first
+            self._stats["throttled"] += 1
+            return
+
+        rate = carb.settings.get_settings().get(SETTING_HOVER_PICK_RATE) or 0
+        if rate > 0 and self._last_request_time is not None and now - self._last_request_time < 1.0 / rate:
+            self._stats["throttled"] += 1
+            return
+
+        self._in_flight = pixel
+        self._last_request_time = now
+        self._stats["requests"] += 1
+        self._viewport_api.request_query(
+            pixel, lambda path, *args: self._on_query_completed(pixel, path), query_name="Object Info Hover"
+        )
+
+    def _on_query_completed(self, pixel, path):
+        """Called by the viewport with the path of the prim at the pixel"""
+        if self._in_flight == pixel:
+            self._in_flight = None
+        self._stats["results"] += 1
+
+        path = path or ""
+        self._cache[pixel] = path
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+        if pixel != self._pixel:
+            # The cursor moved while the query was in flight, the next update makes a new query
+            self._stats["dropped"] += 1
+            return
+        self._report(pixel, path)
+
+    def _report(self, pixel, path):
+        self._reported = pixel
+        if self._on_picked:
+            self._on_picked(path)
+
+
+class HoverGesture(sc.HoverGesture):
+    """Sends the cursor position over the SceneView to the picker in NDC"""
+
+    def __init__(self, picker: HoverPicker, scene_view: sc.SceneView):
+        super().__init__()
+        self._picker = picker
+        self._scene_view = scene_view
+
+    def on_changed(self):
+        camera_model = self._scene_view.model
+        view = np.asarray(camera_model.get_as_floats(camera_model.get_item("view")), dtype=np.float64).reshape(4, 4)
+        projection = np.asarray(
+            camera_model.get_as_floats(camera_model.get_item("projection")), dtype=np.float64
+        ).reshape(4, 4)
+        # Any point on the ray under the cursor is projected to the same NDC
+        clip = np.append(np.asarray(self.sender.gesture_payload.mouse, dtype=np.float64), 1.0) @ view @ projection
+        if clip[3] == 0:
+            return
+        self._picker.on_mouse_moved((clip[0] / clip[3], clip[1] / clip[3]))
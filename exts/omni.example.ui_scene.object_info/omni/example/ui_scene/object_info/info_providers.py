@@ -0,0 +1,179 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+#
+__all__ = [
+    "AssetSizeProvider",
+    "InfoProvider",
+    "InfoRequest",
+    "TriangleCountProvider",
+    "get_info_providers",
+    "register_info_provider",
+    "unregister_info_provider",
+]
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import carb
+import numpy as np
+from pxr import Usd
+from pxr import UsdGeom
+
+# The threads of the providers that run on the thread pool, created on the first use
+_executor = None
+
+# The number of prims TriangleCountProvider reads before it lets the app update
+PRIMS_PER_SLICE = 500
+
+
+def _get_executor():
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ObjectInfoProvider")
+    return _executor
+
+
+class InfoProvider:
+    """
+    An additional line of the object info label that is too expensive to compute on selection. The selection doesn't
+    wait for the providers: they run as asyncio tasks, and the line is filled when the result arrives.
+
+    The provider reads USD in `prepare`, on the main thread. The result of `prepare` is passed to `compute`. When
+    `threaded` is set, `compute` runs on a thread pool and must not touch USD, otherwise it runs on the main thread.
+    Both `prepare` and the main thread `compute` can be coroutines that await to share the main thread, and both
+    count against the time budget.
+    """
+
+    # The title of the line
+    name = ""
+    # Run compute on the thread pool
+    threaded = False
+    # The seconds the provider can spend, the line shows that it's timed out after that
+    time_budget = 1.0
+
+    def prepare(self, prim: Usd.Prim):
+        return prim
+
+    def compute(self, data) -> str:
+        raise NotImplementedError
+
+
+class TriangleCountProvider(InfoProvider):
+    """The number of triangles of the meshes of the prim and its children"""
+
+    name = "Triangles"
+    threaded = True
+
+    async def prepare(self, prim: Usd.Prim):
+        # The large subtrees are read in slices, the app updates between them
+        counts = []
+        for i, child in enumerate(Usd.PrimRange(prim), 1):
+            if child.IsA(UsdGeom.Mesh):
+                counts.append(UsdGeom.Mesh(child).GetFaceVertexCountsAttr().Get())
+            if i % PRIMS_PER_SLICE == 0:
+                await asyncio.sleep(0)
+        return counts
+
+    def compute(self, data) -> str:
+        # A polygon with n vertices is n - 2 triangles
+        triangles = sum(int(np.maximum(np.asarray(counts) - 2, 0).sum()) for counts in data if counts)
+        return f"{triangles:,}"
+
+
+class AssetSizeProvider(InfoProvider):
+    """The size on disk of the layers the prim is composed from"""
+
+    name = "Assets"
+    threaded = True
+
+    def prepare(self, prim: Usd.Prim):
+        return {spec.layer.realPath for spec in prim.GetPrimStack() if spec.layer.realPath}
+
+    def compute(self, data) -> str:
+        # Only the local files have the size
+        sizes = [os.path.getsize(path) for path in data if os.path.isfile(path)]
+        if not sizes:
+            return "N/A"
+        return f"{len(sizes)} files, {sum(sizes) / (1024 * 1024):.1f} MB"
+
+
+class InfoRequest:
+    """The running providers of a single prim. The lines are filled as the results arrive."""
+
+    def __init__(self, prim: Usd.Prim, providers, on_changed):
+        """
+        Args:
+            prim: The prim to compute the info for.
+            providers: The InfoProviders to run.
+            on_changed: Called without arguments when a line is filled.
+        """
+        self._on_changed = on_changed
+        self.lines = {provider.name: "..." for provider in providers}
+        self._tasks = [asyncio.ensure_future(self._run(provider, prim)) for provider in providers]
+
+    def cancel(self):
+        """Stops the providers that are not finished, the results that arrive later are dropped"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._on_changed = None
+
+    def get_lines(self):
+        return [f"{name}: {text}" for name, text in self.lines.items()]
+
+    async def _compute(self, provider: InfoProvider, prim: Usd.Prim):
+        data = provider.prepare(prim)
+        if asyncio.iscoroutine(data):
+            data = await data
+        if provider.threaded:
+            return await asyncio.get_event_loop().run_in_executor(_get_executor(), provider.compute, data)
+
+        text = provider.compute(data)
+        if asyncio.iscoroutine(text):
+            text = await text
+        return text
+
+    async def _run(self, provider: InfoProvider, prim: Usd.Prim):
+        try:
+            # The time budget is for reading USD too, the timeout stops prepare at its next await
+            text = await asyncio.wait_for(self._compute(provider, prim), provider.time_budget)
+        except asyncio.TimeoutError:
+            text = "timed out"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            carb.log_warn(f"Object info provider {provider.name} failed: {e}")
+            text = "error"
+
+        if self._on_changed:
+            self.lines[provider.name] = text
+            self._on_changed()
+
+
+_info_providers = []
+
+
+def register_info_provider(provider: InfoProvider):
+    """Adds the provider to the label. It replaces the provider with the same name."""
+    unregister_info_provider(provider.name)
+    _info_providers.append(provider)
+
+
+def unregister_info_provider(name: str):
+    """Removes the provider with the name"""
+    _info_providers[:] = [provider for provider in _info_providers if provider.name != name]
+
+
+def get_info_providers():
+    return list(_info_providers)
+
+
+for _provider in (TriangleCountProvider(), AssetSizeProvider()):
+    register_info_provider(_provider)
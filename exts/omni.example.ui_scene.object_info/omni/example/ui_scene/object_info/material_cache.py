@@ -0,0 +1,113 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+#
+__all__ = ["MaterialBindingCache"]
+
+from itertools import chain
+
+from pxr import Sdf
+from pxr import Tf
+from pxr import Usd
+from pxr import UsdShade
+
+# The properties that change the resolved material of the prim and its children
+BINDING_PREFIX = "material:binding"
+# The properties that change the members of a collection, the collection can be bound anywhere on the stage
+COLLECTION_PREFIX = "collection:"
+
+
+class MaterialBindingCache:
+    """
+    The bound materials of the prims, keyed by the prim path. The material resolution walks the parents and the
+    collections, so the result is kept until the stage edits a binding relationship or a collection.
+    """
+
+    def __init__(self, stage: Usd.Stage):
+        self.stage = stage
+        # Sdf.Path of the prim -> Sdf.Path of the material, the empty path if there is no material
+        self._materials = {}
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self._stage_listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._notice_changed, stage)
+
+    def destroy(self):
+        if self._stage_listener:
+            self._stage_listener.Revoke()
+            self._stage_listener = None
+        self._materials = {}
+        self.stage = None
+
+    def get_stats(self):
+        """Returns the counters of the cache, useful for profiling"""
+        return dict(self._stats, size=len(self._materials))
+
+    def get_material(self, prim: Usd.Prim) -> Sdf.Path:
+        """Returns the path of the material bound to the prim, the empty path if there is no material"""
+        return self.get_materials([prim])[0]
+
+    def get_materials(self, prims) -> list:
+        """
+        Returns the paths of the materials bound to the prims. The prims that are not in the cache are resolved in
+        one batch.
+        """
+        paths = [prim.GetPath() for prim in prims]
+        missing = [prim for prim, path in zip(prims, paths) if path not in self._materials]
+        self._stats["hits"] += len(prims) - len(missing)
+        self._stats["misses"] += len(missing)
+
+        if missing:
+            materials, relationships = UsdShade.MaterialBindingAPI.ComputeBoundMaterials(missing)
+            for prim, material in zip(missing, materials):
+                self._materials[prim.GetPath()] = material.GetPath() if material else Sdf.Path.emptyPath
+
+        return [self._materials[path] for path in paths]
+
+    def clear(self):
+        if self._materials:
+            self._stats["invalidations"] += 1
+        self._materials = {}
+
+    def _invalidate(self, path: Sdf.Path):
+        """Forgets the materials of the prim and its children"""
+        stale = [prim_path for prim_path in self._materials if prim_path.HasPrefix(path)]
+        for prim_path in stale:
+            del self._materials[prim_path]
+        if stale:
+            self._stats["invalidations"] += 1
+
+    def _notice_changed(self, notice: Usd.Notice, stage: Usd.Stage) -> None:
+        """Called by Tf.Notice. Only the binding and collection edits invalidate the cache."""
+        if not self._materials:
+            return
+
+        for path in chain(notice.GetResyncedPaths(), notice.GetChangedInfoOnlyPaths()):
+            if not path.IsPropertyPath():
+                continue
+            name = path.name
+            if name.startswith(COLLECTION_PREFIX):
+                # Anything can be bound with the collection
+                self.clear()
+                return
+            if name.startswith(BINDING_PREFIX):
+                self._invalidate(path.GetPrimPath())
+
+        for path in notice.GetResyncedPaths():
+            if path.IsPropertyPath():
+                continue
+            if path == Sdf.Path.absoluteRootPath:
+                self.clear()
+                return
+            # The prims are recomposed, and the materials under the path can be removed
+            stale = [
+                prim_path
+                for prim_path, material_path in self._materials.items()
+                if prim_path.HasPrefix(path) or material_path.HasPrefix(path)
+            ]
+            for prim_path in stale:
+                del self._materials[prim_path]
+            if stale:
+                self._stats["invalidations"] += 1
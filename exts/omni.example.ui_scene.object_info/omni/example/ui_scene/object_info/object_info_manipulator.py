@@ -5,9 +5,11 @@
 # and any modifications thereto.  Any use, reproduction, disclosure or
 # distribution of this software and related documentation without an express
 # license agreement from NVIDIA CORPORATION is strictly prohibited.
-
+#
 __all__ = ["ObjectInfoManipulator"]
 
+import numpy as np
+import omni.kit.app
 from omni.ui import color as cl
 from omni.ui import scene as sc
 import omni.ui as ui
@@ -19,25 +21,44 @@ VERTICAL_MULT = 1.5
 HORIZ_TEXT_OFFSET = 5
 LINE1_OFFSET = 3
 LINE2_OFFSET = 0
+# The lines of the info providers are under the material
+INFO_LINE_HEIGHT = 18
 
+# The number of new labels built on a single app update, the rest are built on the next updates
+LABELS_PER_UPDATE = 100
+# How far the anchor can be outside of the screen in NDC, the label is still partly visible there
+FRUSTUM_MARGIN = 0.1
 
-class ObjectInfoManipulator(sc.Manipulator):
-    """Manipulator that displays the object path and material assignment
-    with a leader line to the top of the object's bounding box.
-    """
-    def on_build(self):
-        """Called when the model is changed and rebuilds the whole manipulator"""
-        if not self.model:
-            return
 
-        # If we don't have a selection then just return
-        if self.model.get_item("name") == "":
-            return
+def _get_visible(anchors, view, projection):
+    """Returns the indices of the anchors that are in front of the camera and inside the frustum"""
+    if not len(anchors):
+        return np.empty(0, dtype=np.intp)
 
-        position = self.model.get_as_floats(self.model.get_item("position"))
+    # The matrices are row-major, the points are row vectors
+    view_projection = np.asarray(view, dtype=np.float64).reshape(4, 4) @ np.asarray(
+        projection, dtype=np.float64
+    ).reshape(4, 4)
+    clip = anchors @ view_projection[:3] + view_projection[3]
+    w = clip[:, 3]
+    limit = w * (1.0 + FRUSTUM_MARGIN)
+    inside = (w > 0) & (np.abs(clip[:, 0]) <= limit) & (np.abs(clip[:, 1]) <= limit)
+    return np.nonzero(inside)[0]
+
+
+class _Label:
+    """The leader line and the path and material of a single object"""
+
+    def __init__(self):
+        self.index = None
+        self.name = None
+        self.material = None
+        self.info = []
+        self._info_labels = []
 
         # Move everything to where the object is
-        with sc.Transform(transform=sc.Matrix44.get_translation_matrix(*position)):
+        self.root = sc.Transform()
+        with self.root:
             # Rotate everything to face the camera
             with sc.Transform(look_at=sc.Transform.LookAt.CAMERA):
                 # Leader lines with a small circle on the end
@@ -56,12 +77,207 @@ class ObjectInfoManipulator(sc.Manipulator):
                     with sc.Transform(scale_to=sc.Space.SCREEN):
                         # Offset each Label vertically in screen space
                         with sc.Transform(transform=sc.Matrix44.get_translation_matrix(0, LINE1_OFFSET, 0)):
-                            sc.Label(f"Path: {self.model.get_item('name')}",
-                                     alignment=ui.Alignment.LEFT_BOTTOM)
+                            self._name_label = sc.Label("", alignment=ui.Alignment.LEFT_BOTTOM)
                         with sc.Transform(transform=sc.Matrix44.get_translation_matrix(0, LINE2_OFFSET, 0)):
-                            sc.Label(f"Material: {self.model.get_item('material')}",
-                                     alignment=ui.Alignment.LEFT_TOP)
+                            self._material_label = sc.Label("", alignment=ui.Alignment.LEFT_TOP)
+                        self._info_root = sc.Transform()
+
+    def set(self, position, name, material):
+        self.root.transform = sc.Matrix44.get_translation_matrix(*position)
+        self.root.visible = True
+        # Only the changed text is sent to the labels
+        if name != self.name:
+            self.name = name
+            self._name_label.text = f"Path: {name}"
+        if material != self.material:
+            self.material = material
+            self._material_label.text = f"Material: {material}"
+
+    def set_info(self, lines):
+        """Sets the lines of the info providers, the missing labels are created"""
+        if lines == self.info:
+            return
+        self.info = list(lines)
+        with self._info_root:
+            while len(self._info_labels) < len(lines):
+                offset = LINE2_OFFSET - INFO_LINE_HEIGHT * (len(self._info_labels) + 1)
+                with sc.Transform(transform=sc.Matrix44.get_translation_matrix(0, offset, 0)):
+                    self._info_labels.append(sc.Label("", alignment=ui.Alignment.LEFT_TOP))
+        for i, label in enumerate(self._info_labels):
+            label.text = lines[i] if i < len(lines) else ""
+
+    def hide(self):
+        self.index = None
+        self.root.visible = False
+
+
+class ObjectInfoManipulator(sc.Manipulator):
+    """Manipulator that displays the object path and material assignment
+    with a leader line to the top of the object's bounding box.
+
+    The label is built once, the changes of the position only move it.
+    Only the objects in front of the camera and inside the frustum of the
+    SceneView get labels, the anchors are projected when the camera moves.
+    """
+    def __init__(self, scene_view: sc.SceneView = None, **kwargs):
+        super().__init__(**kwargs)
+        self._scene_view = scene_view
+        # The label of the single selection and the point it's attached to
+        self._label = None
+        self._anchor = None
+
+        # The labels of the multi-selection, they are reused when the camera or the selection changes
+        self._root = None
+        self._labels = []
+        self._anchors = np.empty((0, 3))
+        self._names = []
+        self._materials = []
+        # The indices of the visible anchors without labels yet
+        self._pending = []
+        # The view and the projection the labels were culled with
+        self._camera = None
+        self._update_sub = None
+
+    def destroy(self):
+        self._update_sub = None
+        self._label = None
+        self._labels = []
+        self._root = None
+
+    def _is_multi_selection(self):
+        return self._scene_view is not None and len(self.model.get_item("names")) > 1
+
+    def on_build(self):
+        """Called when the selection mode is changed and rebuilds the whole manipulator"""
+        self._label = None
+        self._root = None
+        self._labels = []
+        self._update_sub = None
+
+        if not self.model:
+            return
+
+        # If we don't have a selection then just return
+        if self.model.get_item("name") == "":
+            return
+
+        if self._scene_view:
+            # Cull the labels when the camera moves
+            self._update_sub = (
+                omni.kit.app.get_app()
+                .get_update_event_stream()
+                .create_subscription_to_pop(self._on_update, name="Object Info Labels")
+            )
+
+        if self._is_multi_selection():
+            # The labels are created in _on_update, only for the visible objects
+            self._root = sc.Transform()
+            self._read_model()
+            return
+
+        self._label = _Label()
+        self._camera = self._get_camera()
+        self._update_label()
+
+    def _get_camera(self):
+        """The view and the projection of the SceneView"""
+        if not self._scene_view:
+            return None
+        camera_model = self._scene_view.model
+        view = camera_model.get_as_floats(camera_model.get_item("view"))
+        projection = camera_model.get_as_floats(camera_model.get_item("projection"))
+        return view, projection
+
+    def _update_label(self):
+        """Moves the label of the single selection, the text is only changed when the selection changes"""
+        if self.model.get_item("name") == "":
+            self._anchor = None
+            self._label.hide()
+            return
+
+        position = self.model.get_as_floats(self.model.get_item("position"))
+        self._anchor = np.asarray([position], dtype=np.float64)
+        self._label.set(position, self.model.get_item("name"), self.model.get_item("material"))
+        self._label.set_info(self._get_info())
+        self._cull_label()
+
+    def _get_info(self):
+        info = self.model.get_item("info")
+        return info.value if info else []
+
+    def _cull_label(self):
+        """Hides the label of the single selection when its anchor is off the screen"""
+        if self._anchor is None or not self._camera:
+            return
+        self._label.root.visible = len(_get_visible(self._anchor, *self._camera)) > 0
+
+    def _read_model(self):
+        """Reads the positions of all the selected objects, the labels are culled again on the next update"""
+        self._anchors = np.asarray(self.model.get_as_floats(self.model.get_item("positions")), dtype=np.float64)
+        self._anchors = self._anchors.reshape(-1, 3)
+        self._names = self.model.get_item("names")
+        self._materials = self.model.get_item("materials")
+        self._camera = None
+
+    def _on_update(self, event):
+        """Called by update_event_stream. Culls the labels when the camera moves and builds the pending labels."""
+        camera = self._get_camera()
+        if self._label:
+            # One projection per camera change
+            if camera != self._camera:
+                self._camera = camera
+                self._cull_label()
+            return
+
+        if camera != self._camera:
+            self._camera = camera
+            visible = _get_visible(self._anchors, *camera)
+
+            # Move the existing labels to the visible objects, hide the rest
+            for label, index in zip(self._labels, visible):
+                self._set_label(label, index)
+            for label in self._labels[len(visible):]:
+                label.hide()
+            self._pending = visible[len(self._labels):].tolist()
+
+        if not self._pending:
+            return
+
+        # Build a few labels at a time, the large selections don't stall the app
+        batch = self._pending[:LABELS_PER_UPDATE]
+        del self._pending[:LABELS_PER_UPDATE]
+        with self._root:
+            for index in batch:
+                label = _Label()
+                self._set_label(label, index)
+                self._labels.append(label)
+
+    def _set_label(self, label, index):
+        if label.index == index and label.root.visible:
+            return
+        label.index = index
+        label.set(self._anchors[index], self._names[index], self._materials[index])
 
     def on_model_updated(self, item):
+        is_multi_selection = self._is_multi_selection()
+        if self._root and is_multi_selection:
+            if item == self.model.get_item("info"):
+                # The labels of the multi-selection have no info lines
+                return
+            # Keep the labels, only the positions are read again, the model measures only the moved objects
+            self._read_model()
+            for label in self._labels:
+                label.index = None
+            return
+
+        if self._label and not is_multi_selection:
+            if item == self.model.get_item("info"):
+                # A provider has finished, the position is the same
+                self._label.set_info(self._get_info())
+                return
+            # Keep the label, only the translation and the changed text are updated
+            self._update_label()
+            return
+
         # Regenerate the manipulator
         self.invalidate()
@@ -8,17 +8,52 @@
 #
 __all__ = ["ObjectInfoModel"]
 
+import time
+from collections import deque
+from itertools import chain
+
+import carb.settings
+import omni.kit.app
+from pxr import Gf
+from pxr import Sdf
 from pxr import Tf
 from pxr import Usd
 from pxr import UsdGeom
-from pxr import UsdShade
 
 from omni.ui import scene as sc
 import omni.usd
 
+from .bounds_index import GEOMETRY_PROPERTIES
+from .bounds_index import get_bounds_index
+from .info_providers import InfoRequest
+from .info_providers import get_info_providers
+from .material_cache import BINDING_PREFIX
+from .material_cache import COLLECTION_PREFIX
+from .material_cache import MaterialBindingCache
+from .selection_summary import SelectionSummary
+
+# Label all the selected objects instead of only the first one
+SETTING_MULTI_SELECTION = "/exts/omni.example.ui_scene.object_info/multiSelection"
+# Add the lines of the registered info providers to the label
+SETTING_INFO_PROVIDERS = "/exts/omni.example.ui_scene.object_info/infoProviders"
+# Show the info of the object under the cursor instead of the selected object
+SETTING_HOVER = "/exts/omni.example.ui_scene.object_info/hover"
+# How the bounding box is computed: "extentsHint" uses the authored extentsHint of the models, "full" always
+# traverses the children
+SETTING_BOUNDS_POLICY = "/exts/omni.example.ui_scene.object_info/boundsPolicy"
+# Show a single label with the number, the bounds and the materials of the multi-selection
+SETTING_SUMMARY = "/exts/omni.example.ui_scene.object_info/summary"
+# The milliseconds the summary can spend on the added prims on a single app update
+SETTING_SUMMARY_BUDGET = "/exts/omni.example.ui_scene.object_info/summaryBudget"
+
 # The distance to raise above the top of the object's bounding box
 TOP_OFFSET = 5
 
+# The number of the materials in the summary
+SUMMARY_MATERIALS = 3
+# The number of the prims the summary resolves together
+SUMMARY_CHUNK = 256
+
 
 class ObjectInfoModel(sc.AbstractManipulatorModel):
     """
@@ -34,6 +69,16 @@ class ObjectInfoModel(sc.AbstractManipulatorModel):
             super().__init__()
             self.value = [0, 0, 0]
 
+    class InfoItem(sc.AbstractManipulatorItem):
+        """
+        The Model Item represents the lines of the info providers. They are
+        filled asynchronously when the providers finish.
+        """
+
+        def __init__(self):
+            super().__init__()
+            self.value = []
+
     def __init__(self):
         super().__init__()
 
@@ -41,9 +86,45 @@ class ObjectInfoModel(sc.AbstractManipulatorModel):
         self._prim = None
         self._current_path = ""
         self._material_name = ""
+        # All the selected prims, only the first one if multi-selection is off
+        self._prims = []
+        self._paths = []
+        self._names = []
+        self._material_names = []
+        # The selected paths, and the selected paths and all their parents mapped to the selected paths under them,
+        # to find the notices that change the bounding boxes
+        self._selected_paths = set()
+        self._selection_index = {}
+        # The positions of the selected prims by the path, the notices drop the ones they can move
+        self._positions = {}
+        self._positions_policy = None
+        # The prims whose children changed their geometry while they were selected. An edit of the geometry doesn't
+        # author extentsHint again, so their hint is out of date until it's authored or the stage is opened again.
+        self._stale_hints = set()
+        # Which way the bounding boxes were computed
+        self._stats = {"bounds_index": 0, "extents_hint": 0, "full_bounds": 0}
+        # The bound materials of the stage, it's created on the first selection
+        self._material_cache = None
 
         self._stage_listener = None
         self.position = ObjectInfoModel.PositionItem()
+        # The positions of all the selected objects
+        self.positions = ObjectInfoModel.PositionItem()
+        # The lines of the info providers, they are filled asynchronously
+        self.info = ObjectInfoModel.InfoItem()
+        self._info_request = None
+
+        # The summary of the multi-selection, None when the label shows a single object
+        self._summary = None
+        # The paths of the summary, the selection changes are applied as a difference with them
+        self._summary_paths = set()
+        # The paths of the summary and all their parents, mapped to the paths of the summary under them. The notice
+        # paths are looked up here, the changes elsewhere in the stage don't touch the selection.
+        self._summary_index = {}
+        # The paths to add to the summary, the removed ones stay in the queue until they are reached
+        self._summary_queue = deque()
+        self._summary_pending = set()
+        self._summary_update_sub = None
 
         # Save the UsdContext name (we currently only work with a single Context)
         usd_context = self._get_context()
@@ -54,28 +135,119 @@ class ObjectInfoModel(sc.AbstractManipulatorModel):
             self._on_stage_event, name="Object Info Selection Update"
         )
 
+    def destroy(self):
+        self._stage_event_sub = None
+        self._clear_summary()
+        self._cancel_info()
+        self._revoke_listener()
+        if self._material_cache:
+            self._material_cache.destroy()
+            self._material_cache = None
+
     def _get_context(self) -> Usd.Stage:
         # Get the UsdContext we are attached to
         return omni.usd.get_context()
 
+    def get_stats(self):
+        """Returns the number of bounding boxes read from the index, from extentsHint and computed"""
+        return dict(self._stats)
+
+    def _get_material_cache(self, stage: Usd.Stage) -> MaterialBindingCache:
+        """The material cache of the stage, the cache of the previous stage is dropped"""
+        if not self._material_cache or self._material_cache.stage != stage:
+            if self._material_cache:
+                self._material_cache.destroy()
+            self._material_cache = MaterialBindingCache(stage)
+        return self._material_cache
+
+    def _affects_bounds(self, path: Sdf.Path) -> bool:
+        """Returns True if the change of the path can move the bounding box of a selected prim"""
+        prim_path = path.GetPrimPath()
+        is_descendant = any(p in self._selected_paths for p in prim_path.GetAncestorsRange())
+        if not is_descendant and prim_path not in self._selection_index:
+            # Not a selected prim, its parents or its children
+            return False
+
+        if not path.IsPropertyPath():
+            # The prim is recomposed
+            self._mark_hints_stale(prim_path, is_descendant)
+            return True
+
+        name = path.name
+        if UsdGeom.Xformable.IsTransformationAffectedByAttrNamed(name) or name == UsdGeom.Tokens.visibility:
+            return True
+        if name == UsdGeom.Tokens.extentsHint and prim_path in self._selected_paths:
+            # The hint is authored again, it's trusted until the next change of the geometry
+            self._stale_hints.discard(prim_path)
+            return True
+        # The geometry of the parents is not a part of the bounding box of the selected prims
+        if is_descendant and name in GEOMETRY_PROPERTIES:
+            self._mark_hints_stale(prim_path, is_descendant)
+            return True
+        return False
+
+    def _mark_hints_stale(self, prim_path: Sdf.Path, is_descendant: bool):
+        """The geometry is changed, the extentsHint of the selected prims above it is not trusted anymore"""
+        if not is_descendant:
+            self._stale_hints.update(self._selected_paths)
+            return
+        self._stale_hints.update(p for p in prim_path.GetAncestorsRange() if p in self._selected_paths)
+
     def _notice_changed(self, notice: Usd.Notice, stage: Usd.Stage) -> None:
         """Called by Tf.Notice.  Used when the current selected object changes in some way."""
-        for p in notice.GetChangedInfoOnlyPaths():
-            if self._current_path in str(p.GetPrimPath()):
-                self._item_changed(self.position)
+        if self._summary is not None:
+            self._summary_notice_changed(notice)
+            return
+        if not self._current_path:
+            return
+
+        changed = False
+        for p in chain(notice.GetResyncedPaths(), notice.GetChangedInfoOnlyPaths()):
+            # All the paths are checked to find the stale extentsHint
+            if self._affects_bounds(p):
+                self._forget_positions(p.GetPrimPath())
+                changed = True
+        if changed:
+            # One update is enough for the whole notice
+            self._item_changed(self.position)
+
+    def _forget_positions(self, prim_path: Sdf.Path):
+        """Drops the cached positions of the selected prims that the change of the prim can move"""
+        # The selected prims under the changed prim
+        for path in self._selection_index.get(prim_path, ()):
+            self._positions.pop(path, None)
+        # The selected prims above it
+        for path in prim_path.GetAncestorsRange():
+            if path in self._selected_paths:
+                self._positions.pop(path, None)
 
     def get_item(self, identifier):
         if identifier == "position":
             return self.position
         if identifier == "name":
+            if self._summary is not None:
+                return self._get_summary_name()
             return self._current_path
         if identifier == "material":
+            if self._summary is not None:
+                return self._get_summary_materials()
             return self._material_name
+        if identifier == "positions":
+            return self.positions
+        if identifier == "names":
+            return self._names
+        if identifier == "materials":
+            return self._material_names
+        if identifier == "info":
+            return self.info
 
     def get_as_floats(self, item):
         if item == self.position:
             # Requesting position
             return self._get_position()
+        if item == self.positions:
+            # Requesting the positions of all the selected objects, x, y, z of every object
+            return self._get_positions()
 
         if item:
             # Get the value directly from the item
@@ -84,63 +256,372 @@ class ObjectInfoModel(sc.AbstractManipulatorModel):
 
     def _on_stage_event(self, event):
         """Called by stage_event_stream.  We only care about selection changes."""
-        if event.type == int(omni.usd.StageEventType.SELECTION_CHANGED):
+        if event.type in (int(omni.usd.StageEventType.OPENED), int(omni.usd.StageEventType.CLOSED)):
+            # The stale hints are of the prims of the previous stage
+            self._stale_hints = set()
+        elif event.type == int(omni.usd.StageEventType.SELECTION_CHANGED):
+            if carb.settings.get_settings().get(SETTING_HOVER):
+                # The info follows the cursor
+                return
             self._on_kit_selection_changed()
 
+    def _revoke_listener(self):
+        # Revoke the Tf.Notice listener, we don't need to update anything
+        # The cached positions are not updated without it
+        self._positions = {}
+        if self._stage_listener:
+            self._stage_listener.Revoke()
+            self._stage_listener = None
+
+    def _cancel_info(self):
+        """Stops the info providers of the previous selection"""
+        if self._info_request:
+            self._info_request.cancel()
+            self._info_request = None
+        self.info.value = []
+
+    def _start_info(self, prim: Usd.Prim):
+        """Runs the info providers, the lines are filled when the results arrive"""
+        providers = get_info_providers()
+        if not providers or not carb.settings.get_settings().get(SETTING_INFO_PROVIDERS):
+            return
+
+        def on_changed():
+            self.info.value = request.get_lines()
+            self._item_changed(self.info)
+
+        request = InfoRequest(prim, providers, on_changed)
+        self._info_request = request
+        self.info.value = request.get_lines()
+
+    def _set_prims(self, prims):
+        self._prims = prims
+        self._paths = [prim.GetPath() for prim in prims]
+        self._names = [str(path) for path in self._paths]
+        self._selected_paths = set(self._paths)
+        self._selection_index = {}
+        for path in self._selected_paths:
+            for prefix in chain(path.GetAncestorsRange(), (Sdf.Path.absoluteRootPath,)):
+                self._selection_index.setdefault(prefix, set()).add(path)
+        # The prims that stay selected keep their positions
+        self._positions = {path: self._positions[path] for path in self._selected_paths if path in self._positions}
+
+    def set_hovered_path(self, path: str):
+        """Called by the HoverPicker with the path of the object under the cursor, "" when there is nothing"""
+        if path == self._current_path:
+            return
+        self._set_selected_paths([path] if path else [])
+
     def _on_kit_selection_changed(self):
         """Called when a selection has changed."""
+        usd_context = self._get_context()
+        self._set_selected_paths(usd_context.get_selection().get_selected_prim_paths())
+
+    def _set_selected_paths(self, prim_paths):
+        """Shows the info of the objects"""
         # selection change, reset it for now
+        positions = self._positions
         self._current_path = ""
-        usd_context = self._get_context()
-        stage = usd_context.get_stage()
+        self._set_prims([])
+        self._cancel_info()
+        self._material_names = []
+        stage = self._get_context().get_stage()
         if not stage:
+            self._clear_summary()
+            self._revoke_listener()
+            return
+
+        if len(prim_paths) > 1 and carb.settings.get_settings().get(SETTING_SUMMARY):
+            self._update_summary(stage, prim_paths)
             return
+        self._clear_summary()
 
-        prim_paths = usd_context.get_selection().get_selected_prim_paths()
         if not prim_paths:
+            self._prim = None
+            self._revoke_listener()
             # This turns off the manipulator when everything is deselected
             self._item_changed(self.position)
             return
 
-        prim = stage.GetPrimAtPath(prim_paths[0])
-        if not prim.IsA(UsdGeom.Imageable):
+        if carb.settings.get_settings().get(SETTING_MULTI_SELECTION):
+            prims = [stage.GetPrimAtPath(path) for path in prim_paths]
+            prims = [prim for prim in prims if prim and prim.IsA(UsdGeom.Imageable)]
+        else:
+            prims = [stage.GetPrimAtPath(prim_paths[0])]
+        prim = prims[0] if prims else None
+        if not prim or not prim.IsA(UsdGeom.Imageable):
             self._prim = None
-            # Revoke the Tf.Notice listener, we don't need to update anything
-            if self._stage_listener:
-                self._stage_listener.Revoke()
-                self._stage_listener = None
+            self._revoke_listener()
             return
 
         if not self._stage_listener:
             # This handles camera movement
             self._stage_listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._notice_changed, stage)
 
-        material, relationship = UsdShade.MaterialBindingAPI(prim).ComputeBoundMaterial()
-        if material:
-            self._material_name = str(material.GetPath())
-        else:
-            self._material_name = "N/A"
+        # All the materials are resolved in one batch
+        material_paths = self._get_material_cache(stage).get_materials(prims)
+        self._material_names = ["N/A" if path.isEmpty else str(path) for path in material_paths]
+        self._material_name = self._material_names[0]
 
         self._prim = prim
-        self._current_path = prim_paths[0]
+        self._current_path = str(prim.GetPath())
+        # The listener kept the positions of the previous selection up to date
+        self._positions = positions
+        self._set_prims(prims)
+        self._start_info(prim)
 
         # Position is changed because new selected object has a different position
         self._item_changed(self.position)
 
+    def _clear_summary(self):
+        self._summary = None
+        self._summary_paths = set()
+        self._summary_index = {}
+        self._summary_queue = deque()
+        self._summary_pending = set()
+        self._summary_update_sub = None
+
+    def _add_to_summary_index(self, path: str):
+        """Adds the path and all its parents to the summary index"""
+        for prefix in Sdf.Path(path).GetAncestorsRange():
+            self._summary_index.setdefault(prefix, set()).add(path)
+
+    def _remove_from_summary_index(self, path: str):
+        """Removes the path and all its parents from the summary index"""
+        for prefix in Sdf.Path(path).GetAncestorsRange():
+            paths = self._summary_index.get(prefix)
+            if paths is None:
+                continue
+            paths.discard(path)
+            if not paths:
+                del self._summary_index[prefix]
+
+    def _update_summary(self, stage: Usd.Stage, prim_paths):
+        """Applies the difference between the selection and the summary, the added prims are resolved later"""
+        if self._summary is None:
+            self._summary = SelectionSummary()
+
+        selected = set(prim_paths)
+        for path in self._summary_paths - selected:
+            self._summary.remove(path)
+            self._summary_pending.discard(path)
+            self._remove_from_summary_index(path)
+        added = selected - self._summary_paths
+        for path in added:
+            self._add_to_summary_index(path)
+        self._summary_paths = selected
+        self._queue_summary(added)
+
+        if not self._stage_listener:
+            self._stage_listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._notice_changed, stage)
+        self._item_changed(self.position)
+
+    def _queue_summary(self, paths):
+        """The bounding boxes and the materials of the paths are computed on the next app updates"""
+        paths = [path for path in paths if path not in self._summary_pending]
+        if not paths:
+            return
+        self._summary_queue.extend(paths)
+        self._summary_pending.update(paths)
+        if not self._summary_update_sub:
+            self._summary_update_sub = (
+                omni.kit.app.get_app()
+                .get_update_event_stream()
+                .create_subscription_to_pop(self._on_summary_update, name="Object Info Summary")
+            )
+
+    def _on_summary_update(self, event):
+        """Called by update_event_stream. Adds the queued prims to the summary until the time budget is spent."""
+        stage = self._get_context().get_stage()
+        if not stage or self._summary is None:
+            self._summary_update_sub = None
+            return
+
+        budget = (carb.settings.get_settings().get(SETTING_SUMMARY_BUDGET) or 4.0) / 1000.0
+        deadline = time.perf_counter() + budget
+        caches = self._create_caches()
+        material_cache = self._get_material_cache(stage)
+        while self._summary_queue and time.perf_counter() < deadline:
+            prims = []
+            while self._summary_queue and len(prims) < SUMMARY_CHUNK:
+                path = self._summary_queue.popleft()
+                if path not in self._summary_pending:
+                    # Deselected while it was in the queue
+                    continue
+                self._summary_pending.discard(path)
+                prim = stage.GetPrimAtPath(path)
+                if prim and prim.IsA(UsdGeom.Imageable):
+                    prims.append(prim)
+            if not prims:
+                continue
+
+            # The materials of the chunk are resolved in one batch
+            material_paths = material_cache.get_materials(prims)
+            for prim, material_path in zip(prims, material_paths):
+                bbox_min, bbox_max = self._get_range(caches, prim)
+                material = "N/A" if material_path.isEmpty else str(material_path)
+                self._summary.add(str(prim.GetPath()), tuple(bbox_min), tuple(bbox_max), material)
+
+        if not self._summary_queue:
+            self._summary_update_sub = None
+        self._item_changed(self.position)
+
+    def _summary_notice_changed(self, notice: Usd.Notice):
+        """The prims of the summary whose bounding boxes or materials can be changed are queued again"""
+        changed = set()
+        for path in chain(notice.GetResyncedPaths(), notice.GetChangedInfoOnlyPaths()):
+            is_geometry = False
+            if path.IsPropertyPath():
+                name = path.name
+                if name == UsdGeom.Tokens.extentsHint and path.GetPrimPath().pathString in self._summary_paths:
+                    # The hint is authored again, the prim is measured with it
+                    self._stale_hints.discard(path.GetPrimPath())
+                    changed.add(path.GetPrimPath().pathString)
+                    continue
+                if name.startswith(COLLECTION_PREFIX):
+                    # The collection can bind the materials of any selected prim
+                    changed = set(self._summary_paths)
+                    break
+                is_geometry = name in GEOMETRY_PROPERTIES
+                if not (
+                    is_geometry
+                    or UsdGeom.Xformable.IsTransformationAffectedByAttrNamed(name)
+                    or name == UsdGeom.Tokens.visibility
+                    or name.startswith(BINDING_PREFIX)
+                ):
+                    continue
+
+            # The changed prim and its selected parents, only the parents in the index can be selected
+            prim_path = path.GetPrimPath()
+            parents = [
+                p
+                for p in prim_path.GetAncestorsRange()
+                if p in self._summary_index and p.pathString in self._summary_paths
+            ]
+            changed.update(p.pathString for p in parents)
+            if is_geometry or not path.IsPropertyPath():
+                self._stale_hints.update(parents)
+            if is_geometry:
+                continue
+            # The transforms, the visibility and the bindings change the selected children
+            changed.update(self._summary_index.get(prim_path, ()))
+
+        if changed:
+            for path in changed:
+                self._summary.remove(path)
+            self._queue_summary(changed)
+
+    def _get_summary_name(self):
+        if not self._summary and not self._summary_pending:
+            # Nothing selected is Imageable, the label is hidden
+            return ""
+        measured = len(self._summary)
+        selected = len(self._summary_paths)
+        if self._summary_pending:
+            return f"{selected:,} selected ({measured:,} measured)"
+        return f"{selected:,} selected"
+
+    def _get_summary_materials(self):
+        materials = self._summary.get_top_materials(SUMMARY_MATERIALS)
+        if not materials:
+            return "N/A"
+        return ", ".join(f"{material} ({count:,})" for material, count in materials)
+
     def _get_position(self):
         """Returns position of currently selected object"""
+        if self._summary is not None:
+            # The top of the union of the bounding boxes
+            bounds = self._summary.get_bounds()
+            if not bounds:
+                return [0, 0, 0]
+            bboxMin, bboxMax = bounds
+            return [(bboxMin[0] + bboxMax[0]) * 0.5, bboxMax[1] + TOP_OFFSET, (bboxMin[2] + bboxMax[2]) * 0.5]
+
         stage = self._get_context().get_stage()
         if not stage or not self._current_path:
             return [0, 0, 0]
 
         # Get position directly from USD
         prim = stage.GetPrimAtPath(self._current_path)
+        return self._get_top(self._create_caches(), prim)
+
+    def _get_positions(self):
+        """Returns the positions of all the selected objects as a flat list"""
+        positions = []
+        if not self._prims:
+            return positions
+
+        policy = carb.settings.get_settings().get(SETTING_BOUNDS_POLICY)
+        if policy != self._positions_policy:
+            # The cached positions are measured the other way
+            self._positions_policy = policy
+            self._positions = {}
+
+        # Only the prims without a cached position are measured. The caches are shared, so the transforms of the
+        # common parents are computed once.
+        caches = None
+        for prim, path in zip(self._prims, self._paths):
+            position = self._positions.get(path)
+            if position is None:
+                if not prim.IsValid():
+                    positions += [0, 0, 0]
+                    continue
+                if caches is None:
+                    caches = self._create_caches()
+                position = self._get_top(caches, prim)
+                self._positions[path] = position
+            positions += position
+        return positions
+
+    def _create_caches(self):
+        """The caches of a single query of the positions"""
         box_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), includedPurposes=[UsdGeom.Tokens.default_])
-        bound = box_cache.ComputeWorldBound(prim)
-        range = bound.ComputeAlignedBox()
-        bboxMin = range.GetMin()
-        bboxMax = range.GetMax()
+        return box_cache, UsdGeom.XformCache(Usd.TimeCode.Default())
+
+    def _get_extents_hint(self, xform_cache: UsdGeom.XformCache, prim: Usd.Prim):
+        """The world range of the authored extentsHint of the prim, None if it's missing or out of date"""
+        if prim.GetPath() in self._stale_hints:
+            return None
+        if carb.settings.get_settings().get(SETTING_BOUNDS_POLICY) == "full":
+            return None
+
+        # The label is placed with the default purpose, its min and max are the first pair of the hint
+        extents = UsdGeom.ModelAPI(prim).GetExtentsHint(Usd.TimeCode.Default())
+        if not extents or len(extents) < 2:
+            return None
+        local_range = Gf.Range3d(Gf.Vec3d(extents[0]), Gf.Vec3d(extents[1]))
+        if local_range.IsEmpty():
+            return None
+        return Gf.BBox3d(local_range, xform_cache.GetLocalToWorldTransform(prim)).ComputeAlignedRange()
+
+    def _get_top(self, caches, prim: Usd.Prim):
+        """Returns the top center of the world bounding box of the prim"""
+        bboxMin, bboxMax = self._get_range(caches, prim)
 
         # Find the top center of the bounding box and add a small offset upward.
         position = [(bboxMin[0] + bboxMax[0]) * 0.5, bboxMax[1] + TOP_OFFSET, (bboxMin[2] + bboxMax[2]) * 0.5]
         return position
+
+    def _get_range(self, caches, prim: Usd.Prim):
+        """Returns the min and the max of the world bounding box of the prim"""
+        box_cache, xform_cache = caches
+        # The index has the bounding boxes of the prims that didn't change since they were indexed
+        bounds_index = get_bounds_index()
+        indexed = bounds_index.get_range(prim.GetPath()) if bounds_index else None
+        hint = None if indexed else self._get_extents_hint(xform_cache, prim)
+        if indexed:
+            self._stats["bounds_index"] += 1
+            bboxMin, bboxMax = indexed
+        elif hint:
+            self._stats["extents_hint"] += 1
+            bboxMin = hint.GetMin()
+            bboxMax = hint.GetMax()
+        else:
+            # Traverse all the children
+            self._stats["full_bounds"] += 1
+            bound = box_cache.ComputeWorldBound(prim)
+            range = bound.ComputeAlignedBox()
+            bboxMin = range.GetMin()
+            bboxMax = range.GetMax()
+
+        return bboxMin, bboxMax
@@ -0,0 +1,98 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+#
+__all__ = ["SelectionSummary"]
+
+import heapq
+from collections import Counter
+from itertools import count
+
+# The heaps are compacted when they have this many more entries than the twice of the live entries
+COMPACT_SLACK = 1024
+
+
+class SelectionSummary:
+    """
+    The union of the world bounding boxes and the histogram of the materials of a large selection. The prims are added
+    and removed one by one and nothing is recomputed over the whole selection: the union is kept with a heap per side
+    of the box, the removed prims stay in the heaps until they reach the top, and the materials are counted.
+    """
+
+    def __init__(self):
+        # path -> (bbox min, bbox max, material)
+        self._prims = {}
+        # The entry of the path in the heaps, the entries with an older version are removed lazily
+        self._versions = {}
+        self._version = count()
+        # min x, y, z and negated max x, y, z, the entries are (value, version, path)
+        self._heaps = [[] for _ in range(6)]
+        self._materials = Counter()
+
+    def __len__(self):
+        return len(self._prims)
+
+    def __contains__(self, path):
+        return path in self._prims
+
+    def add(self, path, bbox_min, bbox_max, material: str):
+        """Adds the prim or replaces its bounding box and material"""
+        self.remove(path)
+
+        version = next(self._version)
+        self._versions[path] = version
+        self._prims[path] = (bbox_min, bbox_max, material)
+        for axis in range(3):
+            heapq.heappush(self._heaps[axis], (bbox_min[axis], version, path))
+            heapq.heappush(self._heaps[axis + 3], (-bbox_max[axis], version, path))
+        self._materials[material] += 1
+
+    def remove(self, path):
+        entry = self._prims.pop(path, None)
+        if entry is None:
+            return
+
+        del self._versions[path]
+        material = entry[2]
+        self._materials[material] -= 1
+        if not self._materials[material]:
+            del self._materials[material]
+
+        if max(len(heap) for heap in self._heaps) > 2 * len(self._prims) + COMPACT_SLACK:
+            self._compact()
+
+    def clear(self):
+        self._prims = {}
+        self._versions = {}
+        self._heaps = [[] for _ in range(6)]
+        self._materials = Counter()
+
+    def get_bounds(self):
+        """Returns the min and the max of the union of the bounding boxes, None if the summary is empty"""
+        if not self._prims:
+            return None
+        values = [self._get_top(heap) for heap in self._heaps]
+        return values[:3], [-value for value in values[3:]]
+
+    def get_top_materials(self, n: int):
+        """Returns the n most bound materials with the number of prims"""
+        return self._materials.most_common(n)
+
+    def _get_top(self, heap):
+        """The top of the heap, the removed and the replaced prims on the top are dropped"""
+        while heap:
+            value, version, path = heap[0]
+            if self._versions.get(path) == version:
+                return value
+            heapq.heappop(heap)
+        return None
+
+    def _compact(self):
+        """Rebuilds the heaps from the live entries"""
+        for heap in self._heaps:
+            heap[:] = [entry for entry in heap if self._versions.get(entry[2]) == entry[1]]
+            heapq.heapify(heap)
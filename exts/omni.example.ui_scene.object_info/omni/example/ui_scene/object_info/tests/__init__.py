@@ -0,0 +1,6 @@
+from .test_bounds_index import TestBoundsIndex
+from .test_hover_picker import TestHoverPicker
+from .test_info_providers import TestInfoProviders
+from .test_material_cache import TestMaterialBindingCache
+from .test_model import TestObjectInfoModel
+from .test_selection_summary import TestSelectionSummary
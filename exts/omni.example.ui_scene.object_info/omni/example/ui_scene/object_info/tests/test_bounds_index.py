@@ -0,0 +1,116 @@
+## Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+##
+## NVIDIA CORPORATION and its licensors retain all intellectual property
+## and proprietary rights in and to this software, related documentation
+## and any modifications thereto.  Any use, reproduction, disclosure or
+## distribution of this software and related documentation without an express
+## license agreement from NVIDIA CORPORATION is strictly prohibited.
+##
+__all__ = ["TestBoundsIndex"]
+
+import carb.settings
+import omni.kit.app
+import omni.kit.test
+import omni.usd
+from omni.example.ui_scene.object_info.bounds_index import SETTING_BOUNDS_INDEX_BUDGET, BoundsIndex
+from pxr import Gf, Sdf, Usd, UsdGeom
+
+
+class TestBoundsIndex(omni.kit.test.AsyncTestCase):
+    # Before running each test
+    async def setUp(self):
+        await omni.usd.get_context().new_stage_async()
+        self._stage = omni.usd.get_context().get_stage()
+        UsdGeom.Xform.Define(self._stage, "/World")
+        for i in range(10):
+            cube = UsdGeom.Cube.Define(self._stage, f"/World/Cube{i}")
+            cube.AddTranslateOp().Set(Gf.Vec3d(3 * i, 0, 0))
+        self._index = None
+
+    # After running each test
+    async def tearDown(self):
+        carb.settings.get_settings().set(SETTING_BOUNDS_INDEX_BUDGET, 2.0)
+        if self._index:
+            self._index.destroy()
+            self._index = None
+        self._stage = None
+
+    async def _wait(self):
+        """Waits until the stage and the queued subtrees are indexed"""
+        for _ in range(1000):
+            stats = self._index.get_stats()
+            if stats["complete"] and stats["dirty_paths"] == 0:
+                return
+            await omni.kit.app.get_app().next_update_async()
+        self.fail("The index is not complete")
+
+    def _assert_indexed(self, path):
+        bbox_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), includedPurposes=[UsdGeom.Tokens.default_])
+        aligned = bbox_cache.ComputeWorldBound(self._stage.GetPrimAtPath(path)).ComputeAlignedBox()
+        bbox_min, bbox_max = self._index.get_range(Sdf.Path(path))
+        self.assertEqual(list(bbox_min), list(aligned.GetMin()))
+        self.assertEqual(list(bbox_max), list(aligned.GetMax()))
+
+    async def test_edit_during_build(self):
+        # one prim per app update
+        carb.settings.get_settings().set(SETTING_BOUNDS_INDEX_BUDGET, 0.000001)
+        self._index = BoundsIndex()
+        await omni.kit.app.get_app().next_update_async()
+        await omni.kit.app.get_app().next_update_async()
+        self.assertFalse(self._index.is_complete)
+
+        # the children of /World are on the stack of the build already, the new cube is queued
+        UsdGeom.Cube.Define(self._stage, "/World/Added").AddTranslateOp().Set(Gf.Vec3d(0, 50, 0))
+        UsdGeom.Xformable(self._stage.GetPrimAtPath("/World/Cube0")).GetOrderedXformOps()[0].Set(Gf.Vec3d(0, 0, -9))
+        self._stage.RemovePrim("/World/Cube9")
+
+        await self._wait()
+        self.assertEqual(self._index.get_stats()["builds"], 1)
+        for path in ["/World", "/World/Added", "/World/Cube0"]:
+            self._assert_indexed(path)
+        self.assertIsNone(self._index.get_range(Sdf.Path("/World/Cube9")))
+
+    async def test_edit_after_build(self):
+        self._index = BoundsIndex()
+        await self._wait()
+        self.assertEqual(self._index.get_stats()["indexed"], 11)
+
+        cube = UsdGeom.Xformable(self._stage.GetPrimAtPath("/World/Cube5"))
+        cube.GetOrderedXformOps()[0].Set(Gf.Vec3d(0, 100, 0))
+        # the subtree and its parents are dirty until they are indexed again
+        self.assertIsNone(self._index.get_range(Sdf.Path("/World/Cube5")))
+        self.assertIsNone(self._index.get_range(Sdf.Path("/World")))
+        self._assert_indexed("/World/Cube4")
+
+        await self._wait()
+        self.assertEqual(self._index.get_stats()["builds"], 1)
+        self._assert_indexed("/World/Cube5")
+        self._assert_indexed("/World")
+
+        # the removed prims leave the index
+        self._stage.RemovePrim("/World/Cube5")
+        await self._wait()
+        self.assertEqual(self._index.get_stats()["indexed"], 10)
+        UsdGeom.Cube.Define(self._stage, "/World/Added")
+        await self._wait()
+        self.assertEqual(self._index.get_stats()["indexed"], 11)
+        self._assert_indexed("/World/Added")
+        self._assert_indexed("/World")
+
+    async def test_many_dirty_paths(self):
+        self._index = BoundsIndex()
+        await self._wait()
+
+        # the many dirty subtrees are queued, the index is not built again
+        for i in range(10):
+            for j in range(200):
+                UsdGeom.Cube.Define(self._stage, f"/World/Cube{i}/Child{j}")
+        self.assertEqual(self._index.get_stats()["dirty_paths"], 2000)
+
+        await self._wait()
+        stats = self._index.get_stats()
+        self.assertEqual(stats["builds"], 1)
+        self.assertEqual(stats["indexed"], 2011)
+        self._assert_indexed("/World/Cube3/Child7")
+        self._assert_indexed("/World/Cube3")
+        self._assert_indexed("/World")
@@ -0,0 +1,113 @@
+## Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+##
+## NVIDIA CORPORATION and its licensors retain all intellectual property
+## and proprietary rights in and to this software, related documentation
+## and any modifications thereto.  Any use, reproduction, disclosure or
+## distribution of this software and related documentation without an express
+## license agreement from NVIDIA CORPORATION is strictly prohibited.
+##
+__all__ = ["TestHoverPicker"]
+
+import carb.settings
+import omni.kit.test
+from omni.example.ui_scene.object_info.hover_picker import SETTING_HOVER_PICK_RATE, HoverPicker
+
+
+class _ViewportApi:
+    """The pick API of the viewport: the queries are completed by the test"""
+
+    RESOLUTION = 100
+
+    def __init__(self):
+        self.queries = []
+
+    def map_ndc_to_texture_pixel(self, ndc):
+        pixel = [(ndc[0] + 1.0) * 0.5 * self.RESOLUTION, (1.0 - ndc[1]) * 0.5 * self.RESOLUTION]
+        return pixel, self
+
+    def request_query(self, pixel, callback, query_name=""):
+        self.queries.append((tuple(pixel), callback))
+
+    def complete(self, path):
+        pixel, callback = self.queries[-1]
+        callback(path, None, pixel)
+
+
+class TestHoverPicker(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._viewport_api = _ViewportApi()
+        self._picked = []
+        self._picker = HoverPicker(self._viewport_api, self._picked.append, subscribe_updates=False)
+
+    async def tearDown(self):
+        carb.settings.get_settings().set(SETTING_HOVER_PICK_RATE, 0)
+        self._picker.destroy()
+        self._picker = None
+
+    async def test_one_query_in_flight(self):
+        self._picker.on_mouse_moved((0.0, 0.0))
+        self._picker.update(0.0)
+        self.assertEqual(len(self._viewport_api.queries), 1)
+
+        # the cursor moves while the query is in flight
+        for i in range(1, 4):
+            self._picker.on_mouse_moved((0.1 * i, 0.0))
+            self._picker.update(0.01 * i)
+        self.assertEqual(len(self._viewport_api.queries), 1)
+        self.assertEqual(self._picker.get_stats()["throttled"], 3)
+
+        # the result of the pixel the cursor left is not reported
+        self._viewport_api.complete("/World/Cube")
+        self.assertEqual(self._picked, [])
+        self.assertEqual(self._picker.get_stats()["dropped"], 1)
+
+        # the next update asks for the pixel under the cursor
+        self._picker.update(0.05)
+        self.assertEqual(len(self._viewport_api.queries), 2)
+        self.assertEqual(self._viewport_api.queries[-1][0], (65, 50))
+        self._viewport_api.complete("/World/Sphere")
+        self.assertEqual(self._picked, ["/World/Sphere"])
+
+    async def test_still_cursor_is_cached(self):
+        self._picker.on_mouse_moved((0.0, 0.0))
+        self._picker.update(0.0)
+        self._viewport_api.complete("/World/Cube")
+        self.assertEqual(self._picked, ["/World/Cube"])
+
+        for i in range(1, 10):
+            self._picker.on_mouse_moved((0.0, 0.0))
+            self._picker.update(0.01 * i)
+        self.assertEqual(len(self._viewport_api.queries), 1)
+        self.assertEqual(self._picked, ["/World/Cube"])
+
+        # nothing under the cursor
+        self._picker.on_mouse_moved((0.5, 0.5))
+        self._picker.update(0.1)
+        self._viewport_api.complete("")
+        self.assertEqual(self._picked, ["/World/Cube", ""])
+
+        # the cursor is back, the cache answers
+        self._picker.on_mouse_moved((0.0, 0.0))
+        self._picker.update(0.2)
+        self.assertEqual(len(self._viewport_api.queries), 2)
+        self.assertEqual(self._picked, ["/World/Cube", "", "/World/Cube"])
+        self.assertEqual(self._picker.get_stats()["cache_hits"], 1)
+
+        # the invalidated cache makes a new query
+        self._picker.invalidate()
+        self._picker.update(0.3)
+        self.assertEqual(len(self._viewport_api.queries), 3)
+
+    async def test_pick_rate(self):
+        carb.settings.get_settings().set(SETTING_HOVER_PICK_RATE, 10)
+
+        self._picker.on_mouse_moved((0.0, 0.0))
+        self._picker.update(0.0)
+        self._viewport_api.complete("/World/Cube")
+
+        self._picker.on_mouse_moved((0.2, 0.0))
+        self._picker.update(0.05)
+        self.assertEqual(len(self._viewport_api.queries), 1)
+
+        self._picker.update(0.11)
+        self.assertEqual(len(self._viewport_api.queries), 2)
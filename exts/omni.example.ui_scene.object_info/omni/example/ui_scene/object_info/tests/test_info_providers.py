@@ -0,0 +1,133 @@
+## Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+##
+## NVIDIA CORPORATION and its licensors retain all intellectual property
+## and proprietary rights in and to this software, related documentation
+## and any modifications thereto.  Any use, reproduction, disclosure or
+## distribution of this software and related documentation without an express
+## license agreement from NVIDIA CORPORATION is strictly prohibited.
+##
+__all__ = ["TestInfoProviders"]
+
+import asyncio
+
+import carb.settings
+import omni.kit.app
+import omni.kit.test
+import omni.usd
+from omni.example.ui_scene.object_info.info_providers import (
+    PRIMS_PER_SLICE,
+    InfoProvider,
+    InfoRequest,
+    TriangleCountProvider,
+    register_info_provider,
+    unregister_info_provider,
+)
+from omni.example.ui_scene.object_info.object_info_model import SETTING_INFO_PROVIDERS, ObjectInfoModel
+from pxr import Sdf, UsdGeom
+
+
+class _SlowProvider(InfoProvider):
+    """Waits longer than any test, and records the prims it was cancelled for"""
+
+    name = "Slow"
+
+    def __init__(self, time_budget):
+        self.time_budget = time_budget
+        self.cancelled = []
+
+    def prepare(self, prim):
+        return prim.GetPath().pathString
+
+    async def compute(self, data):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled.append(data)
+            raise
+        return "done"
+
+
+class TestInfoProviders(omni.kit.test.AsyncTestCase):
+    # Before running each test
+    async def setUp(self):
+        await omni.usd.get_context().new_stage_async()
+        self._stage = omni.usd.get_context().get_stage()
+
+    # After running each test
+    async def tearDown(self):
+        carb.settings.get_settings().set(SETTING_INFO_PROVIDERS, False)
+        unregister_info_provider(_SlowProvider.name)
+        self._stage = None
+
+    async def _run(self, prim, providers):
+        """Returns the lines when all the providers are finished"""
+        finished = asyncio.Event()
+        remaining = [len(providers)]
+
+        def on_changed():
+            remaining[0] -= 1
+            if not remaining[0]:
+                finished.set()
+
+        request = InfoRequest(prim, providers, on_changed)
+        await asyncio.wait_for(finished.wait(), 10.0)
+        return request.get_lines()
+
+    async def test_time_budget(self):
+        prim = UsdGeom.Xform.Define(self._stage, "/World").GetPrim()
+        provider = _SlowProvider(time_budget=0.05)
+        self.assertEqual(await self._run(prim, [provider]), ["Slow: timed out"])
+        # the timeout cancels compute
+        self.assertEqual(provider.cancelled, ["/World"])
+
+    async def test_cancel_on_selection_change(self):
+        carb.settings.get_settings().set(SETTING_INFO_PROVIDERS, True)
+        provider = _SlowProvider(time_budget=60.0)
+        register_info_provider(provider)
+        for path in ("/World/A", "/World/B"):
+            UsdGeom.Cube.Define(self._stage, path)
+        model = ObjectInfoModel()
+
+        selection = omni.usd.get_context().get_selection()
+        selection.set_selected_prim_paths(["/World/A"], True)
+        await omni.kit.app.get_app().next_update_async()
+        self.assertIn("Slow: ...", model.get_item("info").value)
+
+        # the providers of the previous selection are stopped
+        selection.set_selected_prim_paths(["/World/B"], True)
+        await omni.kit.app.get_app().next_update_async()
+        await omni.kit.app.get_app().next_update_async()
+        self.assertEqual(provider.cancelled, ["/World/A"])
+        self.assertIn("Slow: ...", model.get_item("info").value)
+
+        model.destroy()
+        await omni.kit.app.get_app().next_update_async()
+        self.assertEqual(provider.cancelled, ["/World/A", "/World/B"])
+
+    async def test_triangle_count(self):
+        UsdGeom.Xform.Define(self._stage, "/World")
+        with Sdf.ChangeBlock():
+            for i in range(2 * PRIMS_PER_SLICE):
+                spec = Sdf.CreatePrimInLayer(self._stage.GetRootLayer(), f"/World/Mesh{i}")
+                spec.specifier = Sdf.SpecifierDef
+                spec.typeName = "Mesh"
+                # a quad and a triangle, 3 triangles
+                counts = Sdf.AttributeSpec(spec, UsdGeom.Tokens.faceVertexCounts, Sdf.ValueTypeNames.IntArray)
+                counts.default = [4, 3]
+
+        # the reading of the stage lets the app update every PRIMS_PER_SLICE prims
+        root = self._stage.GetPrimAtPath("/World")
+        provider = TriangleCountProvider()
+        prepare = provider.prepare(root)
+        slices = 0
+        while True:
+            try:
+                prepare.send(None)
+            except StopIteration as stop:
+                data = stop.value
+                break
+            slices += 1
+        self.assertEqual(slices, 2)
+        self.assertEqual(provider.compute(data), "3,000")
+
+        self.assertEqual(await self._run(root, [provider]), ["Triangles: 3,000"])
@@ -0,0 +1,77 @@
+## Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+##
+## NVIDIA CORPORATION and its licensors retain all intellectual property
+## and proprietary rights in and to this software, related documentation
+## and any modifications thereto.  Any use, reproduction, disclosure or
+## distribution of this software and related documentation without an express
+## license agreement from NVIDIA CORPORATION is strictly prohibited.
+##
+__all__ = ["TestMaterialBindingCache"]
+
+import omni.kit.test
+import omni.usd
+from omni.example.ui_scene.object_info.material_cache import MaterialBindingCache
+from pxr import Sdf, Usd, UsdGeom, UsdShade
+
+
+class TestMaterialBindingCache(omni.kit.test.AsyncTestCase):
+    # Before running each test
+    async def setUp(self):
+        await omni.usd.get_context().new_stage_async()
+        self._stage = omni.usd.get_context().get_stage()
+        self._red = UsdShade.Material.Define(self._stage, "/World/Looks/Red")
+        self._blue = UsdShade.Material.Define(self._stage, "/World/Looks/Blue")
+        self._cubes = [UsdGeom.Cube.Define(self._stage, f"/World/{name}/Cube").GetPrim() for name in ("A", "B")]
+        for cube in self._cubes:
+            UsdShade.MaterialBindingAPI.Apply(cube)
+        UsdShade.MaterialBindingAPI(self._cubes[0]).Bind(self._red)
+        self._cache = MaterialBindingCache(self._stage)
+
+    # After running each test
+    async def tearDown(self):
+        self._cache.destroy()
+        self._cache = None
+        self._cubes = None
+        self._stage = None
+
+    def _get_materials(self):
+        return [path.pathString for path in self._cache.get_materials(self._cubes)]
+
+    async def test_binding_edit(self):
+        self.assertEqual(self._get_materials(), ["/World/Looks/Red", ""])
+        self.assertEqual(self._get_materials(), ["/World/Looks/Red", ""])
+        self.assertEqual(self._cache.get_stats(), {"hits": 2, "misses": 2, "invalidations": 0, "size": 2})
+
+        # only the prim with the edited binding is resolved again
+        UsdShade.MaterialBindingAPI(self._cubes[0]).Bind(self._blue)
+        self.assertEqual(self._cache.get_stats()["size"], 1)
+        self.assertEqual(self._get_materials(), ["/World/Looks/Blue", ""])
+        self.assertEqual(self._cache.get_stats()["misses"], 3)
+
+        # the other properties don't invalidate the cache
+        UsdGeom.Cube(self._cubes[1]).GetSizeAttr().Set(4.0)
+        self.assertEqual(self._cache.get_stats()["size"], 2)
+
+    async def test_collection_edit(self):
+        world = self._stage.GetPrimAtPath("/World")
+        collection = Usd.CollectionAPI.Apply(world, "blue")
+        UsdShade.MaterialBindingAPI.Apply(world).Bind(collection, self._blue, "blue")
+        self.assertEqual(self._get_materials(), ["/World/Looks/Red", ""])
+
+        # the collection can bind any prim, the whole cache is dropped
+        collection.IncludePath("/World/B/Cube")
+        self.assertEqual(self._cache.get_stats()["size"], 0)
+        self.assertEqual(self._get_materials(), ["/World/Looks/Red", "/World/Looks/Blue"])
+
+    async def test_resync(self):
+        self.assertEqual(self._get_materials(), ["/World/Looks/Red", ""])
+
+        # the removed material is dropped with the prims bound to it
+        self._stage.RemovePrim("/World/Looks/Red")
+        self.assertEqual(self._cache.get_stats()["size"], 1)
+        self.assertEqual(self._get_materials(), ["", ""])
+
+        # the prims under the resynced prim are dropped
+        self._stage.RemovePrim("/World/B")
+        self.assertEqual(self._cache.get_stats()["size"], 1)
+        self.assertEqual(self._cache.get_materials([self._cubes[0]])[0], Sdf.Path.emptyPath)
@@ -0,0 +1,161 @@
+## Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+##
+## NVIDIA CORPORATION and its licensors retain all intellectual property
+## and proprietary rights in and to this software, related documentation
+## and any modifications thereto.  Any use, reproduction, disclosure or
+## distribution of this software and related documentation without an express
+## license agreement from NVIDIA CORPORATION is strictly prohibited.
+##
+__all__ = ["TestObjectInfoModel"]
+
+import carb.settings
+import omni.kit.app
+import omni.kit.test
+import omni.usd
+from omni.example.ui_scene.object_info.object_info_model import (
+    SETTING_BOUNDS_POLICY,
+    SETTING_MULTI_SELECTION,
+    TOP_OFFSET,
+    ObjectInfoModel,
+)
+from pxr import Gf, Sdf, UsdGeom, UsdShade, Vt
+
+
+class TestObjectInfoModel(omni.kit.test.AsyncTestCase):
+    # Before running each test
+    async def setUp(self):
+        await omni.usd.get_context().new_stage_async()
+        self._stage = omni.usd.get_context().get_stage()
+        self._model = ObjectInfoModel()
+
+    # After running each test
+    async def tearDown(self):
+        carb.settings.get_settings().set(SETTING_BOUNDS_POLICY, "extentsHint")
+        carb.settings.get_settings().set(SETTING_MULTI_SELECTION, False)
+        self._model.destroy()
+        self._model = None
+        self._stage = None
+
+    async def _select(self, paths):
+        omni.usd.get_context().get_selection().set_selected_prim_paths(paths, True)
+        await omni.kit.app.get_app().next_update_async()
+
+    def _get_top(self):
+        return self._model.get_as_floats(self._model.get_item("position"))[1]
+
+    async def test_extents_hint(self):
+        asset = UsdGeom.Xform.Define(self._stage, "/World/Asset")
+        cube = UsdGeom.Cube.Define(self._stage, "/World/Asset/Cube")
+        cube.CreateSizeAttr(2.0)
+        cube.CreateExtentAttr(Vt.Vec3fArray([(-1, -1, -1), (1, 1, 1)]))
+        # the hint is larger than the cube, so it's clear which way the position is computed
+        UsdGeom.ModelAPI(asset.GetPrim()).SetExtentsHint(Vt.Vec3fArray([(-5, -5, -5), (5, 5, 5)]))
+        await self._select(["/World/Asset"])
+
+        self.assertAlmostEqual(self._get_top(), 5 + TOP_OFFSET)
+        self.assertEqual(self._model.get_stats()["extents_hint"], 1)
+        self.assertEqual(self._model.get_stats()["full_bounds"], 0)
+
+        # the changed geometry makes the hint out of date
+        cube.GetSizeAttr().Set(4.0)
+        cube.GetExtentAttr().Set(Vt.Vec3fArray([(-2, -2, -2), (2, 2, 2)]))
+        self.assertAlmostEqual(self._get_top(), 2 + TOP_OFFSET)
+        self.assertEqual(self._model.get_stats()["full_bounds"], 1)
+
+        # the hint is still out of date when the prim is selected again
+        await self._select([])
+        await self._select(["/World/Asset"])
+        self.assertAlmostEqual(self._get_top(), 2 + TOP_OFFSET)
+        self.assertEqual(self._model.get_stats()["extents_hint"], 1)
+        self.assertEqual(self._model.get_stats()["full_bounds"], 2)
+
+        # until it's authored again
+        UsdGeom.ModelAPI(asset.GetPrim()).SetExtentsHint(Vt.Vec3fArray([(-3, -3, -3), (3, 3, 3)]))
+        self.assertAlmostEqual(self._get_top(), 3 + TOP_OFFSET)
+        self.assertEqual(self._model.get_stats()["extents_hint"], 2)
+
+        # the policy "full" never uses the hint
+        carb.settings.get_settings().set(SETTING_BOUNDS_POLICY, "full")
+        self.assertAlmostEqual(self._get_top(), 2 + TOP_OFFSET)
+        self.assertEqual(self._model.get_stats()["full_bounds"], 3)
+
+    async def test_no_extents_hint(self):
+        cube = UsdGeom.Cube.Define(self._stage, "/World/Cube")
+        cube.CreateSizeAttr(2.0)
+        cube.CreateExtentAttr(Vt.Vec3fArray([(-1, -1, -1), (1, 1, 1)]))
+        await self._select(["/World/Cube"])
+
+        self.assertAlmostEqual(self._get_top(), 1 + TOP_OFFSET)
+        self.assertEqual(self._model.get_stats(), {"bounds_index": 0, "extents_hint": 0, "full_bounds": 1})
+
+    async def test_notice_filtering(self):
+        world = UsdGeom.Xform.Define(self._stage, "/World")
+        world_translate = world.AddTranslateOp()
+        asset = UsdGeom.Xform.Define(self._stage, "/World/Asset")
+        user_value = asset.GetPrim().CreateAttribute("userValue", Sdf.ValueTypeNames.Float)
+        mesh = UsdGeom.Mesh.Define(self._stage, "/World/Asset/Mesh")
+        mesh.CreatePointsAttr(Vt.Vec3fArray([(0, 0, 0), (1, 1, 1)]))
+        mesh.CreateExtentAttr(Vt.Vec3fArray([(0, 0, 0), (1, 1, 1)]))
+        # the sibling shares the name prefix of the selected prim
+        sibling_translate = UsdGeom.Xform.Define(self._stage, "/World/Asset2").AddTranslateOp()
+        await self._select(["/World/Asset"])
+
+        changes = []
+        sub = self._model.subscribe_item_changed_fn(lambda model, item: changes.append(item))
+
+        # the property that doesn't move the bounding box
+        user_value.Set(1.0)
+        self.assertEqual(len(changes), 0)
+
+        # the transform of the parent
+        world_translate.Set(Gf.Vec3d(0, 10, 0))
+        self.assertEqual(len(changes), 1)
+
+        # the geometry of the child
+        mesh.GetPointsAttr().Set(Vt.Vec3fArray([(0, 0, 0), (2, 2, 2)]))
+        self.assertEqual(len(changes), 2)
+        mesh.GetExtentAttr().Set(Vt.Vec3fArray([(0, 0, 0), (2, 2, 2)]))
+        self.assertEqual(len(changes), 3)
+
+        # /World/Asset2 is not under /World/Asset
+        sibling_translate.Set(Gf.Vec3d(10, 0, 0))
+        self.assertEqual(changes, [self._model.position] * 3)
+        # releasing the subscription unsubscribes the callback
+        del sub
+
+    async def test_multi_selection(self):
+        carb.settings.get_settings().set(SETTING_MULTI_SELECTION, True)
+        UsdGeom.Xform.Define(self._stage, "/World")
+        red = UsdShade.Material.Define(self._stage, "/World/Looks/Red")
+        for i in range(3):
+            cube = UsdGeom.Cube.Define(self._stage, f"/World/Cube{i}")
+            cube.CreateExtentAttr(Vt.Vec3fArray([(-1, -1, -1), (1, 1, 1)]))
+            cube.AddTranslateOp().Set(Gf.Vec3d(10 * i, 0, 0))
+        UsdShade.MaterialBindingAPI.Apply(self._stage.GetPrimAtPath("/World/Cube1")).Bind(red)
+        await self._select(["/World/Cube0", "/World/Cube1", "/World/Cube2"])
+
+        self.assertEqual(self._model.get_item("names"), ["/World/Cube0", "/World/Cube1", "/World/Cube2"])
+        self.assertEqual(self._model.get_item("materials"), ["N/A", "/World/Looks/Red", "N/A"])
+        positions = self._model.get_as_floats(self._model.get_item("positions"))
+        for i in range(3):
+            self.assertEqual(positions[3 * i : 3 * i + 3], [10 * i, 1 + TOP_OFFSET, 0])
+        self.assertEqual(self._model.get_stats()["full_bounds"], 3)
+
+        # only the moved cube is measured again
+        UsdGeom.Xformable(self._stage.GetPrimAtPath("/World/Cube1")).GetOrderedXformOps()[0].Set(Gf.Vec3d(0, 20, 0))
+        positions = self._model.get_as_floats(self._model.get_item("positions"))
+        self.assertEqual(positions[3:6], [0, 21 + TOP_OFFSET, 0])
+        self.assertEqual(self._model.get_stats()["full_bounds"], 4)
+
+        # the moved parent measures all the cubes under it
+        UsdGeom.Xformable(self._stage.GetPrimAtPath("/World")).AddTranslateOp().Set(Gf.Vec3d(0, 0, 5))
+        positions = self._model.get_as_floats(self._model.get_item("positions"))
+        self.assertEqual(positions[2::3], [5, 5, 5])
+        self.assertEqual(self._model.get_stats()["full_bounds"], 7)
+
+        # the prims that stay selected keep their positions
+        await self._select(["/World/Cube0", "/World/Cube2"])
+        self.assertEqual(self._model.get_item("names"), ["/World/Cube0", "/World/Cube2"])
+        self.assertEqual(self._model.get_item("materials"), ["N/A", "N/A"])
+        self.assertEqual(self._model.get_as_floats(self._model.get_item("positions"))[::3], [0, 20])
+        self.assertEqual(self._model.get_stats()["full_bounds"], 7)
@@ -0,0 +1,59 @@
+## Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+##
+## NVIDIA CORPORATION and its licensors retain all intellectual property
+## and proprietary rights in and to this software, related documentation
+## and any modifications thereto.  Any use, reproduction, disclosure or
+## distribution of this software and related documentation without an express
+## license agreement from NVIDIA CORPORATION is strictly prohibited.
+##
+__all__ = ["TestSelectionSummary"]
+
+import omni.kit.test
+from omni.example.ui_scene.object_info.selection_summary import SelectionSummary
+
+
+class TestSelectionSummary(omni.kit.test.AsyncTestCase):
+    async def test_bounds(self):
+        summary = SelectionSummary()
+        self.assertIsNone(summary.get_bounds())
+
+        summary.add("/A", (0, 0, 0), (1, 1, 1), "/Red")
+        summary.add("/B", (-2, 0, 0), (0, 3, 1), "/Red")
+        summary.add("/C", (0, -1, 0), (1, 1, 5), "/Blue")
+        self.assertEqual(summary.get_bounds(), ([-2, -1, 0], [1, 3, 5]))
+
+        # the prims on the boundary leave the union
+        summary.remove("/B")
+        summary.remove("/C")
+        self.assertEqual(summary.get_bounds(), ([0, 0, 0], [1, 1, 1]))
+
+        # the replaced prim keeps only the new box
+        summary.add("/A", (4, 4, 4), (5, 5, 5), "/Red")
+        self.assertEqual(summary.get_bounds(), ([4, 4, 4], [5, 5, 5]))
+        self.assertEqual(len(summary), 1)
+
+        summary.remove("/A")
+        self.assertIsNone(summary.get_bounds())
+
+    async def test_materials(self):
+        summary = SelectionSummary()
+        for i in range(5):
+            summary.add(f"/Red{i}", (0, 0, 0), (1, 1, 1), "/Red")
+        for i in range(3):
+            summary.add(f"/Blue{i}", (0, 0, 0), (1, 1, 1), "/Blue")
+        summary.add("/Green", (0, 0, 0), (1, 1, 1), "/Green")
+        self.assertEqual(summary.get_top_materials(2), [("/Red", 5), ("/Blue", 3)])
+
+        summary.add("/Red0", (0, 0, 0), (1, 1, 1), "/Green")
+        summary.remove("/Blue0")
+        self.assertEqual(summary.get_top_materials(3), [("/Red", 4), ("/Blue", 2), ("/Green", 2)])
+
+    async def test_compact(self):
+        summary = SelectionSummary()
+        for i in range(3000):
+            summary.add(f"/Prim{i}", (-i, 0, 0), (i, 1, 1), "/Material")
+        for i in range(2999, 0, -1):
+            summary.remove(f"/Prim{i}")
+        # the heaps don't keep the removed prims forever
+        self.assertLess(max(len(heap) for heap in summary._heaps), 2 + 2 * 1024)
+        self.assertEqual(summary.get_bounds(), ([0, 0, 0], [0, 1, 1]))
@@ -9,10 +9,14 @@
 __all__ = ["ViewportScene"]
 
 from omni.ui import scene as sc
+import carb.settings
 import omni.ui as ui
 
+from .hover_picker import HoverGesture
+from .hover_picker import HoverPicker
 from .object_info_manipulator import ObjectInfoManipulator
 from .object_info_model import ObjectInfoModel
+from .object_info_model import SETTING_HOVER
 
 
 class ViewportScene():
@@ -20,6 +24,9 @@ class ViewportScene():
 
     def __init__(self, viewport_window: ui.Window, ext_id: str) -> None:
         self._scene_view = None
+        self._model = None
+        self._manipulator = None
+        self._hover_picker = None
         self._viewport_window = viewport_window
 
         # Create a unique frame for our SceneView
@@ -28,7 +35,15 @@ class ViewportScene():
             self._scene_view = sc.SceneView()
             # Add the manipulator into the SceneView's scene
             with self._scene_view.scene:
-                ObjectInfoManipulator(model=ObjectInfoModel())
+                self._model = ObjectInfoModel()
+                self._manipulator = ObjectInfoManipulator(scene_view=self._scene_view, model=self._model)
+
+                if carb.settings.get_settings().get(SETTING_HOVER):
+                    # Pick the object under the cursor, the screen gets the mouse moves everywhere
+                    self._hover_picker = HoverPicker(
+                        self._viewport_window.viewport_api, self._model.set_hovered_path, self._scene_view
+                    )
+                    sc.Screen(gesture=HoverGesture(self._hover_picker, self._scene_view))
 
             # Register the SceneView with the Viewport to get projection and view updates
             self._viewport_window.viewport_api.add_scene_view(self._scene_view)
@@ -43,6 +58,15 @@ class ViewportScene():
             # Be a good citizen, and un-register the SceneView from Viewport updates
             if self._viewport_window:
                 self._viewport_window.viewport_api.remove_scene_view(self._scene_view)
+        if self._hover_picker:
+            self._hover_picker.destroy()
+        if self._manipulator:
+            self._manipulator.destroy()
+        if self._model:
+            self._model.destroy()
         # Remove our references to these objects
+        self._hover_picker = None
+        self._manipulator = None
+        self._model = None
         self._viewport_window = None
         self._scene_view = None
@@ -8,16 +8,25 @@
 #
 __all__ = ["PrimWidgetModel"]
 
+from pxr import Gf
+from pxr import Sdf
 from pxr import Tf
 from pxr import Usd
 from pxr import UsdGeom
 from pxr import UsdShade
 from omni.ui import scene as sc
+import carb.settings
 import omni.usd
 
 # The distance to raise above the top of the object's bounding box
 TOP_OFFSET = 5
 
+# "extentsHint" places the widget with the authored extentsHint of the models, "full" always traverses the children
+SETTING_BOUNDS_POLICY = "/exts/omni.example.ui_scene.prim_widget/boundsPolicy"
+
+# The changes of these properties make the extentsHint out of date
+GEOMETRY_PROPERTIES = (UsdGeom.Tokens.extent, UsdGeom.Tokens.points)
+
 
 class PrimWidgetModel(sc.AbstractManipulatorModel):
     """
@@ -45,6 +54,13 @@ class PrimWidgetModel(sc.AbstractManipulatorModel):
         
         self._stage_listener = None
         self.position = PrimWidgetModel.PositionItem()
+
+        # The prims whose geometry changed while they were the target, the edit doesn't author extentsHint again.
+        # Their hint is not used until it's authored again, the set belongs to the stage it was filled on.
+        self._stale_hints = set()
+        self._stale_hints_stage = None
+        # Which way the bounding boxes were computed
+        self._stats = {"extents_hint": 0, "full_bounds": 0}
         
         # Save the UsdContext name (we currently only work with a single Context)
         self._usd_context = omni.usd.get_context()
@@ -80,6 +96,10 @@ class PrimWidgetModel(sc.AbstractManipulatorModel):
         """Get the current prim path."""
         return self._current_path
 
+    def get_stats(self):
+        """Get the number of bounding boxes taken from extentsHint and computed from the children."""
+        return dict(self._stats)
+
     def _update_prim_info(self):
         """Update prim information based on current path."""
         if not self._current_path or not self._enabled:
@@ -88,6 +108,11 @@ class PrimWidgetModel(sc.AbstractManipulatorModel):
         stage = self._usd_context.get_stage()
         if not stage:
             return
+
+        if stage != self._stale_hints_stage:
+            # The stale hints are of the prims of the previous stage
+            self._stale_hints = set()
+            self._stale_hints_stage = stage
             
         prim = stage.GetPrimAtPath(self._current_path)
         if not prim.IsValid():
@@ -134,9 +159,23 @@ class PrimWidgetModel(sc.AbstractManipulatorModel):
         if not self._enabled or not self._current_path:
             return
             
+        current_path = Sdf.Path(self._current_path)
+        changed = False
         for p in notice.GetChangedInfoOnlyPaths():
-            if self._current_path in str(p.GetPrimPath()):
-                self._item_changed(self.position)
+            prim_path = p.GetPrimPath()
+            # The descendants change the bounds and the ancestors change the transform
+            is_descendant = prim_path.HasPrefix(current_path)
+            if not is_descendant and not current_path.HasPrefix(prim_path):
+                continue
+            if is_descendant and p.IsPropertyPath() and p.name in GEOMETRY_PROPERTIES:
+                self._stale_hints.add(current_path)
+            elif prim_path == current_path and p.IsPropertyPath() and p.name == UsdGeom.Tokens.extentsHint:
+                # The hint is authored again
+                self._stale_hints.discard(current_path)
+            changed = True
+
+        if changed:
+            self._item_changed(self.position)
 
     def get_item(self, identifier):
         if identifier == "position":
@@ -167,12 +206,7 @@ class PrimWidgetModel(sc.AbstractManipulatorModel):
             return [0, 0, 0]
             
         # Get position directly from USD
-        box_cache = UsdGeom.BBoxCache(
-            Usd.TimeCode.Default(), 
-            includedPurposes=[UsdGeom.Tokens.default_]
-        )
-        bound = box_cache.ComputeWorldBound(prim)
-        range = bound.ComputeAlignedBox()
+        range = self._get_world_range(prim)
         bboxMin = range.GetMin()
         bboxMax = range.GetMax()
         
@@ -182,4 +216,32 @@ class PrimWidgetModel(sc.AbstractManipulatorModel):
             bboxMax[1] + TOP_OFFSET,
             (bboxMin[2] + bboxMax[2]) * 0.5
         ]
-        return position
\ No newline at end of file
+        return position
+
+    def _get_world_range(self, prim: Usd.Prim) -> Gf.Range3d:
+        """World bounding box of the prim, from its extentsHint when it's authored and up to date."""
+        local_range = self._get_local_hint(prim)
+        if not local_range.IsEmpty():
+            self._stats["extents_hint"] += 1
+            world = UsdGeom.Imageable(prim).ComputeLocalToWorldTransform(Usd.TimeCode.Default())
+            return Gf.BBox3d(local_range, world).ComputeAlignedRange()
+
+        # Traverse all the children
+        self._stats["full_bounds"] += 1
+        box_cache = UsdGeom.BBoxCache(
+            Usd.TimeCode.Default(),
+            includedPurposes=[UsdGeom.Tokens.default_]
+        )
+        bound = box_cache.ComputeWorldBound(prim)
+        return bound.ComputeAlignedBox()
+
+    def _get_local_hint(self, prim: Usd.Prim) -> Gf.Range3d:
+        """The extentsHint of the default purpose in the space of the prim, empty when it can't be used."""
+        if prim.GetPath() in self._stale_hints or carb.settings.get_settings().get(SETTING_BOUNDS_POLICY) == "full":
+            return Gf.Range3d()
+
+        # Every purpose has a min and a max, the widget tracks the default purpose that comes first
+        hint = UsdGeom.ModelAPI(prim).GetExtentsHint(Usd.TimeCode.Default())
+        if not hint or len(hint) < 2:
+            return Gf.Range3d()
+        return Gf.Range3d(Gf.Vec3d(hint[0]), Gf.Vec3d(hint[1]))
@@ -8,13 +8,24 @@
 #
 __all__ = ["SliderModel"]
 
+from itertools import chain
+
 from omni.ui import scene as sc
 from pxr import Gf
+from pxr import Sdf
+from pxr import Tf
 from pxr import UsdGeom
 from pxr import Usd
+import carb.settings
 import omni.usd
 import omni.kit.commands
 
+# "extentsHint" puts the slider on the authored extentsHint of the models, "full" always traverses the children
+SETTING_BOUNDS_POLICY = "/exts/omni.example.ui_scene.slider_manipulator/boundsPolicy"
+
+# The changes of these properties under the selected prim make its extentsHint out of date
+GEOMETRY_PROPERTIES = (UsdGeom.Tokens.extent, UsdGeom.Tokens.points)
+
 
 class SliderModel(sc.AbstractManipulatorModel):
     """
@@ -51,6 +62,12 @@ class SliderModel(sc.AbstractManipulatorModel):
         self._offset = 10
         # Current selection
         self._current_path = ""
+        # Which way the bounding boxes were computed
+        self._stats = {"extents_hint": 0, "full_bounds": 0}
+        # The prims whose geometry changed while they were selected. The edit doesn't author extentsHint again, so
+        # it's not trusted until it's authored or the stage is opened again.
+        self._stale_hints = set()
+        self._stage_listener = None
 
         usd_context = omni.usd.get_context()
         self._stage: Usd.Stage = None
@@ -62,6 +79,10 @@ class SliderModel(sc.AbstractManipulatorModel):
             self._on_stage_event, name="Slider Selection Update"
         )
 
+    def get_stats(self):
+        """Returns the number of bounding boxes taken from extentsHint and computed from the children"""
+        return dict(self._stats)
+
     def get_item(self, identifier):
         if identifier == "value":
             return self.scale
@@ -117,10 +138,36 @@ class SliderModel(sc.AbstractManipulatorModel):
         """Called by stage_event_stream"""
         if event.type == int(omni.usd.StageEventType.SELECTION_CHANGED):
             self._on_kit_selection_changed()
+        elif event.type in (int(omni.usd.StageEventType.OPENED), int(omni.usd.StageEventType.CLOSED)):
+            self._stale_hints = set()
+
+    def _notice_changed(self, notice, stage):
+        """Called by Tf.Notice. Only watches the geometry and the extentsHint of the selected prim."""
+        if not self._current_path:
+            return
+        selected_path = Sdf.Path(self._current_path)
+        changed = False
+        for p in chain(notice.GetResyncedPaths(), notice.GetChangedInfoOnlyPaths()):
+            if not p.IsPropertyPath() or not p.HasPrefix(selected_path):
+                continue
+            if p.name in GEOMETRY_PROPERTIES:
+                self._stale_hints.add(selected_path)
+                changed = True
+            elif p.name == UsdGeom.Tokens.extentsHint and p.GetPrimPath() == selected_path:
+                # The hint is authored again
+                self._stale_hints.discard(selected_path)
+                changed = True
+
+        if changed:
+            # The slider moves to the new bounds
+            self._item_changed(self.position)
 
     def _on_kit_selection_changed(self):
         prim_paths = self._selection.get_selected_prim_paths()
         if not prim_paths:
+            if self._stage_listener:
+                self._stage_listener.Revoke()
+                self._stage_listener = None
             return
 
         prim = self._get_stage().GetPrimAtPath(prim_paths[0])
@@ -128,6 +175,10 @@ class SliderModel(sc.AbstractManipulatorModel):
             return
 
         self._current_path = prim_paths[0]
+        if not self._stage_listener:
+            self._stage_listener = Tf.Notice.Register(
+                Usd.Notice.ObjectsChanged, self._notice_changed, self._get_stage()
+            )
 
         (old_scale, old_rotation_euler, old_rotation_order, old_translation) = omni.usd.get_local_transform_SRT(prim)
 
@@ -148,11 +199,36 @@ class SliderModel(sc.AbstractManipulatorModel):
 
         # Get position directly from USD
         prim = self._get_stage().GetPrimAtPath(self._current_path)
-        box_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), includedPurposes=[UsdGeom.Tokens.default_])
-        bound = box_cache.ComputeWorldBound(prim)
-        range = bound.ComputeAlignedBox()
+        range = self._get_world_range(prim)
         bboxMin = range.GetMin()
         bboxMax = range.GetMax()
 
         position = [(bboxMin[0] + bboxMax[0]) * 0.5, bboxMax[1] + self._offset, (bboxMin[2] + bboxMax[2]) * 0.5]
         return position
+
+    def _get_world_range(self, prim):
+        """The world bounding box the slider is placed above"""
+        hint = self._get_extents_hint(prim)
+        if hint is not None:
+            self._stats["extents_hint"] += 1
+            return hint
+
+        # Traverse all the children
+        self._stats["full_bounds"] += 1
+        box_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), includedPurposes=[UsdGeom.Tokens.default_])
+        bound = box_cache.ComputeWorldBound(prim)
+        return bound.ComputeAlignedBox()
+
+    def _get_extents_hint(self, prim):
+        """The authored extentsHint in world space, None if it's missing, empty, out of date or the policy is full"""
+        if prim.GetPath() in self._stale_hints or carb.settings.get_settings().get(SETTING_BOUNDS_POLICY) == "full":
+            return None
+        # A min and a max per purpose, the slider only follows the default one
+        hint = UsdGeom.ModelAPI(prim).GetExtentsHint(Usd.TimeCode.Default())
+        if not hint or len(hint) < 2:
+            return None
+        local_range = Gf.Range3d(Gf.Vec3d(hint[0]), Gf.Vec3d(hint[1]))
+        if local_range.IsEmpty():
+            return None
+        world = UsdGeom.Imageable(prim).ComputeLocalToWorldTransform(Usd.TimeCode.Default())
+        return Gf.BBox3d(local_range, world).ComputeAlignedRange()
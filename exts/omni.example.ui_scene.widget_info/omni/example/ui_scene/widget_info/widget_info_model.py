@@ -10,15 +10,23 @@ __all__ = ["WidgetInfoModel"]
 
 from omni.ui import scene as sc
 from pxr import Gf
+from pxr import Sdf
 from pxr import UsdGeom
 from pxr import Usd
 from pxr import UsdShade
 from pxr import Tf
 from pxr import UsdLux
 
+import carb.settings
 import omni.usd
 import omni.kit.commands
 
+# "extentsHint" places the widget with the authored extentsHint of the models, "full" always traverses the children
+SETTING_BOUNDS_POLICY = "/exts/omni.example.ui_scene.widget_info/boundsPolicy"
+
+# The changes of these properties make the extentsHint out of date
+GEOMETRY_PROPERTIES = (UsdGeom.Tokens.extent, UsdGeom.Tokens.points)
+
 
 class WidgetInfoModel(sc.AbstractManipulatorModel):
     """
@@ -54,6 +62,11 @@ class WidgetInfoModel(sc.AbstractManipulatorModel):
         self._prim = None
         self._current_path = ""
         self._stage_listener = None
+        # The prims whose geometry changed while they were selected, the edit doesn't author extentsHint again.
+        # Their hint is not used until it's authored or the stage is opened again.
+        self._stale_hints = set()
+        # Which way the bounding boxes were computed
+        self._stats = {"extents_hint": 0, "full_bounds": 0}
 
         # Save the UsdContext name (we currently only work with single Context)
         self._usd_context_name = ''
@@ -71,9 +84,27 @@ class WidgetInfoModel(sc.AbstractManipulatorModel):
 
     def _notice_changed(self, notice, stage):
         """Called by Tf.Notice"""
+        current_path = Sdf.Path(self._current_path)
+        changed = False
         for p in notice.GetChangedInfoOnlyPaths():
-            if self._current_path in str(p.GetPrimPath()):
-                self._item_changed(self.position)
+            prim_path = p.GetPrimPath()
+            # The descendants change the bounds and the ancestors change the transform
+            is_descendant = prim_path.HasPrefix(current_path)
+            if not is_descendant and not current_path.HasPrefix(prim_path):
+                continue
+            if is_descendant and p.IsPropertyPath() and p.name in GEOMETRY_PROPERTIES:
+                self._stale_hints.add(current_path)
+            elif prim_path == current_path and p.IsPropertyPath() and p.name == UsdGeom.Tokens.extentsHint:
+                # The hint is authored again
+                self._stale_hints.discard(current_path)
+            changed = True
+
+        if changed:
+            self._item_changed(self.position)
+
+    def get_stats(self):
+        """Returns the number of bounding boxes taken from extentsHint and computed from the children"""
+        return dict(self._stats)
 
     def get_item(self, identifier):
         if identifier == "position":
@@ -109,6 +140,8 @@ class WidgetInfoModel(sc.AbstractManipulatorModel):
         """Called by stage_event_stream"""
         if event.type == int(omni.usd.StageEventType.SELECTION_CHANGED):
             self._on_kit_selection_changed()
+        elif event.type in (int(omni.usd.StageEventType.OPENED), int(omni.usd.StageEventType.CLOSED)):
+            self._stale_hints = set()
 
     def _on_kit_selection_changed(self):
         # selection change, reset it for now
@@ -162,11 +195,27 @@ class WidgetInfoModel(sc.AbstractManipulatorModel):
 
         # Get position directly from USD
         prim = stage.GetPrimAtPath(self._current_path)
-        box_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), includedPurposes=[UsdGeom.Tokens.default_])
-        bound = box_cache.ComputeWorldBound(prim)
-        range = bound.ComputeAlignedBox()
+        range = self._get_world_range(prim)
         bboxMin = range.GetMin()
         bboxMax = range.GetMax()
 
         position = [(bboxMin[0] + bboxMax[0]) * 0.5, bboxMax[1] + self._offset, (bboxMin[2] + bboxMax[2]) * 0.5]
         return position
+
+    def _get_world_range(self, prim):
+        """The world bounding box of the prim, from the extentsHint if it's authored and up to date"""
+        time = Usd.TimeCode.Default()
+        if prim.GetPath() not in self._stale_hints and carb.settings.get_settings().get(SETTING_BOUNDS_POLICY) != "full":
+            hint = UsdGeom.ModelAPI(prim).GetExtentsHint(time)
+            # The widget only follows the default purpose, the hint starts with its min and max
+            local_range = Gf.Range3d(Gf.Vec3d(hint[0]), Gf.Vec3d(hint[1])) if hint and len(hint) >= 2 else Gf.Range3d()
+            if not local_range.IsEmpty():
+                self._stats["extents_hint"] += 1
+                world = UsdGeom.Imageable(prim).ComputeLocalToWorldTransform(time)
+                return Gf.BBox3d(local_range, world).ComputeAlignedRange()
+
+        # Traverse all the children
+        self._stats["full_bounds"] += 1
+        box_cache = UsdGeom.BBoxCache(time, includedPurposes=[UsdGeom.Tokens.default_])
+        bound = box_cache.ComputeWorldBound(prim)
+        return bound.ComputeAlignedBox()